@@ -1,6 +1,10 @@
  // Admin User Management - fetch real data
 let currentPage = 1;
 let currentPerPage = 10;
+// Keyset cursor for Previous/Next ('cursor' = page after it, 'before' = page before it);
+// numbered buttons jump by page number instead
+let currentCursor = null;
+let currentCursorParam = 'cursor';
 let lastUsersResponse = null;
 let currentAdminId = null;
 let currentAdminRole = null;
@@ -40,11 +44,46 @@ function buildUsersQuery() {
   const params = new URLSearchParams();
   params.set('page', String(currentPage));
   params.set('per_page', String(currentPerPage));
+  if (currentCursor) params.set(currentCursorParam, currentCursor);
   const role = document.getElementById('userTypeFilter')?.value;
   if (role) params.set('role', role);
+  const search = document.getElementById('searchInput')?.value.trim();
+  if (search) params.set('search', search);
   return `/admin/users?${params.toString()}`;
 }
 
+// Suggestions for the search box, from the server-side prefix index
+let suggestTimer = null;
+let suggestSeq = 0;
+function suggestUsers(term) {
+  clearTimeout(suggestTimer);
+  const list = document.getElementById('userSuggestions');
+  if (!list) return;
+  if (!term) { list.innerHTML = ''; return; }
+  suggestTimer = setTimeout(async () => {
+    const seq = ++suggestSeq;
+    try {
+      const params = new URLSearchParams({ q: term, limit: '8' });
+      const role = document.getElementById('userTypeFilter')?.value;
+      if (role) params.set('role', role);
+      const res = await fetch(`/admin/users/autocomplete?${params.toString()}`);
+      if (!res.ok) return;
+      const json = await res.json();
+      // Ignore responses to keystrokes that have since been superseded
+      if (seq !== suggestSeq || !json.success) return;
+      list.innerHTML = '';
+      (json.data.users || []).forEach(u => {
+        const opt = document.createElement('option');
+        opt.value = u.email;
+        opt.label = `${u.full_name}${u.student_id ? ' (' + u.student_id + ')' : ''}`;
+        list.appendChild(opt);
+      });
+    } catch (e) {
+      console.error(e);
+    }
+  }, 150);
+}
+
 async function fetchUsers() {
   try {
     const res = await fetch(buildUsersQuery());
@@ -125,14 +164,14 @@ function renderPagination(pg) {
   prev.className = 'page-btn';
   prev.textContent = 'Previous';
   prev.disabled = !pg.has_prev;
-  prev.onclick = () => { if (pg.has_prev) { currentPage -= 1; fetchUsers(); } };
+  prev.onclick = () => { if (pg.has_prev) { followCursor('before', pg.prev_cursor, pg.page - 1); } };
   controls.appendChild(prev);
   for (let i = 1; i <= pg.pages; i++) {
     if (i === 1 || i === pg.pages || Math.abs(i - pg.page) <= 1) {
       const b = document.createElement('button');
       b.className = 'page-btn' + (i === pg.page ? ' active' : '');
       b.textContent = String(i);
-      b.onclick = () => { currentPage = i; fetchUsers(); };
+      b.onclick = () => { currentPage = i; currentCursor = null; fetchUsers(); };
       controls.appendChild(b);
     } else if (i === 2 || i === pg.pages - 1) {
       const dots = document.createElement('button');
@@ -146,10 +185,17 @@ function renderPagination(pg) {
   next.className = 'page-btn';
   next.textContent = 'Next';
   next.disabled = !pg.has_next;
-  next.onclick = () => { if (pg.has_next) { currentPage += 1; fetchUsers(); } };
+  next.onclick = () => { if (pg.has_next) { followCursor('cursor', pg.next_cursor, pg.page + 1); } };
   controls.appendChild(next);
 }
 
+function followCursor(param, cursor, page) {
+  currentPage = page;
+  currentCursorParam = param;
+  currentCursor = cursor;
+  fetchUsers();
+}
+
 // Navigation function to redirect from admin dashboard
 function navigateToUserManagement() {
   window.location.href = 'Admin_usr_manage.html';
@@ -158,6 +204,7 @@ function navigateToUserManagement() {
 // Filter functions
 function applyFilters() {
   currentPage = 1;
+  currentCursor = null;
   fetchUsers();
   fetchRejected();
 }
@@ -165,6 +212,8 @@ function applyFilters() {
 function resetFilters() {
   const sel = document.getElementById('userTypeFilter');
   if (sel) sel.value = '';
+  const search = document.getElementById('searchInput');
+  if (search) search.value = '';
   applyFilters();
 }
 
@@ -313,8 +362,20 @@ document.addEventListener('DOMContentLoaded', async function() {
   fetchRejected();
   const searchInput = document.getElementById('searchInput');
   if (searchInput) {
-    searchInput.addEventListener('input', function() {
-      if (this.value.length > 2 || this.value.length === 0) {
+    // Typing only fetches suggestions; the list is filtered on Apply, Enter or picking a suggestion
+    searchInput.addEventListener('input', function(e) {
+      const term = this.value.trim();
+      const picked = !e.inputType || e.inputType === 'insertReplacementText';
+      const options = document.getElementById('userSuggestions')?.options || [];
+      if (picked && Array.from(options).some(opt => opt.value === term)) {
+        applyFilters();
+        return;
+      }
+      suggestUsers(term);
+    });
+    searchInput.addEventListener('keydown', function(e) {
+      if (e.key === 'Enter') {
+        e.preventDefault();
         applyFilters();
       }
     });
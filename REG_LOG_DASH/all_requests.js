@@ -1,6 +1,10 @@
 // All Requests Page JavaScript
 
 let currentPage = 1;
+// Keyset cursor for Previous/Next ('cursor' = page after it, 'before' = page before it);
+// numbered buttons jump by page number instead
+let currentCursor = null;
+let currentCursorParam = 'cursor';
 let currentFilters = {
     status: '',
     search: ''
@@ -17,6 +21,7 @@ function applyFilters() {
     currentFilters.status = document.getElementById('status-filter').value;
     currentFilters.search = document.getElementById('search-input').value;
     currentPage = 1;
+    currentCursor = null;
     loadRequests();
 }
 
@@ -25,6 +30,9 @@ async function loadRequests() {
         const params = new URLSearchParams();
         params.set('page', currentPage);
         params.set('per_page', '20');
+        if (currentCursor) {
+            params.set(currentCursorParam, currentCursor);
+        }
         
         if (currentFilters.status) {
             params.set('status', currentFilters.status);
@@ -130,12 +138,12 @@ function displayPagination(pagination) {
         return;
     }
     
-    const { current_page, total_pages } = pagination;
+    const { current_page, total_pages, next_cursor, prev_cursor } = pagination;
     let buttons = [];
     
     // Previous button
     buttons.push(`
-        <button ${current_page === 1 ? 'disabled' : ''} onclick="changePage(${current_page - 1})">
+        <button ${!prev_cursor ? 'disabled' : ''} onclick="followCursor('before', '${prev_cursor}', ${current_page - 1})">
             « Previous
         </button>
     `);
@@ -155,7 +163,7 @@ function displayPagination(pagination) {
     
     // Next button
     buttons.push(`
-        <button ${current_page === total_pages ? 'disabled' : ''} onclick="changePage(${current_page + 1})">
+        <button ${!next_cursor ? 'disabled' : ''} onclick="followCursor('cursor', '${next_cursor}', ${current_page + 1})">
             Next »
         </button>
     `);
@@ -165,6 +173,15 @@ function displayPagination(pagination) {
 
 function changePage(page) {
     currentPage = page;
+    currentCursor = null;
+    loadRequests();
+    window.scrollTo(0, 0);
+}
+
+function followCursor(param, cursor, page) {
+    currentPage = page;
+    currentCursorParam = param;
+    currentCursor = cursor;
     loadRequests();
     window.scrollTo(0, 0);
 }
@@ -25,6 +25,51 @@ def create_app():
     csrf.init_app(app)
     migrate.init_app(app, db)
 
+    # Per-connection SQLite pragmas (WAL etc.) and a read-only engine for GET requests
+    from backend.utils.sqlite_profile import init_sqlite_profile
+    sqlite_read_engine = init_sqlite_profile(app)
+
+    # GET requests read from DATABASE_READ_URLS replicas, or SQLite's read-only connections
+    from backend.utils.read_routing import init_read_routing
+    init_read_routing(app, [sqlite_read_engine] if sqlite_read_engine else [])
+
+    from backend.utils.write_coordinator import init_write_coordinator
+    init_write_coordinator(app)
+
+    # Per-request query counts and N+1 detection
+    from backend.utils.query_counter import init_query_counter
+    init_query_counter(app)
+
+    from backend.utils.database_utils import init_session_hooks
+    init_session_hooks(db)
+
+    from backend.services.email_queue import init_email_queue
+    init_email_queue(app)
+
+    from backend.services.outbox_drainer import init_outbox_drain
+    init_outbox_drain(app)
+
+    from backend.services.role_directory import init_role_directory
+    init_role_directory(app)
+
+    from backend.services.audit_writer import init_audit_writer
+    init_audit_writer(app, db)
+
+    from backend.services.stats_counters import init_stats_counters
+    init_stats_counters(db)
+
+    from backend.services.stats_service import init_stats_service
+    init_stats_service(app)
+
+    from backend.services.user_lookup import init_user_lookup
+    init_user_lookup(app)
+
+    from backend.utils.pagination import init_count_cache
+    init_count_cache(app, db)
+
+    from backend.cli import register_commands
+    register_commands(app)
+
     login_manager.login_view = 'auth.login'
     login_manager.login_message_category = 'info'
 
@@ -35,6 +80,7 @@ def create_app():
     from backend.blueprints.admin.routes import admin_bp
     from backend.blueprints.admin.request_routes import request_bp
     from backend.blueprints.admin.export_routes import export_bp
+    from backend.blueprints.admin.audit_routes import audit_bp
     from backend.blueprints.user_dashboard.routes import user_dashboard_bp
 
     app.register_blueprint(auth_bp, url_prefix='/auth')
@@ -43,6 +89,7 @@ def create_app():
     app.register_blueprint(admin_bp, url_prefix='/admin')
     app.register_blueprint(request_bp, url_prefix='/admin')
     app.register_blueprint(export_bp, url_prefix='/admin')
+    app.register_blueprint(audit_bp, url_prefix='/admin')
     app.register_blueprint(user_dashboard_bp, url_prefix='/user')
 
     # Exempt JSON auth endpoints from CSRF (frontend uses fetch without CSRF token)
@@ -53,34 +100,35 @@ def create_app():
     csrf.exempt(admin_bp)
     csrf.exempt(request_bp)
     csrf.exempt(export_bp)
+    csrf.exempt(audit_bp)
 
     # Import models to ensure they are registered with SQLAlchemy
-    from backend.models import User, ProjectRequest, NDA, Approval, AuditLog
+    from backend.models import User, ProjectRequest, NDA, Approval, AuditLog, EmailOutbox, PendingNotification, StatsCounter
 
     # Ensure tables exist to avoid OperationalError (e3q8) on first run
     # This complements migrations for environments where CLI is unavailable
     with app.app_context():
-        # Set SQLite pragmas to reduce locking and improve performance (PostgreSQL ignores these)
-        try:
-            from sqlalchemy import text
-            pragmas = [
-                'PRAGMA busy_timeout=60000',
-                'PRAGMA synchronous=NORMAL',
-                'PRAGMA cache_size=10000',
-                'PRAGMA temp_store=MEMORY'
-            ]
-            for pragma in pragmas:
-                try:
-                    db.session.execute(text(pragma))
-                except Exception as e:
-                    print(f"Warning: Could not set {pragma}: {e}")
-            db.session.commit()
-        except Exception as e:
-            print(f"Warning: Could not set SQLite pragmas: {e}")
-        
         # Create tables
         db.create_all()
         print("Database tables created successfully")
+
+        # Fill the dashboard counters the first time their table is created
+        try:
+            from backend.models.stats_counter import StatsCounter
+            from backend.services.stats_counters import reconcile_counters
+            if StatsCounter.query.first() is None:
+                reconcile_counters()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Warning: Could not initialise stats counters: {e}")
+
+        # Full-text search index for project requests (also created by the migration)
+        try:
+            from backend.services.request_search import ensure_search_index
+            ensure_search_index()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Warning: Could not initialise search index: {e}")
         
         # Auto-create admin users if none exist
         try:
@@ -0,0 +1,157 @@
+from flask import Blueprint, jsonify, request
+from flask_login import login_required, current_user
+from datetime import datetime
+import logging
+from backend.models.audit_log import AuditLog, ActionEnum
+from backend.models.user import User
+from backend.models import db
+from backend.utils.error_handlers import ValidationError
+from backend.utils.pagination import keyset_paginate
+
+audit_bp = Blueprint('admin_audit', __name__)
+
+logger = logging.getLogger(__name__)
+
+MAX_PAGE_SIZE = 200
+
+def admin_required(f):
+    """Decorator to require admin role"""
+    from functools import wraps
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not current_user.is_authenticated or not current_user.is_admin:
+            logger.warning(f"Unauthorized audit log access attempt by user {current_user.id if current_user.is_authenticated else 'anonymous'}")
+            return jsonify({
+                'message': 'Access forbidden. Admin privileges required.'
+            }), 403
+        return f(*args, **kwargs)
+    return decorated_function
+
+def _parse_datetime(name):
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+    except ValueError:
+        raise ValidationError(f'{name} must be an ISO 8601 date or datetime', name)
+
+@audit_bp.route('/audit', methods=['GET'])
+@login_required
+@admin_required
+def list_audit_logs():
+    """List audit log entries, newest first, paged by keyset on (timestamp, id).
+
+    Filters: user_id, action, resource_type, resource_id, endpoint, method,
+    ip_address, details.<key>, start, end (ISO 8601; start inclusive, end
+    exclusive). Pass the returned next_cursor as ?cursor=
+    to fetch the following page.
+    """
+    try:
+        limit = min(max(request.args.get('limit', 50, type=int), 1), MAX_PAGE_SIZE)
+
+        # One query: audit columns plus the user's name, no per-row lazy loads
+        query = db.session.query(
+            AuditLog.id,
+            AuditLog.timestamp,
+            AuditLog.user_id,
+            AuditLog.action,
+            AuditLog.resource_type,
+            AuditLog.resource_id,
+            AuditLog.details,
+            AuditLog.endpoint,
+            AuditLog.http_method,
+            AuditLog.ip_address,
+            AuditLog.user_agent,
+            User.first_name,
+            User.last_name,
+            User.email
+        ).outerjoin(User, User.id == AuditLog.user_id)
+
+        user_id = request.args.get('user_id', type=int)
+        if user_id:
+            query = query.filter(AuditLog.user_id == user_id)
+
+        action = request.args.get('action')
+        if action:
+            try:
+                query = query.filter(AuditLog.action == ActionEnum(action.lower()))
+            except ValueError:
+                raise ValidationError(f"action must be one of: {', '.join(a.value for a in ActionEnum)}", 'action')
+
+        resource_type = request.args.get('resource_type')
+        if resource_type:
+            query = query.filter(AuditLog.resource_type == resource_type)
+
+        resource_id = request.args.get('resource_id', type=int)
+        if resource_id is not None:
+            query = query.filter(AuditLog.resource_id == resource_id)
+
+        endpoint = request.args.get('endpoint')
+        if endpoint:
+            query = query.filter(AuditLog.endpoint == endpoint)
+
+        method = request.args.get('method')
+        if method:
+            query = query.filter(AuditLog.http_method == method.upper())
+
+        ip_address = request.args.get('ip_address')
+        if ip_address:
+            query = query.filter(AuditLog.ip_address == ip_address)
+
+        # details.<key>=value matches a top-level key of the JSON details
+        for name, value in request.args.items():
+            if name.startswith('details.') and len(name) > len('details.'):
+                query = query.filter(AuditLog.details_filter(name[len('details.'):], value))
+
+        start = _parse_datetime('start')
+        if start:
+            query = query.filter(AuditLog.timestamp >= start)
+        end = _parse_datetime('end')
+        if end:
+            query = query.filter(AuditLog.timestamp < end)
+
+        rows, next_cursor = keyset_paginate(
+            query, [AuditLog.timestamp, AuditLog.id], cursor=request.args.get('cursor'), limit=limit
+        )
+
+        entries = [{
+            'id': row.id,
+            'user_id': row.user_id,
+            'user_name': f"{row.first_name} {row.last_name}" if row.first_name else 'Unknown',
+            'user_email': row.email,
+            'action': row.action.value,
+            'resource_type': row.resource_type,
+            'resource_id': row.resource_id,
+            'details': row.details,
+            'endpoint': row.endpoint,
+            'http_method': row.http_method,
+            'ip_address': row.ip_address,
+            'user_agent': row.user_agent,
+            'timestamp': row.timestamp.isoformat()
+        } for row in rows]
+
+        return jsonify({
+            'success': True,
+            'data': {
+                'entries': entries,
+                'pagination': {
+                    'limit': limit,
+                    'next_cursor': next_cursor,
+                    'has_next': next_cursor is not None
+                }
+            }
+        })
+
+    except ValidationError as e:
+        return jsonify({
+            'success': False,
+            'message': e.message,
+            'field': e.field
+        }), 400
+    except Exception as e:
+        logger.error(f"Error fetching audit logs: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': 'Failed to fetch audit logs'
+        }), 500
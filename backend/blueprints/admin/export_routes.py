@@ -6,11 +6,13 @@ from datetime import datetime, timedelta
 import csv
 import io
 import logging
-from backend.models.user import User
+from backend.models.user import User, RoleEnum
 from backend.models.project_request import ProjectRequest, StatusEnum
 from backend.models.approval import Approval
 from backend.models.nda import NDA
 from backend.models import db
+from backend.services.stats_service import global_stats
+from backend.utils.loader_policy import approval_rows, request_rows, user_rows
 
 export_bp = Blueprint('admin_export', __name__)
 
@@ -41,17 +43,17 @@ def export_reports():
         
         if report_type == 'requests':
             # Export all requests
-            requests = ProjectRequest.query.order_by(desc(ProjectRequest.submitted_at)).all()
+            requests = ProjectRequest.query.options(*request_rows()).order_by(desc(ProjectRequest.submitted_at)).all()
             data = [req.to_dict() for req in requests]
             
         elif report_type == 'users':
             # Export all users
-            users = User.query.order_by(desc(User.created_at)).all()
+            users = User.query.options(*user_rows()).order_by(desc(User.created_at)).all()
             data = [user.to_dict() for user in users]
             
         elif report_type == 'approvals':
             # Export approval statistics
-            approvals = Approval.query.order_by(desc(Approval.timestamp)).all()
+            approvals = Approval.query.options(*approval_rows()).order_by(desc(Approval.timestamp)).all()
             data = [{
                 'id': approval.id,
                 'project_request_id': approval.project_request_id,
@@ -164,6 +166,9 @@ def export_analytics():
         else:
             end_date = datetime.utcnow()
         
+        # Totals and breakdowns come from the dashboard counters; period figures are counted
+        counters = global_stats()
+
         # Get analytics data
         analytics = {
             'date_range': {
@@ -171,8 +176,8 @@ def export_analytics():
                 'end': end_date.isoformat()
             },
             'user_statistics': {
-                'total_users': User.query.count(),
-                'active_users': User.query.filter_by(is_active=True).count(),
+                'total_users': counters['users.total'],
+                'active_users': counters['users.active'],
                 'new_users_in_period': User.query.filter(
                     User.created_at >= start_date,
                     User.created_at <= end_date
@@ -180,7 +185,7 @@ def export_analytics():
                 'users_by_role': {}
             },
             'request_statistics': {
-                'total_requests': ProjectRequest.query.count(),
+                'total_requests': counters['requests.total'],
                 'requests_in_period': ProjectRequest.query.filter(
                     ProjectRequest.submitted_at >= start_date,
                     ProjectRequest.submitted_at <= end_date
@@ -199,12 +204,15 @@ def export_analytics():
         }
         
         # Get users by role
-        role_counts = db.session.query(User.role, func.count(User.id)).group_by(User.role).all()
-        analytics['user_statistics']['users_by_role'] = {role.value: count for role, count in role_counts}
+        analytics['user_statistics']['users_by_role'] = {
+            role.value: counters[f"users.role.{role.value}"] for role in RoleEnum if counters[f"users.role.{role.value}"]
+        }
         
         # Get requests by status
-        status_counts = db.session.query(ProjectRequest.status, func.count(ProjectRequest.id)).group_by(ProjectRequest.status).all()
-        analytics['request_statistics']['requests_by_status'] = {status.value: count for status, count in status_counts}
+        analytics['request_statistics']['requests_by_status'] = {
+            status.value: counters[f"requests.status.{status.value}"] for status in StatusEnum
+            if counters[f"requests.status.{status.value}"]
+        }
         
         # Get requests by priority
         priority_counts = db.session.query(ProjectRequest.priority, func.count(ProjectRequest.id)).group_by(ProjectRequest.priority).all()
@@ -241,8 +249,8 @@ def export_backup():
         backup_data = {
             'exported_at': datetime.utcnow().isoformat(),
             'exported_by': current_user.full_name,
-            'users': [user.to_dict() for user in User.query.all()],
-            'project_requests': [req.to_dict() for req in ProjectRequest.query.all()],
+            'users': [user.to_dict() for user in User.query.options(*user_rows()).all()],
+            'project_requests': [req.to_dict() for req in ProjectRequest.query.options(*request_rows()).all()],
             'approvals': [{
                 'id': approval.id,
                 'project_request_id': approval.project_request_id,
@@ -8,6 +8,11 @@ from backend.models.approval import Approval
 from backend.models.user import User
 from backend.models import db
 from backend.utils.validation import validate_approval_data
+from backend.utils.error_handlers import ValidationError
+from backend.utils.pagination import paginate_request
+from backend.utils.serializers import REQUEST_CARD, REQUEST_FIELDS, REQUEST_SUMMARY
+from backend.utils.loader_policy import approval_rows
+from backend.services.request_search import apply_search, ranked_search, search_filter
 
 request_bp = Blueprint('admin_requests', __name__)
 
@@ -32,16 +37,11 @@ def admin_required(f):
 def get_requests():
     """Get all project requests with filtering and pagination"""
     try:
-        from sqlalchemy.orm import joinedload
-        
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
         status_filter = request.args.get('status')
         priority_filter = request.args.get('priority')
         search = request.args.get('search')
         
-        # Build query with eager loading
-        query = ProjectRequest.query.options(joinedload(ProjectRequest.user))
+        query = ProjectRequest.query
         
         if status_filter:
             # Accept plain string status value
@@ -58,36 +58,32 @@ def get_requests():
                 request_id = int(search)
                 query = query.filter(ProjectRequest.id == request_id)
             except ValueError:
-                # If not a valid integer, search by title/description/purpose
-                search_term = f"%{search}%"
-                query = query.filter(
-                    or_(
-                        ProjectRequest.project_title.ilike(search_term),
-                        ProjectRequest.description.ilike(search_term),
-                        ProjectRequest.purpose.ilike(search_term)
-                    )
-                )
+                # If not a valid integer, full-text search title/purpose/description/requester
+                query = apply_search(query, search)
+        
+        # The workflow dashboard's cards by default; ?fields= picks others
+        fields = REQUEST_FIELDS.requested(REQUEST_CARD)
+        query = REQUEST_FIELDS.load(query, fields, always=('submitted_at',))
         
         # Paginate results
-        requests = query.order_by(desc(ProjectRequest.submitted_at)).paginate(
-            page=page, per_page=per_page, error_out=False
+        requests, pagination = paginate_request(
+            query, [ProjectRequest.submitted_at, ProjectRequest.id], default_per_page=10, cache_total=True
         )
         
         return jsonify({
             'success': True,
             'data': {
-                'requests': [req.to_dict() for req in requests.items],
-                'pagination': {
-                    'page': page,
-                    'per_page': per_page,
-                    'total': requests.total,
-                    'pages': requests.pages,
-                    'has_next': requests.has_next,
-                    'has_prev': requests.has_prev
-                }
+                'requests': [REQUEST_FIELDS.dump(req, fields) for req in requests],
+                'pagination': pagination
             }
         })
         
+    except ValidationError as e:
+        return jsonify({
+            'success': False,
+            'message': e.message,
+            'field': e.field
+        }), 400
     except Exception as e:
         logger.error(f"Error retrieving requests: {str(e)}")
         return jsonify({
@@ -95,13 +91,51 @@ def get_requests():
             'message': 'Failed to retrieve requests'
         }), 500
 
+@request_bp.route('/requests/search', methods=['GET'])
+@login_required
+@admin_required
+def search_requests():
+    """Best matches for a search term, most relevant first (words may be partial)"""
+    try:
+        term = request.args.get('q', '').strip()
+        limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+        if not term:
+            raise ValidationError('Search term is required', 'q')
+
+        fields = REQUEST_FIELDS.requested(REQUEST_SUMMARY)
+        query = REQUEST_FIELDS.load(ranked_search(ProjectRequest.query, term), fields)
+        status_filter = request.args.get('status')
+        if status_filter:
+            try:
+                query = query.filter(ProjectRequest.status == StatusEnum(status_filter))
+            except ValueError:
+                raise ValidationError('Invalid status', 'status')
+
+        return jsonify({
+            'success': True,
+            'data': {
+                'requests': [REQUEST_FIELDS.dump(req, fields) for req in query.limit(limit).all()]
+            }
+        })
+
+    except ValidationError as e:
+        return jsonify({
+            'success': False,
+            'message': e.message,
+            'field': e.field
+        }), 400
+    except Exception as e:
+        logger.error(f"Error searching requests: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': 'Failed to search requests'
+        }), 500
+
 @request_bp.route('/requests/rejected', methods=['GET'])
 @login_required
 def get_rejected_requests():
     """List recently rejected requests with who rejected and reason."""
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
         date_range = request.args.get('date_range')  # today | week | month
         search = request.args.get('search')
 
@@ -125,7 +159,6 @@ def get_rejected_requests():
             .join(Approval, (Approval.project_request_id == ProjectRequest.id) & (Approval.timestamp == latest_rej_subq.c.max_ts))
             .join(User, User.id == Approval.admin_id)
             .filter(ProjectRequest.status == StatusEnum.rejected)
-            .order_by(desc(ProjectRequest.rejected_at))
         )
 
         # Apply date range filter
@@ -143,24 +176,29 @@ def get_rejected_requests():
             if start_dt:
                 joined = joined.filter(ProjectRequest.rejected_at >= start_dt)
 
-        # Apply search filter (title or user name)
-        if search:
-            like = f"%{search}%"
+        # Apply search filter (request text and requester, or the rejecting admin's name)
+        matches = search_filter(search)
+        if matches is not None:
             joined = joined.filter(
                 or_(
-                    ProjectRequest.project_title.ilike(like),
-                    ProjectRequest.purpose.ilike(like),
-                    User.first_name.ilike(like),
-                    User.last_name.ilike(like)
+                    matches,
+                    User.first_name.ilike(f"{search}%"),
+                    User.last_name.ilike(f"{search}%")
                 )
             )
 
-        total = joined.count()
-        items = joined.limit(per_page).offset((page - 1) * per_page).all()
+        fields = REQUEST_FIELDS.requested(REQUEST_SUMMARY + ('rejection_reason',))
+        joined = REQUEST_FIELDS.load(joined, fields, always=('rejected_at',))
+
+        # Most recently rejected first; rejected_at is always set alongside the rejected status
+        items, pagination = paginate_request(
+            joined, [ProjectRequest.rejected_at, ProjectRequest.id], default_per_page=10,
+            key=lambda row: [row[0].rejected_at, row[0].id], cache_total=True
+        )
 
         data_items = []
         for req, appr, user in items:
-            item = req.to_dict()
+            item = REQUEST_FIELDS.dump(req, fields)
             item.update({
                 'rejected_by_id': user.id,
                 'rejected_by_name': user.full_name,
@@ -173,16 +211,15 @@ def get_rejected_requests():
             'success': True,
             'data': {
                 'requests': data_items,
-                'pagination': {
-                    'page': page,
-                    'per_page': per_page,
-                    'total': total,
-                    'pages': (total + per_page - 1) // per_page,
-                    'has_next': page * per_page < total,
-                    'has_prev': page > 1
-                }
+                'pagination': pagination
             }
         })
+    except ValidationError as e:
+        return jsonify({
+            'success': False,
+            'message': e.message,
+            'field': e.field
+        }), 400
     except Exception as e:
         logger.error(f"Error retrieving rejected requests: {str(e)}")
         return jsonify({'success': False, 'message': 'Failed to retrieve rejected requests'}), 500
@@ -306,7 +343,7 @@ def get_request_details(request_id):
         request_obj = ProjectRequest.query.get_or_404(request_id)
         
         # Get approval history
-        approvals = Approval.query.filter_by(project_request_id=request_id).all()
+        approvals = Approval.query.options(*approval_rows()).filter_by(project_request_id=request_id).all()
         
         return jsonify({
             'success': True,
@@ -9,6 +9,15 @@ from backend.models.approval import Approval
 from backend.models.nda import NDA
 from backend.models import db
 from backend.utils.validation import validate_user_data, validate_approval_data
+from backend.services.stats_service import global_stats
+from backend.services.request_search import apply_search
+from backend.services.user_lookup import search_users
+from backend.services.user_import import UserImportError, import_users, parse_rows
+from backend.middleware.audit_middleware import log_user_action
+from backend.utils.error_handlers import ValidationError
+from backend.utils.pagination import paginate_request
+from backend.utils.serializers import REQUEST_FIELDS, REQUEST_SUMMARY, USER_FIELDS, USER_SUMMARY
+from backend.utils.loader_policy import request_rows, user_rows
 
 admin_bp = Blueprint('admin', __name__, template_folder='../../templates')
 
@@ -79,33 +88,33 @@ def admin_profile():
 def dashboard():
     """Get dashboard statistics and data"""
     try:
-        # Get basic counts
-        total_users = User.query.count()
-        total_requests = ProjectRequest.query.count()
-        pending_requests = ProjectRequest.query.filter_by(status=StatusEnum.pending).count()
+        # Get basic counts (shared, cached snapshot of the dashboard counters)
+        counters = global_stats()
+        total_users = counters['users.total']
+        total_requests = counters['requests.total']
+        pending_requests = counters['requests.status.pending']
         # In the new workflow there is no 'hod_submitted'. Use HOD approved as an intermediate stage metric.
-        hod_submitted = ProjectRequest.query.filter_by(status=StatusEnum.hod_approved).count()
-        approved_requests = ProjectRequest.query.filter_by(status=StatusEnum.approved).count()
+        hod_submitted = counters['requests.status.hod_approved']
+        approved_requests = counters['requests.status.approved']
 
         # Real user stats
-        active_users_count = User.query.filter_by(is_active=True).count()
-        students_count = User.query.filter_by(role=RoleEnum.student).count()
-        faculty_external_count = User.query.filter(
-            User.role.in_(
-                [
-                    RoleEnum.faculty,
-                    RoleEnum.project_guide,
-                    RoleEnum.hod,
-                    RoleEnum.it_services,
-                    RoleEnum.external,
-                    RoleEnum.admin,
-                ]
+        active_users_count = counters['users.active']
+        students_count = counters['users.role.student']
+        faculty_external_count = sum(
+            counters[f"users.role.{role.value}"]
+            for role in (
+                RoleEnum.faculty,
+                RoleEnum.project_guide,
+                RoleEnum.hod,
+                RoleEnum.it_services,
+                RoleEnum.external,
+                RoleEnum.admin,
             )
-        ).count()
+        )
         
         # Get recent activity
-        recent_requests = ProjectRequest.query.order_by(desc(ProjectRequest.submitted_at)).limit(5).all()
-        active_users = User.query.filter_by(is_active=True).order_by(desc(User.last_login)).limit(5).all()
+        recent_requests = ProjectRequest.query.options(*request_rows()).order_by(desc(ProjectRequest.submitted_at)).limit(5).all()
+        active_users = User.query.options(*user_rows()).filter_by(is_active=True).order_by(desc(User.last_login)).limit(5).all()
         
         # Get statistics for the last 30 days
         thirty_days_ago = datetime.utcnow() - timedelta(days=30)
@@ -113,7 +122,7 @@ def dashboard():
         recent_requests_count = ProjectRequest.query.filter(ProjectRequest.submitted_at >= thirty_days_ago).count()
         
         # Get pending approvals for admin dashboard (all stages)
-        pending_approvals = ProjectRequest.query.filter(
+        pending_approvals = ProjectRequest.query.options(*request_rows()).filter(
             or_(
                 ProjectRequest.status == StatusEnum.pending,
                 ProjectRequest.status == StatusEnum.guide_approved,
@@ -159,8 +168,6 @@ def dashboard():
 def get_users():
     """Get all users with pagination and filtering"""
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
         role_filter = request.args.get('role')
         department_filter = request.args.get('department')
         is_active_filter = request.args.get('is_active')
@@ -188,6 +195,7 @@ def get_users():
                 query = query.filter(User.is_active.is_(False))
         
         if search:
+            # Exact results for the list; only /users/autocomplete answers from the prefix index
             search_term = f"%{search}%"
             query = query.filter(
                 or_(
@@ -198,26 +206,27 @@ def get_users():
                 )
             )
         
-        # Paginate results
-        users = query.order_by(desc(User.created_at)).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+        # Load and render only the requested fields (?fields=), summary by default
+        fields = USER_FIELDS.requested(USER_SUMMARY)
+        query = USER_FIELDS.load(query, fields, always=('created_at',))
+        
+        # Paginate results (newest first, keyset on created_at, id)
+        users, pagination = paginate_request(query, [User.created_at, User.id], default_per_page=10, cache_total=True)
         
         return jsonify({
             'success': True,
             'data': {
-                'users': [user.to_dict() for user in users.items],
-                'pagination': {
-                    'page': page,
-                    'per_page': per_page,
-                    'total': users.total,
-                    'pages': users.pages,
-                    'has_next': users.has_next,
-                    'has_prev': users.has_prev
-                }
+                'users': [USER_FIELDS.dump(user, fields) for user in users],
+                'pagination': pagination
             }
         })
         
+    except ValidationError as e:
+        return jsonify({
+            'success': False,
+            'message': e.message,
+            'field': e.field
+        }), 400
     except Exception as e:
         logger.error(f"Error retrieving users: {str(e)}")
         return jsonify({
@@ -225,6 +234,53 @@ def get_users():
             'message': 'Failed to retrieve users'
         }), 500
 
+@admin_bp.route('/users/autocomplete', methods=['GET'])
+@login_required
+@admin_required
+def autocomplete_users():
+    """Users whose name, email or student ID starts with q, for the user search box"""
+    try:
+        term = request.args.get('q', '').strip()
+        limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+        role = request.args.get('role') or None
+        if role:
+            try:
+                role = RoleEnum(role).value
+            except ValueError:
+                raise ValidationError('Invalid role', 'role')
+        active_only = request.args.get('active', '').lower() in ['true', '1', 'yes']
+
+        matches = search_users(term, limit=limit, role=role, active_only=active_only) if term else []
+        return jsonify({
+            'success': True,
+            'data': {
+                'users': [
+                    {
+                        'id': entry.id,
+                        'full_name': f"{entry.first_name} {entry.last_name}",
+                        'email': entry.email,
+                        'student_id': entry.student_id,
+                        'role': entry.role,
+                        'is_active': entry.is_active
+                    }
+                    for entry in matches
+                ]
+            }
+        })
+
+    except ValidationError as e:
+        return jsonify({
+            'success': False,
+            'message': e.message,
+            'field': e.field
+        }), 400
+    except Exception as e:
+        logger.error(f"Error looking up users: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': 'Failed to look up users'
+        }), 500
+
 @admin_bp.route('/users', methods=['POST'])
 @login_required
 @admin_required
@@ -293,6 +349,88 @@ def create_user():
             'message': 'Failed to create user'
         }), 500
 
+@admin_bp.route('/users/import', methods=['POST'])
+@login_required
+@admin_required
+def bulk_import_users():
+    """Create users in bulk from an uploaded CSV/JSON file or a JSON body.
+
+    Columns: email, first_name, last_name, role, department, and optionally
+    campus, designation, student_id (MET IDs are allocated when blank), phone,
+    password (generated when blank) and is_active. Every row is validated
+    first; if any fails, nothing is created and the errors are listed by row.
+    ?dry_run=true only validates; ?send_welcome=false skips the welcome emails.
+    """
+    try:
+        upload = request.files.get('file')
+        if upload:
+            rows = parse_rows(upload.read().decode('utf-8-sig'), upload.filename)
+        else:
+            rows = parse_rows(request.get_json(silent=True) or {})
+        dry_run = request.args.get('dry_run', 'false').lower() in ('true', '1', 'yes')
+        send_welcome = request.args.get('send_welcome', 'true').lower() in ('true', '1', 'yes')
+
+        result = import_users(rows, send_welcome=send_welcome, dry_run=dry_run)
+        if dry_run:
+            return jsonify({
+                'success': True,
+                'message': f"{result['validated']} user(s) are valid",
+                'data': result
+            })
+
+        created = result['created']
+        # As with registration, temporary passwords are returned when they cannot be mailed
+        show_passwords = not result['welcome_emails'] or current_app.debug
+        users = []
+        for user, password in zip(created, result['passwords']):
+            item = {
+                'id': user['id'],
+                'email': user['email'],
+                'full_name': f"{user['first_name']} {user['last_name']}",
+                'role': user['role'].value,
+                'student_id': user['student_id']
+            }
+            if show_passwords:
+                item['temporary_password'] = password
+            users.append(item)
+
+        log_user_action(
+            action='create',
+            resource_type='user',
+            details={'bulk_import': True, 'created': len(created), 'welcome_emails': result['welcome_emails']}
+        )
+        logger.info(f"{len(created)} users imported by admin {current_user.id}")
+
+        return jsonify({
+            'success': True,
+            'message': f"{len(created)} user(s) imported",
+            'data': {
+                'created': len(created),
+                'welcome_emails': result['welcome_emails'],
+                'users': users
+            }
+        }), 201
+
+    except UserImportError as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'message': e.message,
+            'errors': e.errors[:200]
+        }), 400
+    except UnicodeDecodeError:
+        return jsonify({
+            'success': False,
+            'message': 'The file must be UTF-8 encoded'
+        }), 400
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error importing users: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': 'Failed to import users'
+        }), 500
+
 @admin_bp.route('/users/<int:user_id>', methods=['PUT'])
 @login_required
 @admin_required
@@ -463,15 +601,10 @@ def toggle_user_status(user_id):
 def get_all_requests():
     """Get all requests with filtering and pagination"""
     try:
-        from sqlalchemy.orm import joinedload
-        
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
         status_filter = request.args.get('status', '')
         search = request.args.get('search', '')
         
-        # Build query with eager loading of user relationship
-        query = ProjectRequest.query.options(joinedload(ProjectRequest.user))
+        query = ProjectRequest.query
         
         # Apply status filter
         if status_filter:
@@ -488,36 +621,36 @@ def get_all_requests():
                 request_id = int(search)
                 query = query.filter(ProjectRequest.id == request_id)
             except ValueError:
-                # If not a valid integer, search by title/description/user
-                search_term = f'%{search}%'
-                query = query.filter(
-                    or_(
-                        ProjectRequest.project_title.ilike(search_term),
-                        ProjectRequest.description.ilike(search_term)
-                    )
-                )
-        
-        # Order by most recent first
-        query = query.order_by(desc(ProjectRequest.submitted_at))
-        
-        # Paginate
-        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+                # If not a valid integer, full-text search title/purpose/description/requester
+                query = apply_search(query, search)
+        
+        # Load and render only the requested fields (?fields=), summary by default
+        fields = REQUEST_FIELDS.requested(REQUEST_SUMMARY)
+        query = REQUEST_FIELDS.load(query, fields, always=('submitted_at',))
+        
+        # Paginate, most recent first
+        requests, pagination = paginate_request(query, [ProjectRequest.submitted_at, ProjectRequest.id], cache_total=True)
+        # Older clients read these names
+        pagination.update({
+            'current_page': pagination['page'],
+            'total_pages': pagination['pages'],
+            'total_items': pagination['total']
+        })
         
         return jsonify({
             'success': True,
             'data': {
-                'requests': [req.to_dict() for req in pagination.items],
-                'pagination': {
-                    'current_page': pagination.page,
-                    'total_pages': pagination.pages,
-                    'total_items': pagination.total,
-                    'per_page': per_page,
-                    'has_next': pagination.has_next,
-                    'has_prev': pagination.has_prev
-                }
+                'requests': [REQUEST_FIELDS.dump(req, fields) for req in requests],
+                'pagination': pagination
             }
         })
         
+    except ValidationError as e:
+        return jsonify({
+            'success': False,
+            'message': e.message,
+            'field': e.field
+        }), 400
     except Exception as e:
         import traceback
         logger.error(f"Error fetching all requests: {str(e)}")
@@ -564,3 +697,83 @@ def close_request(request_id):
             'success': False,
             'message': 'Failed to close request'
         }), 500
+
+@admin_bp.route('/email/metrics', methods=['GET'])
+@login_required
+@admin_required
+def email_metrics():
+    """Outbound mail backpressure: queue lanes, outbox backlog, rate limiter and SMTP pool state"""
+    if current_user.role != RoleEnum.admin:
+        abort(403)
+    try:
+        from backend.models.email_outbox import EmailOutbox
+        from backend.services.rate_limiter import rate_limiter_stats
+        from backend.services.smtp_pool import smtp_pool_stats
+
+        email_queue = current_app.extensions.get('email_queue')
+        role_directory = current_app.extensions.get('role_directory')
+
+        outbox = {}
+        rows = db.session.query(
+            EmailOutbox.status, EmailOutbox.priority, func.count(EmailOutbox.id), func.min(EmailOutbox.created_at)
+        ).group_by(EmailOutbox.status, EmailOutbox.priority).all()
+        for status, priority, count, oldest in rows:
+            outbox.setdefault(status.value, {})[priority] = {
+                'count': count,
+                'oldest': oldest.isoformat() if oldest else None
+            }
+
+        return jsonify({
+            'success': True,
+            'data': {
+                'delivery_mode': current_app.config.get('EMAIL_DELIVERY_MODE'),
+                'queue': email_queue.stats() if email_queue else None,
+                'outbox': outbox,
+                'rate_limits': rate_limiter_stats(),
+                'smtp_pools': smtp_pool_stats(),
+                'role_directory': role_directory.stats() if role_directory else None
+            }
+        })
+    except Exception as e:
+        logger.error(f"Error fetching email metrics: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': 'Failed to fetch email metrics'
+        }), 500
+
+@admin_bp.route('/audit/writer-metrics', methods=['GET'])
+@login_required
+@admin_required
+def audit_writer_metrics():
+    """Buffered audit writer counters: queue depth, written, dropped, late and failed entries"""
+    if current_user.role != RoleEnum.admin:
+        abort(403)
+    writer = current_app.extensions.get('audit_writer')
+    return jsonify({
+        'success': True,
+        'data': {
+            'mode': current_app.config.get('AUDIT_LOG_MODE'),
+            'writer': writer.stats() if writer else None
+        }
+    })
+
+@admin_bp.route('/stats/metrics', methods=['GET'])
+@login_required
+@admin_required
+def stats_metrics():
+    """Dashboard statistics cache (source, hit rate, invalidations), SQLite write queue, read replica and query count metrics"""
+    if current_user.role != RoleEnum.admin:
+        abort(403)
+    stats_service = current_app.extensions.get('stats_service')
+    write_coordinator = current_app.extensions.get('write_coordinator')
+    read_router = current_app.extensions.get('read_router')
+    query_stats = current_app.extensions.get('query_stats')
+    return jsonify({
+        'success': True,
+        'data': {
+            'stats_service': stats_service.stats() if stats_service else None,
+            'write_coordinator': write_coordinator.stats() if write_coordinator else None,
+            'read_replicas': read_router.stats() if read_router else None,
+            'queries': query_stats.stats() if query_stats else None
+        }
+    })
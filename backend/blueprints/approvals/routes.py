@@ -8,12 +8,21 @@ from backend.models.project_request import ProjectRequest, StatusEnum
 from backend.models import db
 from backend.utils.database_utils import safe_db_operation
 from backend.services.email_service import EmailService
+from backend.services.stats_service import workflow_stats
+from backend.utils.serializers import REQUEST_CARD, REQUEST_FIELDS
 
 approvals_bp = Blueprint('approvals', __name__)
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+def card_query():
+    """ProjectRequest query loading only the columns the dashboard cards show"""
+    return REQUEST_FIELDS.load(ProjectRequest.query, REQUEST_CARD)
+
+def cards(requests):
+    return [REQUEST_FIELDS.dump(req, REQUEST_CARD) for req in requests]
+
 def role_required(required_role):
     """Decorator to require specific role"""
     from functools import wraps
@@ -41,13 +50,13 @@ def guide_dashboard():
     try:
         # Get requests that need guide approval (pending status)
         def get_pending_requests():
-            return ProjectRequest.query.filter_by(status=StatusEnum.pending).order_by(desc(ProjectRequest.submitted_at)).all()
+            return card_query().filter_by(status=StatusEnum.pending).order_by(desc(ProjectRequest.submitted_at)).all()
         
         requests = safe_db_operation(get_pending_requests)
         
         # Get guide's own approved requests
         def get_guide_approved():
-            return ProjectRequest.query.filter_by(
+            return card_query().filter_by(
                 status=StatusEnum.guide_approved,
                 guide_approved_by=current_user.id
             ).order_by(desc(ProjectRequest.guide_approved_at)).all()
@@ -55,24 +64,17 @@ def guide_dashboard():
         guide_approved = safe_db_operation(get_guide_approved)
         
         # Get overall statistics
-        total_users = User.query.count()
-        total_requests = ProjectRequest.query.count()
-        pending_requests_overall = ProjectRequest.query.filter_by(status=StatusEnum.pending).count()
-        approved_requests = ProjectRequest.query.filter_by(status=StatusEnum.approved).count()
-        students_count = User.query.filter_by(role=RoleEnum.student).count()
+        shared_stats = workflow_stats()
         
         return jsonify({
             'success': True,
             'data': {
-                'pending_requests': [req.to_dict() for req in requests],
-                'guide_approved': [req.to_dict() for req in guide_approved],
+                'pending_requests': cards(requests),
+                'guide_approved': cards(guide_approved),
                 'stats': {
                     'pending_count': len(requests),
                     'approved_count': len(guide_approved),
-                    'students_count': students_count,
-                    'total_requests': total_requests,
-                    'pending_requests': pending_requests_overall,
-                    'approved_requests': approved_requests
+                    **shared_stats
                 }
             }
         })
@@ -93,15 +95,14 @@ def guide_approve(request_id):
                 raise ValueError("Request is not in pending status")
             
             request_obj.approve_by_role('guide', current_user.id)
+            # Send email notification to next approver (HOD)
+            email_service = EmailService(transactional=True)
+            email_service.send_stage_approval_notification(request_obj, current_user, 'guide')
             db.session.commit()
             return request_obj
         
         request_obj = safe_db_operation(approve_request)
         
-        # Send email notification to next approver (HOD)
-        email_service = EmailService()
-        email_service.send_stage_approval_notification(request_obj, current_user, 'guide')
-        
         logger.info(f"Request {request_id} approved by guide {current_user.id}")
         
         return jsonify({
@@ -138,15 +139,14 @@ def guide_reject(request_id):
                 comments=reason
             )
             db.session.add(approval)
+            # Send email notification to user about rejection
+            email_service = EmailService(transactional=True)
+            email_service.send_stage_rejection_notification(request_obj, current_user, 'guide', reason)
             db.session.commit()
             return request_obj
         
         request_obj = safe_db_operation(reject_request)
         
-        # Send email notification to user about rejection
-        email_service = EmailService()
-        email_service.send_stage_rejection_notification(request_obj, current_user, 'guide', reason)
-        
         logger.info(f"Request {request_id} rejected by guide {current_user.id}")
         
         return jsonify({
@@ -169,10 +169,10 @@ def hod_dashboard():
         # - pending status from faculty/external users (who skip guide approval)
         def get_pending_requests():
             # Get guide-approved requests (from students)
-            guide_approved_requests = ProjectRequest.query.filter_by(status=StatusEnum.guide_approved).all()
+            guide_approved_requests = card_query().filter_by(status=StatusEnum.guide_approved).all()
             
             # Get pending requests from faculty/external users (who skip guide approval)
-            faculty_pending_requests = ProjectRequest.query.join(ProjectRequest.user).filter(
+            faculty_pending_requests = card_query().join(ProjectRequest.user).filter(
                 ProjectRequest.status == StatusEnum.pending,
                 User.role.in_([RoleEnum.faculty, RoleEnum.external])
             ).all()
@@ -189,7 +189,7 @@ def hod_dashboard():
         
         # Get HOD's own approved requests
         def get_hod_approved():
-            return ProjectRequest.query.filter_by(
+            return card_query().filter_by(
                 status=StatusEnum.hod_approved,
                 hod_approved_by=current_user.id
             ).order_by(desc(ProjectRequest.hod_approved_at)).all()
@@ -197,24 +197,17 @@ def hod_dashboard():
         hod_approved = safe_db_operation(get_hod_approved)
         
         # Get overall statistics
-        total_users = User.query.count()
-        total_requests = ProjectRequest.query.count()
-        pending_requests_overall = ProjectRequest.query.filter_by(status=StatusEnum.pending).count()
-        approved_requests = ProjectRequest.query.filter_by(status=StatusEnum.approved).count()
-        students_count = User.query.filter_by(role=RoleEnum.student).count()
+        shared_stats = workflow_stats()
         
         return jsonify({
             'success': True,
             'data': {
-                'pending_requests': [req.to_dict() for req in requests],
-                'hod_approved': [req.to_dict() for req in hod_approved],
+                'pending_requests': cards(requests),
+                'hod_approved': cards(hod_approved),
                 'stats': {
                     'pending_count': len(requests),
                     'approved_count': len(hod_approved),
-                    'students_count': students_count,
-                    'total_requests': total_requests,
-                    'pending_requests': pending_requests_overall,
-                    'approved_requests': approved_requests
+                    **shared_stats
                 }
             }
         })
@@ -245,15 +238,14 @@ def hod_approve(request_id):
                     raise ValueError("Faculty/External requests must be in pending status for HOD approval")
             
             request_obj.approve_by_role('hod', current_user.id)
+            # Send email notification to next approver (IT Services)
+            email_service = EmailService(transactional=True)
+            email_service.send_stage_approval_notification(request_obj, current_user, 'hod')
             db.session.commit()
             return request_obj
         
         request_obj = safe_db_operation(approve_request)
         
-        # Send email notification to next approver (IT Services)
-        email_service = EmailService()
-        email_service.send_stage_approval_notification(request_obj, current_user, 'hod')
-        
         logger.info(f"Request {request_id} approved by HOD {current_user.id}")
         
         return jsonify({
@@ -299,15 +291,14 @@ def hod_reject(request_id):
                 comments=reason
             )
             db.session.add(approval)
+            # Send email notification to user about rejection
+            email_service = EmailService(transactional=True)
+            email_service.send_stage_rejection_notification(request_obj, current_user, 'hod', reason)
             db.session.commit()
             return request_obj
         
         request_obj = safe_db_operation(reject_request)
         
-        # Send email notification to user about rejection
-        email_service = EmailService()
-        email_service.send_stage_rejection_notification(request_obj, current_user, 'hod', reason)
-        
         logger.info(f"Request {request_id} rejected by HOD {current_user.id}")
         
         return jsonify({
@@ -327,13 +318,13 @@ def it_services_dashboard():
     try:
         # Get requests that need IT Services approval (hod_approved status)
         def get_pending_requests():
-            return ProjectRequest.query.filter_by(status=StatusEnum.hod_approved).order_by(desc(ProjectRequest.hod_approved_at)).all()
+            return card_query().filter_by(status=StatusEnum.hod_approved).order_by(desc(ProjectRequest.hod_approved_at)).all()
         
         requests = safe_db_operation(get_pending_requests)
         
         # Get IT Services' own approved requests
         def get_it_services_approved():
-            return ProjectRequest.query.filter_by(
+            return card_query().filter_by(
                 status=StatusEnum.it_services_approved,
                 it_services_approved_by=current_user.id
             ).order_by(desc(ProjectRequest.it_services_approved_at)).all()
@@ -341,24 +332,17 @@ def it_services_dashboard():
         it_services_approved = safe_db_operation(get_it_services_approved)
         
         # Get overall statistics
-        total_users = User.query.count()
-        total_requests = ProjectRequest.query.count()
-        pending_requests_overall = ProjectRequest.query.filter_by(status=StatusEnum.pending).count()
-        approved_requests = ProjectRequest.query.filter_by(status=StatusEnum.approved).count()
-        students_count = User.query.filter_by(role=RoleEnum.student).count()
+        shared_stats = workflow_stats()
         
         return jsonify({
             'success': True,
             'data': {
-                'pending_requests': [req.to_dict() for req in requests],
-                'it_services_approved': [req.to_dict() for req in it_services_approved],
+                'pending_requests': cards(requests),
+                'it_services_approved': cards(it_services_approved),
                 'stats': {
                     'pending_count': len(requests),
                     'approved_count': len(it_services_approved),
-                    'students_count': students_count,
-                    'total_requests': total_requests,
-                    'pending_requests': pending_requests_overall,
-                    'approved_requests': approved_requests
+                    **shared_stats
                 }
             }
         })
@@ -379,15 +363,14 @@ def it_services_approve(request_id):
                 raise ValueError("Request must be approved by HOD before IT Services approval")
             
             request_obj.approve_by_role('it_services', current_user.id)
+            # Send email notification to next approver (Admin)
+            email_service = EmailService(transactional=True)
+            email_service.send_stage_approval_notification(request_obj, current_user, 'it_services')
             db.session.commit()
             return request_obj
         
         request_obj = safe_db_operation(approve_request)
         
-        # Send email notification to next approver (Admin)
-        email_service = EmailService()
-        email_service.send_stage_approval_notification(request_obj, current_user, 'it_services')
-        
         logger.info(f"Request {request_id} approved by IT Services {current_user.id}")
         
         return jsonify({
@@ -423,15 +406,14 @@ def it_services_reject(request_id):
                 comments=reason
             )
             db.session.add(approval)
+            # Send email notification to user about rejection
+            email_service = EmailService(transactional=True)
+            email_service.send_stage_rejection_notification(request_obj, current_user, 'it_services', reason)
             db.session.commit()
             return request_obj
         
         request_obj = safe_db_operation(reject_request)
         
-        # Send email notification to user about rejection
-        email_service = EmailService()
-        email_service.send_stage_rejection_notification(request_obj, current_user, 'it_services', reason)
-        
         logger.info(f"Request {request_id} rejected by IT Services {current_user.id}")
         
         return jsonify({
@@ -456,15 +438,14 @@ def admin_final_approve(request_id):
                 raise ValueError("Request is not in IT Services approved status")
             
             request_obj.approve_by_role('admin', current_user.id)
+            # Send final approval notification to user
+            email_service = EmailService(transactional=True)
+            email_service.send_approval_notification(request_obj, current_user)
             db.session.commit()
             return request_obj
         
         request_obj = safe_db_operation(approve_request)
         
-        # Send final approval notification to user
-        email_service = EmailService()
-        email_service.send_approval_notification(request_obj, current_user)
-        
         logger.info(f"Request {request_id} given final approval by admin {current_user.id}")
         
         return jsonify({
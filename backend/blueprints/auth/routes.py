@@ -1012,26 +1012,9 @@ def reset_forgotten_password():
 
 def send_otp_email(email, full_name, otp):
     """Send OTP email to user"""
-    import smtplib
-    from email.mime.text import MIMEText
-    from email.mime.multipart import MIMEMultipart
-    
-    # Email configuration from config
-    smtp_server = current_app.config.get('SMTP_SERVER')
-    smtp_port = current_app.config.get('SMTP_PORT')
-    smtp_username = current_app.config.get('SMTP_USERNAME')
-    smtp_password = current_app.config.get('SMTP_PASSWORD')
-    from_email = current_app.config.get('FROM_EMAIL')
-    from_name = current_app.config.get('FROM_NAME')
-    
-    if not all([smtp_server, smtp_port, smtp_username, smtp_password, from_email]):
-        raise Exception("Email configuration is incomplete")
-    
-    # Create message
-    msg = MIMEMultipart()
-    msg['From'] = f"{from_name} <{from_email}>"
-    msg['To'] = email
-    msg['Subject'] = "Password Reset Verification Code - METIS Lab"
+    from backend.services.email_queue import EmailPriority
+
+    subject = "Password Reset Verification Code - METIS Lab"
     
     # Email body
     body = f"""
@@ -1049,45 +1032,21 @@ def send_otp_email(email, full_name, otp):
     METIS Lab Team
     """
     
-    msg.attach(MIMEText(body, 'plain'))
-    
-    # Send email
-    server = smtplib.SMTP(smtp_server, smtp_port)
-    server.starttls()
-    server.login(smtp_username, smtp_password)
-    text = msg.as_string()
-    server.sendmail(from_email, email, text)
-    server.quit()
+    # Critical priority: sent inline, ahead of any notification backlog
+    if not EmailService().send_email(email, subject, None, body, priority=EmailPriority.critical):
+        raise Exception("Failed to send verification code email")
 
 def send_password_change_notification(email, full_name, reset_type="manual"):
     """Send password change notification email to user"""
-    import smtplib
-    from email.mime.text import MIMEText
-    from email.mime.multipart import MIMEMultipart
-    
-    # Email configuration from config
-    smtp_server = current_app.config.get('SMTP_SERVER')
-    smtp_port = current_app.config.get('SMTP_PORT')
-    smtp_username = current_app.config.get('SMTP_USERNAME')
-    smtp_password = current_app.config.get('SMTP_PASSWORD')
-    from_email = current_app.config.get('FROM_EMAIL')
-    from_name = current_app.config.get('FROM_NAME')
-    
-    if not all([smtp_server, smtp_port, smtp_username, smtp_password, from_email]):
-        raise Exception("Email configuration is incomplete")
-    
-    # Create message
-    msg = MIMEMultipart()
-    msg['From'] = f"{from_name} <{from_email}>"
-    msg['To'] = email
+    from backend.services.email_queue import EmailPriority
     
     # Different subject and content based on reset type
     if reset_type == "forgot_password":
-        msg['Subject'] = "Password Successfully Reset - METIS Lab"
+        subject = "Password Successfully Reset - METIS Lab"
         action_text = "reset via email verification"
         security_note = "This reset was completed using the verification code sent to this email address."
     else:
-        msg['Subject'] = "Password Changed Successfully - METIS Lab"
+        subject = "Password Changed Successfully - METIS Lab"
         action_text = "changed from your account dashboard"
         security_note = "This change was made while you were logged into your account."
     
@@ -1123,15 +1082,8 @@ def send_password_change_notification(email, full_name, reset_type="manual"):
     This is an automated security notification. Please do not reply to this email.
     """
     
-    msg.attach(MIMEText(body, 'plain'))
-    
-    # Send email
-    server = smtplib.SMTP(smtp_server, smtp_port)
-    server.starttls()
-    server.login(smtp_username, smtp_password)
-    text = msg.as_string()
-    server.sendmail(from_email, email, text)
-    server.quit()
+    if not EmailService().send_email(email, subject, None, body, priority=EmailPriority.critical):
+        raise Exception("Failed to send password change notification")
 
 @auth_bp.route('/test-route', methods=['GET', 'POST'])
 def test_route():
@@ -10,6 +10,8 @@ from backend.models import db
 from backend.utils.validation import validate_request_data
 from backend.utils.error_handlers import ValidationError, BusinessLogicError
 from backend.middleware.audit_middleware import log_user_action
+from backend.utils.pagination import paginate_request
+from backend.utils.serializers import REQUEST_FIELDS, REQUEST_SUMMARY
 
 projects_bp = Blueprint('projects', __name__)
 
@@ -21,8 +23,6 @@ logger = logging.getLogger(__name__)
 def list_requests():
     """Get all project requests for the current user"""
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
         status_filter = request.args.get('status')
         
         # Build query
@@ -31,26 +31,28 @@ def list_requests():
         if status_filter:
             query = query.filter(ProjectRequest.status == status_filter)
         
+        fields = REQUEST_FIELDS.requested(REQUEST_SUMMARY)
+        query = REQUEST_FIELDS.load(query, fields, always=('submitted_at',))
+        
         # Paginate results
-        requests = query.order_by(desc(ProjectRequest.submitted_at)).paginate(
-            page=page, per_page=per_page, error_out=False
+        requests, pagination = paginate_request(
+            query, [ProjectRequest.submitted_at, ProjectRequest.id], default_per_page=10
         )
         
         return jsonify({
             'success': True,
             'data': {
-                'requests': [req.to_dict() for req in requests.items],
-                'pagination': {
-                    'page': page,
-                    'per_page': per_page,
-                    'total': requests.total,
-                    'pages': requests.pages,
-                    'has_next': requests.has_next,
-                    'has_prev': requests.has_prev
-                }
+                'requests': [REQUEST_FIELDS.dump(req, fields) for req in requests],
+                'pagination': pagination
             }
         })
         
+    except ValidationError as e:
+        return jsonify({
+            'success': False,
+            'message': e.message,
+            'field': e.field
+        }), 400
     except Exception as e:
         logger.error(f"Error retrieving user requests: {str(e)}")
         return jsonify({
@@ -133,24 +135,13 @@ def submit_request():
         new_request.description += additional_info
 
         db.session.add(new_request)
-        db.session.commit()
-
-        # Log request submission
-        log_user_action(
-            action='create',
-            resource_type='project_request',
-            resource_id=new_request.id,
-            details={
-                'project_title': new_request.project_title,
-                'priority': new_request.priority.value,
-                'form_data': form_data
-            }
-        )
+        # Flush for the request ID; notifications below are committed with the request
+        db.session.flush()
 
         # Trigger email notification to admins
         try:
             from backend.services.email_service import EmailService
-            email_service = EmailService()
+            email_service = EmailService(transactional=True)
             email_service.send_new_request_notification(new_request)
         except Exception as e:
             logger.error(f"Failed to send new request notification: {str(e)}")
@@ -160,7 +151,7 @@ def submit_request():
         if new_request.guide_email:
             try:
                 from backend.services.email_service import EmailService
-                email_service = EmailService()
+                email_service = EmailService(transactional=True)
                 guide_subject = f"METIS Lab Access Request - {current_user.full_name}"
                 guide_html = f"""
                 <html><body style='font-family:Arial,sans-serif;'>
@@ -195,6 +186,20 @@ def submit_request():
                 logger.error(f"Failed to send guide notification: {str(e)}")
                 # Don't fail the request submission if email fails
 
+        db.session.commit()
+
+        # Log request submission
+        log_user_action(
+            action='create',
+            resource_type='project_request',
+            resource_id=new_request.id,
+            details={
+                'project_title': new_request.project_title,
+                'priority': new_request.priority.value,
+                'form_data': form_data
+            }
+        )
+
         logger.info(f"New project request submitted by user {current_user.id}: {new_request.project_title}")
 
         # Different success messages based on user role
@@ -3,12 +3,18 @@ from flask import Blueprint, request, jsonify, render_template
 from flask_login import login_required, current_user
 from sqlalchemy import desc, func
 from datetime import datetime, timedelta
-from backend.models.user import User
+from backend.models.user import User, NotificationPreferenceEnum
 from backend.models.project_request import ProjectRequest, StatusEnum
 from backend.models.nda import NDA
 from backend.models.approval import Approval
 from backend.models import db
 from backend.middleware.audit_middleware import log_user_action
+from backend.services.stats_service import user_stats
+from backend.services.request_search import apply_search
+from backend.utils.error_handlers import ValidationError
+from backend.utils.pagination import paginate_request
+from backend.utils.serializers import REQUEST_FIELDS, REQUEST_SUMMARY
+from backend.utils.loader_policy import approval_rows
 
 user_dashboard_bp = Blueprint('user_dashboard', __name__)
 
@@ -43,24 +49,13 @@ def dashboard():
             approved_requests = 0
             rejected_requests = 0
         else:
-            # Get user's request statistics for students/faculty
-            total_requests = ProjectRequest.query.filter_by(user_id=current_user.id).count()
-            pending_requests = ProjectRequest.query.filter_by(
-                user_id=current_user.id, 
-                status=StatusEnum.pending
-            ).count()
-            hod_submitted = ProjectRequest.query.filter_by(
-                user_id=current_user.id, 
-                status=StatusEnum.hod_approved
-            ).count()
-            approved_requests = ProjectRequest.query.filter_by(
-                user_id=current_user.id, 
-                status=StatusEnum.approved
-            ).count()
-            rejected_requests = ProjectRequest.query.filter_by(
-                user_id=current_user.id, 
-                status=StatusEnum.rejected
-            ).count()
+            # Get user's request statistics for students/faculty (cached, one counters read on a miss)
+            request_counters = user_stats(current_user.id)
+            total_requests = request_counters['total']
+            pending_requests = request_counters['by_status'][StatusEnum.pending.value]
+            hod_submitted = request_counters['by_status'][StatusEnum.hod_approved.value]
+            approved_requests = request_counters['by_status'][StatusEnum.approved.value]
+            rejected_requests = request_counters['by_status'][StatusEnum.rejected.value]
 
         # Get recent requests (last 5) - only for non-external users
         if current_user.role.value == 'external':
@@ -79,13 +74,7 @@ def dashboard():
             ).order_by(desc(ProjectRequest.submitted_at)).limit(5).all()
 
             # Get requests by status for progress tracking
-            requests_by_status = {}
-            for status in StatusEnum:
-                count = ProjectRequest.query.filter_by(
-                    user_id=current_user.id, 
-                    status=status
-                ).count()
-                requests_by_status[status.value] = count
+            requests_by_status = dict(request_counters['by_status'])
 
             # Check NDA status
             nda = NDA.query.filter_by(user_id=current_user.id).first()
@@ -237,8 +226,6 @@ def profile():
 def my_requests():
     """Get all requests for the current user with filtering"""
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
         status_filter = request.args.get('status')
         priority_filter = request.args.get('priority')
         search = request.args.get('search')
@@ -253,31 +240,30 @@ def my_requests():
             query = query.filter(ProjectRequest.priority == priority_filter)
         
         if search:
-            search_term = f"%{search}%"
-            query = query.filter(
-                ProjectRequest.project_title.ilike(search_term)
-            )
+            query = apply_search(query, search)
+        
+        fields = REQUEST_FIELDS.requested(REQUEST_SUMMARY)
+        query = REQUEST_FIELDS.load(query, fields, always=('submitted_at',))
         
         # Paginate results
-        requests = query.order_by(desc(ProjectRequest.submitted_at)).paginate(
-            page=page, per_page=per_page, error_out=False
+        requests, pagination = paginate_request(
+            query, [ProjectRequest.submitted_at, ProjectRequest.id], default_per_page=10
         )
         
         return jsonify({
             'success': True,
             'data': {
-                'requests': [req.to_dict() for req in requests.items],
-                'pagination': {
-                    'page': page,
-                    'per_page': per_page,
-                    'total': requests.total,
-                    'pages': requests.pages,
-                    'has_next': requests.has_next,
-                    'has_prev': requests.has_prev
-                }
+                'requests': [REQUEST_FIELDS.dump(req, fields) for req in requests],
+                'pagination': pagination
             }
         })
         
+    except ValidationError as e:
+        return jsonify({
+            'success': False,
+            'message': e.message,
+            'field': e.field
+        }), 400
     except Exception as e:
         logger.error(f"Error retrieving user requests: {str(e)}")
         return jsonify({
@@ -466,7 +452,7 @@ def get_request_details(request_id):
             }), 404
         
         # Get approval history if any
-        approvals = Approval.query.filter_by(project_request_id=request_id).all()
+        approvals = Approval.query.options(*approval_rows()).filter_by(project_request_id=request_id).all()
         
         return jsonify({
             'success': True,
@@ -645,3 +631,52 @@ def notifications():
             'success': False,
             'message': 'Failed to retrieve notifications'
         }), 500
+
+@user_dashboard_bp.route('/notification-preferences', methods=['GET', 'PUT'])
+@login_required
+def notification_preferences():
+    """Get or update how workflow notifications are delivered (immediate, hourly or daily digest)"""
+    if request.method == 'GET':
+        return jsonify({
+            'success': True,
+            'data': {
+                'notification_preference': current_user.notification_preference.value,
+                'options': [p.value for p in NotificationPreferenceEnum]
+            }
+        })
+
+    try:
+        data = request.get_json() or {}
+        try:
+            preference = NotificationPreferenceEnum(data.get('notification_preference'))
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'message': f"notification_preference must be one of: {', '.join(p.value for p in NotificationPreferenceEnum)}"
+            }), 400
+
+        if preference != current_user.notification_preference:
+            current_user.notification_preference = preference
+            current_user.updated_at = datetime.utcnow()
+            db.session.commit()
+
+            log_user_action(
+                action='update',
+                resource_type='user',
+                resource_id=current_user.id,
+                details={'updated_fields': ['notification_preference']}
+            )
+
+        return jsonify({
+            'success': True,
+            'message': 'Notification preference updated successfully',
+            'data': {'notification_preference': preference.value}
+        })
+
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error updating notification preference: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': 'Failed to update notification preference'
+        }), 500
@@ -0,0 +1,166 @@
+"""
+Flask CLI commands (run with `flask --app app <group> <command>`)
+"""
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+email_cli = AppGroup('email', help='Outbound email maintenance.')
+audit_cli = AppGroup('audit', help='Audit log maintenance.')
+stats_cli = AppGroup('stats', help='Dashboard statistics maintenance.')
+search_cli = AppGroup('search', help='Project request search index maintenance.')
+users_cli = AppGroup('users', help='User administration.')
+
+
+@email_cli.command('drain-outbox')
+@click.option('--once', is_flag=True, help='Exit once the outbox has no due messages.')
+@click.option('--batch-size', type=int, default=None, help='Rows claimed per batch.')
+@click.option('--interval', type=float, default=5.0, show_default=True, help='Seconds to wait when the outbox is empty.')
+def drain_outbox(once, batch_size, interval):
+    """Deliver pending rows from the email outbox."""
+    from backend.services.email_service import EmailService
+    from backend.services.outbox_drainer import OutboxDrainer
+
+    config = current_app.config
+    drainer = OutboxDrainer(
+        EmailService(),
+        batch_size=batch_size or config.get('OUTBOX_BATCH_SIZE', 50),
+        lease_seconds=config.get('OUTBOX_LEASE_SECONDS', 300),
+        max_attempts=config.get('OUTBOX_MAX_ATTEMPTS', 5),
+        retry_backoff=config.get('OUTBOX_RETRY_BACKOFF', 60)
+    )
+    click.echo(f"Draining email outbox as {drainer.worker_id}")
+    try:
+        sent, failed = drainer.run(interval=interval, once=once)
+    except KeyboardInterrupt:
+        return
+    click.echo(f"Outbox drained: {sent} sent, {failed} failed")
+
+
+@email_cli.command('purge-outbox')
+@click.option('--days', type=int, default=None, help='Keep sent and failed rows newer than this (default OUTBOX_RETENTION_DAYS).')
+def purge_outbox(days):
+    """Delete sent and failed rows from the email outbox."""
+    from backend.services.outbox_drainer import configured_drainer
+
+    days = days if days is not None else current_app.config.get('OUTBOX_RETENTION_DAYS', 30)
+    deleted = configured_drainer().purge(days)
+    click.echo(f"Deleted {deleted} outbox row(s) older than {days} day(s)")
+
+
+@email_cli.command('send-digests')
+@click.option('--frequency', type=click.Choice(['hourly', 'daily']), required=True,
+              help='Which digest subscribers to send to.')
+def send_digests_command(frequency):
+    """Send notification digests to approvers with the given preference."""
+    from backend.services.digest_service import send_digests
+
+    sent, failed = send_digests(frequency)
+    click.echo(f"{frequency.title()} digests: {sent} sent, {failed} failed")
+
+
+@audit_cli.command('ensure-partitions')
+@click.option('--months-ahead', type=int, default=3, show_default=True)
+def ensure_partitions_command(months_ahead):
+    """Create upcoming monthly audit_logs partitions (PostgreSQL)."""
+    from backend.services.audit_archive import ensure_partitions
+
+    created = ensure_partitions(months_ahead)
+    click.echo(f"Created {len(created)} partition(s){': ' + ', '.join(created) if created else ''}")
+
+
+@audit_cli.command('archive')
+@click.option('--retention-months', type=int, default=None, help='Months kept in the database.')
+@click.option('--dry-run', is_flag=True, help='Only report what would be archived.')
+def archive_command(retention_months, dry_run):
+    """Move audit log months older than the retention period to compressed archives."""
+    from backend.services.audit_archive import archive_audit_logs, ensure_partitions
+
+    config = current_app.config
+    summaries = archive_audit_logs(
+        config['AUDIT_ARCHIVE_DIR'],
+        retention_months=retention_months if retention_months is not None else config.get('AUDIT_RETENTION_MONTHS', 6),
+        chunk_rows=config.get('AUDIT_ARCHIVE_CHUNK_ROWS', 1000),
+        dry_run=dry_run
+    )
+    for summary in summaries:
+        click.echo(f"{summary['month']}: {summary['rows']} rows{' (dry run)' if dry_run else ''}")
+    if not summaries:
+        click.echo("Nothing to archive")
+    if not dry_run:
+        ensure_partitions()
+
+
+@stats_cli.command('reconcile')
+@click.option('--dry-run', is_flag=True, help='Only report drifted counters.')
+def reconcile_command(dry_run):
+    """Rebuild the dashboard counters from the users and project_requests tables."""
+    from backend.services.stats_counters import reconcile_counters
+
+    drift = reconcile_counters(dry_run=dry_run)
+    for key in sorted(drift):
+        stored, actual = drift[key]
+        click.echo(f"{key}: stored {stored}, actual {actual}")
+    if not drift:
+        click.echo("Counters are in step")
+    elif not dry_run:
+        click.echo(f"Rebuilt counters; {len(drift)} key(s) corrected")
+
+
+@search_cli.command('reindex')
+def reindex_command():
+    """Create the full-text search index if missing and refill it from project_requests."""
+    from backend.services.request_search import ensure_search_index
+
+    backend = ensure_search_index(rebuild=True)
+    if backend is None:
+        raise click.ClickException('No full-text search support on this database; searches use ILIKE')
+    click.echo(f"Search index rebuilt ({backend})")
+
+
+@users_cli.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--dry-run', is_flag=True, help='Only validate the file.')
+@click.option('--no-welcome', is_flag=True, help='Do not send welcome emails.')
+@click.option('--passwords-out', type=click.Path(dir_okay=False, writable=True),
+              help='Write email, student ID and temporary password of each user to this CSV.')
+def import_users_command(path, dry_run, no_welcome, passwords_out):
+    """Create users from a CSV or JSON file (same columns as POST /admin/users/import)."""
+    import csv
+    from backend.services.user_import import UserImportError, deliver_welcome_emails, import_users, parse_rows
+
+    with open(path, encoding='utf-8-sig') as f:
+        content = f.read()
+    try:
+        result = import_users(parse_rows(content, path), send_welcome=not no_welcome, dry_run=dry_run, deliver=False)
+    except UserImportError as e:
+        for error in e.errors:
+            field = f" [{error['field']}]" if error['field'] else ''
+            click.echo(f"row {error['row']}{field}: {error['message']}", err=True)
+        raise click.ClickException(e.message)
+
+    if dry_run:
+        click.echo(f"{result['validated']} user(s) are valid")
+        return
+    if passwords_out:
+        with open(passwords_out, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['email', 'student_id', 'temporary_password'])
+            for user, password in zip(result['created'], result['passwords']):
+                writer.writerow([user['email'], user['student_id'], password])
+    click.echo(f"{len(result['created'])} user(s) imported, {result['welcome_emails']} welcome email(s) staged")
+    if result['welcome_emails'] and current_app.config.get('EMAIL_DELIVERY_MODE') != 'outbox':
+        # No outbox drainer runs in this mode; send them before the command exits.
+        # Any left waiting for a retry are sent by the web processes' background drain
+        sent, failed = deliver_welcome_emails()
+        click.echo(f"Welcome emails: {sent} sent, {failed} failed")
+    if not result['welcome_emails'] and not passwords_out:
+        click.echo("No welcome emails were sent; use --passwords-out to keep the temporary passwords", err=True)
+
+
+def register_commands(app):
+    app.cli.add_command(email_cli)
+    app.cli.add_command(audit_cli)
+    app.cli.add_command(stats_cli)
+    app.cli.add_command(search_cli)
+    app.cli.add_command(users_cli)
@@ -37,6 +37,31 @@ class Config:
     
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Read replicas (comma-separated URLs) for the SELECTs of GET requests, round-robin per request.
+    # After a write, the user's reads stay on the primary for DATABASE_READ_YOUR_WRITES_SECONDS
+    DATABASE_READ_URLS = os.environ.get('DATABASE_READ_URLS', '')
+    DATABASE_READ_HEALTH_INTERVAL = int(os.environ.get('DATABASE_READ_HEALTH_INTERVAL', 10))  # seconds
+    DATABASE_READ_MAX_LAG = int(os.environ.get('DATABASE_READ_MAX_LAG', 10))  # seconds (PostgreSQL replicas)
+    DATABASE_READ_YOUR_WRITES_SECONDS = int(os.environ.get('DATABASE_READ_YOUR_WRITES_SECONDS', 5))
+
+    # SQLite profile, applied to every new connection (ignored for other databases).
+    # With read-only connections on, GET requests read through a separate mode=ro engine
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT = int(os.environ.get('SQLITE_BUSY_TIMEOUT', 60000))  # milliseconds
+    SQLITE_CACHE_SIZE = int(os.environ.get('SQLITE_CACHE_SIZE', 10000))  # pages
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 268435456))  # bytes
+    SQLITE_READ_ONLY_CONNECTIONS = os.environ.get('SQLITE_READ_ONLY_CONNECTIONS', 'true').lower() in ('true', '1', 'yes')
+
+    # Opt-in SQLite write coordinator: safe_db_operation writes queue in arrival order per process,
+    # take an flock on SQLITE_WRITE_LOCK_FILE (default <database>.writelock) and run in BEGIN IMMEDIATE
+    SQLITE_WRITE_COORDINATOR = os.environ.get('SQLITE_WRITE_COORDINATOR', 'false').lower() in ('true', '1', 'yes')
+    SQLITE_WRITE_LOCK_FILE = os.environ.get('SQLITE_WRITE_LOCK_FILE')
+    SQLITE_WRITE_TIMEOUT = int(os.environ.get('SQLITE_WRITE_TIMEOUT', 30))  # seconds to wait for a turn
+    SQLITE_WRITE_MAX_ATTEMPTS = int(os.environ.get('SQLITE_WRITE_MAX_ATTEMPTS', 5))
+    SQLITE_WRITE_BACKOFF_BASE = float(os.environ.get('SQLITE_WRITE_BACKOFF_BASE', 0.05))  # seconds
+    SQLITE_WRITE_BACKOFF_MAX = float(os.environ.get('SQLITE_WRITE_BACKOFF_MAX', 2.0))  # seconds
+
     UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER', os.path.join(basedir, 'uploads'))
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16 MB max upload size
 
@@ -53,6 +78,86 @@ class Config:
     FROM_NAME = os.environ.get('FROM_NAME', 'METIS Lab')
     BASE_URL = os.environ.get('BASE_URL', 'http://localhost:5000')
 
+    # Outbound email delivery: 'queued' hands messages to background workers so
+    # request handlers never wait on SMTP; 'outbox' writes them to the email_outbox
+    # table in the caller's transaction for `flask email drain-outbox` to send;
+    # 'sync' sends inline (useful for tests).
+    # Only 'outbox' survives a crash: in 'queued' and 'sync' mode, workflow notifications
+    # are held in memory until the commit and lost if the process dies before sending.
+    # Production deployments should run 'outbox' with a drain-outbox worker (see README)
+    EMAIL_DELIVERY_MODE = os.environ.get('EMAIL_DELIVERY_MODE', 'queued')
+    EMAIL_QUEUE_WORKERS = int(os.environ.get('EMAIL_QUEUE_WORKERS', 2))
+    EMAIL_QUEUE_MAX_SIZE = int(os.environ.get('EMAIL_QUEUE_MAX_SIZE', 1000))
+    EMAIL_MAX_ATTEMPTS = int(os.environ.get('EMAIL_MAX_ATTEMPTS', 4))
+    EMAIL_RETRY_BACKOFF = float(os.environ.get('EMAIL_RETRY_BACKOFF', 2.0))  # seconds, doubled per attempt
+
+    # Pooled SMTP sessions: reuse authenticated connections across messages
+    SMTP_TIMEOUT = int(os.environ.get('SMTP_TIMEOUT', 10))
+    SMTP_USE_TLS = os.environ.get('SMTP_USE_TLS', 'true').lower() == 'true'  # STARTTLS; off for local test sinks
+    SMTP_POOL_SIZE = int(os.environ.get('SMTP_POOL_SIZE', 4))
+    SMTP_POOL_IDLE_TIMEOUT = int(os.environ.get('SMTP_POOL_IDLE_TIMEOUT', 60))  # seconds
+    SMTP_MAX_MESSAGES_PER_CONNECTION = int(os.environ.get('SMTP_MAX_MESSAGES_PER_CONNECTION', 100))
+    SMTP_MAX_RECIPIENTS = int(os.environ.get('SMTP_MAX_RECIPIENTS', 50))  # RCPT TO per transaction
+
+    # Token-bucket limit on SMTP transactions per provider (per process; off unless set,
+    # e.g. 20 for Gmail's sending quota). The reserve is only spent by critical mail (OTP, credentials).
+    SMTP_RATE_LIMIT_PER_MINUTE = int(os.environ.get('SMTP_RATE_LIMIT_PER_MINUTE', 0))
+    SMTP_RATE_LIMIT_BURST = int(os.environ.get('SMTP_RATE_LIMIT_BURST', 10))
+    SMTP_RATE_LIMIT_CRITICAL_RESERVE = int(os.environ.get('SMTP_RATE_LIMIT_CRITICAL_RESERVE', 2))
+    SMTP_RATE_LIMIT_TIMEOUT = int(os.environ.get('SMTP_RATE_LIMIT_TIMEOUT', 60))  # seconds to wait for a token
+
+    # Cache of approvers by role for notification fan-outs. Invalidated on User changes;
+    # other workers notice through the version file's mtime (default: one per database in the temp dir)
+    ROLE_DIRECTORY_TTL = int(os.environ.get('ROLE_DIRECTORY_TTL', 300))  # seconds
+    ROLE_DIRECTORY_VERSION_FILE = os.environ.get('ROLE_DIRECTORY_VERSION_FILE')
+
+    # Dashboard statistics: 'counters' reads stats_counters, 'grouped' runs one GROUP BY per table.
+    # Snapshots are cached per process and dropped on commits that change users or requests
+    STATS_SOURCE = os.environ.get('STATS_SOURCE', 'counters')
+    STATS_CACHE_TTL = int(os.environ.get('STATS_CACHE_TTL', 30))  # seconds
+
+    # In-memory prefix index behind the admin user autocomplete. Patched on this process's
+    # commits; rebuilt after this long so changes made by other workers show up
+    USER_LOOKUP_REBUILD_SECONDS = int(os.environ.get('USER_LOOKUP_REBUILD_SECONDS', 300))
+
+    # Per-request SQL query counts. A statement shape run QUERY_N_PLUS_ONE_THRESHOLD times in one
+    # request is logged as a likely N+1; X-Query-* response headers are sent in debug or when enabled
+    QUERY_COUNTER_ENABLED = os.environ.get('QUERY_COUNTER_ENABLED', 'true').lower() in ('true', '1', 'yes')
+    QUERY_COUNTER_HEADERS = os.environ.get('QUERY_COUNTER_HEADERS', 'false').lower() in ('true', '1', 'yes')
+    QUERY_N_PLUS_ONE_THRESHOLD = int(os.environ.get('QUERY_N_PLUS_ONE_THRESHOLD', 5))
+    QUERY_COUNT_WARNING = int(os.environ.get('QUERY_COUNT_WARNING', 50))  # log requests running more
+
+    # Bulk user import (/admin/users/import, `flask users import`). Passwords are hashed in a thread
+    # pool (0 = one worker per CPU); USER_IMPORT_HASH_METHOD overrides werkzeug's default hash method
+    USER_IMPORT_MAX_ROWS = int(os.environ.get('USER_IMPORT_MAX_ROWS', 10000))
+    USER_IMPORT_CHUNK_SIZE = int(os.environ.get('USER_IMPORT_CHUNK_SIZE', 500))  # rows per executemany
+    USER_IMPORT_HASH_WORKERS = int(os.environ.get('USER_IMPORT_HASH_WORKERS', 0))
+    USER_IMPORT_HASH_METHOD = os.environ.get('USER_IMPORT_HASH_METHOD')
+
+    # Admin-wide list endpoints cache their COUNT(*) totals per process for this long (seconds);
+    # commits in the same process clear the counts over the tables they change
+    PAGINATION_COUNT_TTL = int(os.environ.get('PAGINATION_COUNT_TTL', 30))
+
+    # Audit log: 'buffered' writes entries in background batches on a separate
+    # connection; 'sync' adds and commits each entry on the request's session
+    AUDIT_LOG_MODE = os.environ.get('AUDIT_LOG_MODE', 'buffered')
+    AUDIT_BATCH_SIZE = int(os.environ.get('AUDIT_BATCH_SIZE', 100))
+    AUDIT_FLUSH_INTERVAL_MS = int(os.environ.get('AUDIT_FLUSH_INTERVAL_MS', 200))
+    AUDIT_QUEUE_SIZE = int(os.environ.get('AUDIT_QUEUE_SIZE', 10000))  # entries beyond this are dropped
+    AUDIT_LATE_AFTER = float(os.environ.get('AUDIT_LATE_AFTER', 5.0))  # seconds queued before counted late
+
+    # Audit log retention: older months are moved to gzip JSONL segments by `flask audit archive`
+    AUDIT_RETENTION_MONTHS = int(os.environ.get('AUDIT_RETENTION_MONTHS', 6))
+    AUDIT_ARCHIVE_DIR = os.environ.get('AUDIT_ARCHIVE_DIR', os.path.join(os.path.dirname(basedir), 'logs', 'audit'))
+    AUDIT_ARCHIVE_CHUNK_ROWS = int(os.environ.get('AUDIT_ARCHIVE_CHUNK_ROWS', 1000))  # rows per gzip member
+
+    # Email outbox drainer
+    OUTBOX_BATCH_SIZE = int(os.environ.get('OUTBOX_BATCH_SIZE', 50))
+    OUTBOX_LEASE_SECONDS = int(os.environ.get('OUTBOX_LEASE_SECONDS', 300))  # claim expires if a drainer dies
+    OUTBOX_MAX_ATTEMPTS = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', 5))
+    OUTBOX_RETRY_BACKOFF = int(os.environ.get('OUTBOX_RETRY_BACKOFF', 60))  # seconds, doubled per attempt
+    OUTBOX_RETENTION_DAYS = int(os.environ.get('OUTBOX_RETENTION_DAYS', 30))  # sent/failed rows kept by `flask email purge-outbox`
+
 
     # Security headers can be added here or in after_request hooks
     # For simplicity, we will add a method to apply headers in app.py
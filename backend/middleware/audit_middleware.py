@@ -1,6 +1,5 @@
 from flask import request, g
 from functools import wraps
-import json
 import logging
 from backend.models.audit_log import AuditLog, ActionEnum
 
@@ -52,7 +51,7 @@ def audit_action(action, resource_type, get_resource_id=None):
                         action=action,
                         resource_type=resource_type,
                         resource_id=resource_id,
-                        details=json.dumps(details),
+                        details=details,
                         ip_address=ip_address,
                         user_agent=user_agent
                     )
@@ -78,7 +77,9 @@ def log_user_action(action, resource_type, resource_id=None, details=None):
         action=action,
         resource_type=resource_type,
         resource_id=resource_id,
-        details=json.dumps(details) if details else None,
+        details=details or None,
         ip_address=ip_address,
-        user_agent=user_agent
+        user_agent=user_agent,
+        endpoint=request.endpoint,
+        http_method=request.method
     )
@@ -4,5 +4,8 @@ from .nda import NDA
 from .project_request import ProjectRequest
 from .approval import Approval
 from .audit_log import AuditLog
+from .email_outbox import EmailOutbox
+from .pending_notification import PendingNotification
+from .stats_counter import StatsCounter
 
-__all__ = ['db', 'login_manager', 'User', 'NDA', 'ProjectRequest', 'Approval', 'AuditLog']
+__all__ = ['db', 'login_manager', 'User', 'NDA', 'ProjectRequest', 'Approval', 'AuditLog', 'EmailOutbox', 'PendingNotification', 'StatsCounter']
@@ -11,5 +11,9 @@ class Approval(db.Model):
     comments = db.Column(db.Text, nullable=True)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
 
-    project_request = db.relationship('ProjectRequest', backref='approval')
-    admin = db.relationship('User', backref='approvals')
+    __table_args__ = (
+        db.Index('ix_approvals_project_request', 'project_request_id', 'approved'),
+    )
+
+    project_request = db.relationship('ProjectRequest', backref=db.backref('approval', lazy='dynamic'))
+    admin = db.relationship('User', backref=db.backref('approvals', lazy='dynamic'))
@@ -1,4 +1,7 @@
+import json
 from datetime import datetime
+from flask import current_app, has_app_context
+from sqlalchemy.dialects.postgresql import JSONB
 from .database import db
 from enum import Enum
 
@@ -20,12 +23,25 @@ class AuditLog(db.Model):
     action = db.Column(db.Enum(ActionEnum), nullable=False)
     resource_type = db.Column(db.String(50), nullable=False)  # 'user', 'project_request', 'approval', etc.
     resource_id = db.Column(db.Integer, nullable=True)  # ID of the affected resource
-    details = db.Column(db.Text, nullable=True)  # JSON string with additional details
+    details = db.Column(db.JSON().with_variant(JSONB(), 'postgresql'), nullable=True)  # JSONB on PostgreSQL, JSON1 text on SQLite
+    endpoint = db.Column(db.String(120), nullable=True)  # Flask endpoint that produced the entry
+    http_method = db.Column(db.String(10), nullable=True)
     ip_address = db.Column(db.String(45), nullable=True)  # IPv4 or IPv6
     user_agent = db.Column(db.String(500), nullable=True)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
-    user = db.relationship('User', backref='audit_logs')
+    user = db.relationship('User', backref=db.backref('audit_logs', lazy='dynamic'))
+
+    # Every index ends in (timestamp, id) so filtered listings can seek straight
+    # to a keyset cursor and read rows already in order
+    __table_args__ = (
+        db.Index('ix_audit_logs_timestamp_id', 'timestamp', 'id'),
+        db.Index('ix_audit_logs_user_timestamp', 'user_id', 'timestamp', 'id'),
+        db.Index('ix_audit_logs_action_timestamp', 'action', 'timestamp', 'id'),
+        db.Index('ix_audit_logs_resource', 'resource_type', 'resource_id', 'timestamp', 'id'),
+        db.Index('ix_audit_logs_endpoint', 'endpoint', 'http_method', 'timestamp', 'id'),
+        db.Index('ix_audit_logs_ip', 'ip_address', 'timestamp', 'id'),
+    )
 
     def to_dict(self):
         return {
@@ -36,15 +52,73 @@ class AuditLog(db.Model):
             'resource_type': self.resource_type,
             'resource_id': self.resource_id,
             'details': self.details,
+            'endpoint': self.endpoint,
+            'http_method': self.http_method,
             'ip_address': self.ip_address,
             'user_agent': self.user_agent,
             'timestamp': self.timestamp.isoformat()
         }
 
+    @staticmethod
+    def details_filter(key, value):
+        """Filter on a top-level details key, evaluated by the database (->> on PostgreSQL, json_extract on SQLite).
+
+        value is compared as text, the way a query string carries it: 42 matches
+        both {"project_id": 42} and {"project_id": "42"}, true matches a JSON true.
+        """
+        value = str(value)
+        if db.engine.dialect.name != 'sqlite':
+            # ->> already renders numbers and booleans as text ('42', 'true')
+            return AuditLog.details[key].as_string() == value
+        # json_extract returns the typed value (42, or 1 for true), which never equals a text bind
+        path = '$.' + json.dumps(key)
+        as_text = db.cast(db.func.json_extract(AuditLog.details, path), db.Text)
+        if value in ('true', 'false'):
+            return db.or_(db.func.json_type(AuditLog.details, path) == value, as_text == value)
+        return as_text == value
+
     @staticmethod
     def log_action(user_id, action, resource_type, resource_id=None, details=None, 
-                   ip_address=None, user_agent=None):
-        """Create a new audit log entry"""
+                   ip_address=None, user_agent=None, endpoint=None, http_method=None):
+        """Create a new audit log entry.
+
+        details is a dict stored as JSON; a JSON string is still accepted from
+        older callers, and values JSON cannot represent are stored as str(). endpoint and http_method default to the details keys of
+        the same name ('endpoint', 'method').
+
+        When the buffered audit writer is enabled (AUDIT_LOG_MODE=buffered) the
+        entry is queued and written in the background on a separate connection,
+        leaving the caller's session untouched, and None is returned.
+        """
+        if isinstance(details, str):
+            try:
+                details = json.loads(details)
+            except ValueError:
+                details = {'message': details}
+        if details is not None:
+            # Round-trip through JSON so values the column cannot store (datetimes,
+            # enums, Decimals) become strings here instead of failing the insert
+            details = json.loads(json.dumps(details, default=str))
+        if isinstance(details, dict):
+            endpoint = endpoint or details.get('endpoint')
+            http_method = http_method or details.get('method')
+
+        writer = current_app.extensions.get('audit_writer') if has_app_context() else None
+        if writer is not None:
+            writer.write({
+                'user_id': user_id,
+                'action': action,
+                'resource_type': resource_type,
+                'resource_id': resource_id,
+                'details': details,
+                'endpoint': endpoint,
+                'http_method': http_method,
+                'ip_address': ip_address,
+                'user_agent': user_agent,
+                'timestamp': datetime.utcnow()
+            })
+            return None
+
         try:
             audit_log = AuditLog(
                 user_id=user_id,
@@ -52,6 +126,8 @@ class AuditLog(db.Model):
                 resource_type=resource_type,
                 resource_id=resource_id,
                 details=details,
+                endpoint=endpoint,
+                http_method=http_method,
                 ip_address=ip_address,
                 user_agent=user_agent
             )
@@ -1,6 +1,25 @@
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
 from flask_login import LoginManager
 
+
+class RoutingSession(Session):
+    """Session that can send SELECTs to a read replica.
+
+    While session.info['read_engine'] is set (GET requests, see
+    backend.utils.read_routing) SELECT statements use that engine. The first
+    flush or non-SELECT statement clears it, so the rest of the request
+    reads its own writes from the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and 'read_engine' in self.info:
+            if not self._flushing and clause is not None and getattr(clause, 'is_select', False):
+                return self.info['read_engine']
+            del self.info['read_engine']
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
 # Create shared instances
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 login_manager = LoginManager()
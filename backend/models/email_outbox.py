@@ -0,0 +1,51 @@
+import json
+from datetime import datetime
+from enum import Enum
+from .database import db
+
+class OutboxStatusEnum(str, Enum):
+    pending = "pending"
+    sending = "sending"
+    sent = "sent"
+    failed = "failed"
+
+class EmailOutbox(db.Model):
+    """Outgoing email written in the same transaction as the change that triggered it"""
+    __tablename__ = 'email_outbox'
+
+    id = db.Column(db.Integer, primary_key=True)
+    recipients = db.Column(db.Text, nullable=False)  # JSON list of addresses
+    subject = db.Column(db.String(255), nullable=False)
+    html_content = db.Column(db.Text, nullable=False)
+    text_content = db.Column(db.Text, nullable=True)
+    status = db.Column(db.Enum(OutboxStatusEnum), default=OutboxStatusEnum.pending, nullable=False)
+    priority = db.Column(db.String(20), default='workflow', server_default='workflow', nullable=False)  # 'workflow' or 'digest'
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    last_error = db.Column(db.Text, nullable=True)
+    lease_owner = db.Column(db.String(100), nullable=True)  # drainer currently holding the row
+    lease_expires_at = db.Column(db.DateTime, nullable=True)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_email_outbox_status_next_attempt', 'status', 'next_attempt_at'),
+    )
+
+    @property
+    def recipient_list(self):
+        return json.loads(self.recipients) if self.recipients else []
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'recipients': self.recipient_list,
+            'subject': self.subject,
+            'priority': self.priority,
+            'status': self.status.value,
+            'attempts': self.attempts,
+            'last_error': self.last_error,
+            'next_attempt_at': self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'sent_at': self.sent_at.isoformat() if self.sent_at else None
+        }
@@ -9,3 +9,7 @@ class NDA(db.Model):
     filename = db.Column(db.String(255), nullable=False)
     upload_date = db.Column(db.DateTime, default=datetime.utcnow)
     file_path = db.Column(db.String(255), nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_nda_uploads_user_id', 'user_id'),
+    )
@@ -0,0 +1,38 @@
+from datetime import datetime
+from .database import db
+
+class PendingNotification(db.Model):
+    """Workflow notification held back for a user who receives digests"""
+    __tablename__ = 'pending_notifications'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    project_request_id = db.Column(db.Integer, db.ForeignKey('project_requests.id', ondelete='CASCADE'), nullable=True)
+    kind = db.Column(db.String(50), nullable=False)  # 'new_request', 'stage_approval'
+    subject = db.Column(db.String(255), nullable=False)
+    summary = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    digested_at = db.Column(db.DateTime, nullable=True)  # set once included in a sent digest
+
+    user = db.relationship('User', backref=db.backref('pending_notifications', lazy='dynamic'))
+    # Notifications about a deleted (cancelled) request are dropped with it
+    project_request = db.relationship(
+        'ProjectRequest',
+        backref=db.backref('pending_notifications', lazy='dynamic', cascade='all, delete-orphan')
+    )
+
+    __table_args__ = (
+        db.Index('ix_pending_notifications_user_digested', 'user_id', 'digested_at'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'project_request_id': self.project_request_id,
+            'kind': self.kind,
+            'subject': self.subject,
+            'summary': self.summary,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'digested_at': self.digested_at.isoformat() if self.digested_at else None
+        }
@@ -43,6 +43,17 @@ class ProjectRequest(db.Model):
     closed_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Matched to the dashboard queries: stage queues filter by status and sort
+    # by newest submission, "my requests" by user, approvers by their own id
+    __table_args__ = (
+        db.Index('ix_project_requests_status_submitted', status, submitted_at.desc()),
+        db.Index('ix_project_requests_user_submitted', user_id, submitted_at.desc()),
+        db.Index('ix_project_requests_submitted_at', submitted_at.desc()),
+        db.Index('ix_project_requests_guide_approver', 'guide_approved_by', 'status', 'guide_approved_at'),
+        db.Index('ix_project_requests_hod_approver', 'hod_approved_by', 'status', 'hod_approved_at'),
+        db.Index('ix_project_requests_it_services_approver', 'it_services_approved_by', 'status', 'it_services_approved_at'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -0,0 +1,22 @@
+from datetime import datetime
+from .database import db
+
+class StatsCounter(db.Model):
+    """Running count behind the dashboard statistics, maintained by backend.services.stats_counters.
+
+    Keys are dotted names: 'users.total', 'users.role.student', 'users.active',
+    'requests.total', 'requests.status.pending', 'requests.user.42.total',
+    'requests.user.42.status.pending'.
+    """
+    __tablename__ = 'stats_counters'
+
+    key = db.Column(db.String(100), primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def to_dict(self):
+        return {
+            'key': self.key,
+            'value': self.value,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
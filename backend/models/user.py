@@ -28,6 +28,11 @@ class CampusEnum(str, Enum):
     delhi_ncr = "Delhi NCR"
     pune_lavasa_campus = "Pune Lavasa Campus"
 
+class NotificationPreferenceEnum(str, Enum):
+    immediate = "immediate"
+    hourly = "hourly"
+    daily = "daily"
+
 class User(UserMixin, db.Model):
     __tablename__ = 'users'
 
@@ -53,14 +58,27 @@ class User(UserMixin, db.Model):
     is_active = db.Column(db.Boolean, default=True)
     is_temp_password = db.Column(db.Boolean, default=True)
     last_login = db.Column(db.DateTime, nullable=True)
+    # How approval-workflow notifications reach this user; OTP and credential mails are always immediate
+    notification_preference = db.Column(db.Enum(NotificationPreferenceEnum), default=NotificationPreferenceEnum.immediate,
+                                         server_default=NotificationPreferenceEnum.immediate.value, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    project_requests = db.relationship('ProjectRequest', foreign_keys='ProjectRequest.user_id', backref='user', lazy=True)
-    guide_approved_requests = db.relationship('ProjectRequest', foreign_keys='ProjectRequest.guide_approved_by', backref='guide_approver', lazy=True)
-    hod_approved_requests = db.relationship('ProjectRequest', foreign_keys='ProjectRequest.hod_approved_by', backref='hod_approver', lazy=True)
-    it_services_approved_requests = db.relationship('ProjectRequest', foreign_keys='ProjectRequest.it_services_approved_by', backref='it_services_approver', lazy=True)
-    ndas = db.relationship('NDA', backref='user', lazy=True)
+    # Approver lookups and role counts filter by (role, is_active); the admin
+    # user list and "new users" stats go by created_at
+    __table_args__ = (
+        db.Index('ix_users_role_active', 'role', 'is_active'),
+        db.Index('ix_users_active_last_login', 'is_active', 'last_login'),
+        db.Index('ix_users_created_at', 'created_at'),
+    )
+
+    # Unbounded collections are dynamic queries; the single-row backrefs load lazily.
+    # List pages choose their loaders in backend.utils.loader_policy
+    project_requests = db.relationship('ProjectRequest', foreign_keys='ProjectRequest.user_id', backref=db.backref('user', lazy='select'), lazy='dynamic')
+    guide_approved_requests = db.relationship('ProjectRequest', foreign_keys='ProjectRequest.guide_approved_by', backref=db.backref('guide_approver', lazy='select'), lazy='dynamic')
+    hod_approved_requests = db.relationship('ProjectRequest', foreign_keys='ProjectRequest.hod_approved_by', backref=db.backref('hod_approver', lazy='select'), lazy='dynamic')
+    it_services_approved_requests = db.relationship('ProjectRequest', foreign_keys='ProjectRequest.it_services_approved_by', backref=db.backref('it_services_approver', lazy='select'), lazy='dynamic')
+    ndas = db.relationship('NDA', backref=db.backref('user', lazy='select'), lazy='dynamic')
 
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
@@ -107,6 +125,7 @@ class User(UserMixin, db.Model):
             'profile_photo': self.profile_photo,
             'is_active': self.is_active,
             'is_temp_password': self.is_temp_password,
+            'notification_preference': self.notification_preference.value if self.notification_preference else NotificationPreferenceEnum.immediate.value,
             'last_login': self.last_login.isoformat() if self.last_login else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
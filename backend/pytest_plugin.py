@@ -0,0 +1,21 @@
+"""
+pytest fixtures for METIS test suites.
+
+Enable with ``pytest_plugins = ['backend.pytest_plugin']`` in a conftest.py.
+
+query_budget asserts how many SQL statements a block may run, so an endpoint
+that starts lazy-loading per row fails its test instead of slowing down in
+production::
+
+    def test_request_list_queries(client, query_budget):
+        with query_budget(6, max_repeats=2):
+            assert client.get('/admin/requests?per_page=50').status_code == 200
+"""
+import pytest
+from backend.utils.query_counter import query_budget as _query_budget
+
+
+@pytest.fixture
+def query_budget():
+    """query_budget(max_queries, max_repeats=None) context manager; see backend.utils.query_counter"""
+    return _query_budget
@@ -0,0 +1,235 @@
+"""
+Monthly partitioning and archival of the audit log.
+
+On PostgreSQL audit_logs is a native RANGE partitioned table with one
+partition per month (see the add_audit_log_partitions migration);
+ensure_partitions() creates the partitions for the coming months. SQLite has
+no partitioning, so there the hot table stays single and archival deletes the
+archived month by timestamp range.
+
+archive_audit_logs() moves every month older than the retention period out
+of the database into logs/audit/:
+
+    audit-YYYY-MM.jsonl.gz      append-only segment; every chunk of rows is a
+                                separate gzip member, one JSON object per line
+    audit-YYYY-MM.idx.jsonl     sparse index, one line per member: byte offset
+                                and length, row count, first/last timestamp and id
+
+The index line is written only after its member is on disk, so an interrupted
+run is resumed from the last indexed member instead of duplicating rows. Once
+the month is complete the partition is dropped (PostgreSQL) or its rows are
+deleted (SQLite).
+"""
+import gzip
+import json
+import logging
+import os
+from datetime import datetime
+from sqlalchemy import text
+from backend.models.database import db
+from backend.models.audit_log import AuditLog
+
+logger = logging.getLogger(__name__)
+
+_COLUMNS = ('id', 'user_id', 'action', 'resource_type', 'resource_id', 'details',
+            'endpoint', 'http_method', 'ip_address', 'user_agent', 'timestamp')
+
+
+def month_start(value):
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(value, months):
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"audit_logs_y{month.year}m{month.month:02d}"
+
+
+def _is_postgresql():
+    return db.engine.dialect.name == 'postgresql'
+
+
+def _is_partitioned():
+    if not _is_postgresql():
+        return False
+    return db.session.execute(text(
+        "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+        "WHERE c.relname = 'audit_logs'"
+    )).first() is not None
+
+
+def ensure_partitions(months_ahead=3, now=None):
+    """Create monthly partitions up to months_ahead months from now (PostgreSQL only)"""
+    if not _is_partitioned():
+        return []
+
+    created = []
+    current = month_start(now or datetime.utcnow())
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        name = partition_name(month)
+        exists = db.session.execute(text("SELECT to_regclass(:name)"), {'name': name}).scalar()
+        if exists:
+            continue
+        db.session.execute(text(
+            f"CREATE TABLE {name} PARTITION OF audit_logs "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+        ))
+        created.append(name)
+    db.session.commit()
+    if created:
+        logger.info(f"Created audit log partitions: {', '.join(created)}")
+    return created
+
+
+def _segment_paths(archive_dir, month):
+    stem = os.path.join(archive_dir, f"audit-{month.year}-{month.month:02d}")
+    return f"{stem}.jsonl.gz", f"{stem}.idx.jsonl"
+
+
+def _read_index(index_path):
+    if not os.path.exists(index_path):
+        return []
+    with open(index_path) as index_file:
+        return [json.loads(line) for line in index_file if line.strip()]
+
+
+def _row_to_dict(row):
+    entry = {}
+    for column in _COLUMNS:
+        value = getattr(row, column)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif hasattr(value, 'value'):
+            value = value.value
+        entry[column] = value
+    return entry
+
+
+def _archive_month(month, archive_dir, chunk_rows):
+    segment_path, index_path = _segment_paths(archive_dir, month)
+    index = _read_index(index_path)
+    if index and index[-1].get('complete'):
+        return {'month': month.strftime('%Y-%m'), 'rows': 0, 'resumed': False}
+
+    # Cut off anything written after the last indexed member (an interrupted run)
+    members = [entry for entry in index if 'offset' in entry]
+    end = members[-1]['offset'] + members[-1]['length'] if members else 0
+    with open(segment_path, 'ab') as segment:
+        segment.truncate(end)
+    last_id = members[-1]['last_id'] if members else 0
+
+    table = AuditLog.__table__
+    month_end = add_months(month, 1)
+    archived = 0
+    while True:
+        rows = db.session.execute(
+            table.select()
+            .where(table.c.timestamp >= month, table.c.timestamp < month_end, table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(chunk_rows)
+        ).all()
+        if not rows:
+            break
+
+        payload = "".join(json.dumps(_row_to_dict(row), default=str) + "\n" for row in rows)
+        member = gzip.compress(payload.encode('utf-8'))
+        with open(segment_path, 'ab') as segment:
+            offset = segment.tell()
+            segment.write(member)
+            segment.flush()
+            os.fsync(segment.fileno())
+
+        timestamps = [row.timestamp for row in rows]
+        with open(index_path, 'a') as index_file:
+            index_file.write(json.dumps({
+                'offset': offset,
+                'length': len(member),
+                'rows': len(rows),
+                'first_id': rows[0].id,
+                'last_id': rows[-1].id,
+                'first_timestamp': min(timestamps).isoformat(),
+                'last_timestamp': max(timestamps).isoformat()
+            }) + "\n")
+            index_file.flush()
+            os.fsync(index_file.fileno())
+
+        last_id = rows[-1].id
+        archived += len(rows)
+        # Don't hold a read snapshot open across the whole month
+        db.session.rollback()
+
+    with open(index_path, 'a') as index_file:
+        index_file.write(json.dumps({'complete': True, 'archived_at': datetime.utcnow().isoformat()}) + "\n")
+    return {'month': month.strftime('%Y-%m'), 'rows': archived, 'resumed': bool(members)}
+
+
+def _drop_month(month):
+    if _is_partitioned():
+        name = partition_name(month)
+        if db.session.execute(text("SELECT to_regclass(:name)"), {'name': name}).scalar():
+            db.session.execute(text(f"ALTER TABLE audit_logs DETACH PARTITION {name}"))
+            db.session.execute(text(f"DROP TABLE {name}"))
+            db.session.commit()
+            return
+        # Rows for months without their own partition live in the default partition
+
+    AuditLog.query.filter(
+        AuditLog.timestamp >= month,
+        AuditLog.timestamp < add_months(month, 1)
+    ).delete(synchronize_session=False)
+    db.session.commit()
+
+
+def archive_audit_logs(archive_dir, retention_months=6, chunk_rows=1000, now=None, dry_run=False):
+    """Archive and drop every month older than retention_months. Returns one summary per month."""
+    cutoff = add_months(month_start(now or datetime.utcnow()), -retention_months)
+    oldest = db.session.query(db.func.min(AuditLog.timestamp)).scalar()
+    if oldest is None or oldest >= cutoff:
+        return []
+
+    os.makedirs(archive_dir, exist_ok=True)
+    summaries = []
+    month = month_start(oldest)
+    while month < cutoff:
+        if dry_run:
+            rows = AuditLog.query.filter(
+                AuditLog.timestamp >= month, AuditLog.timestamp < add_months(month, 1)
+            ).count()
+            summaries.append({'month': month.strftime('%Y-%m'), 'rows': rows, 'dry_run': True})
+        else:
+            summary = _archive_month(month, archive_dir, chunk_rows)
+            _drop_month(month)
+            summaries.append(summary)
+            logger.info(f"Archived audit logs for {summary['month']}: {summary['rows']} rows")
+        month = add_months(month, 1)
+    return summaries
+
+
+def iter_archived_entries(archive_dir, month, start=None, end=None):
+    """Yield archived entries for a month, optionally limited to [start, end).
+
+    The sparse index is used to skip gzip members entirely outside the range.
+    """
+    segment_path, index_path = _segment_paths(archive_dir, month_start(month))
+    members = [entry for entry in _read_index(index_path) if 'offset' in entry]
+    if not members:
+        return
+
+    with open(segment_path, 'rb') as segment:
+        for member in members:
+            if start and datetime.fromisoformat(member['last_timestamp']) < start:
+                continue
+            if end and datetime.fromisoformat(member['first_timestamp']) >= end:
+                continue
+            segment.seek(member['offset'])
+            payload = gzip.decompress(segment.read(member['length'])).decode('utf-8')
+            for line in payload.splitlines():
+                entry = json.loads(line)
+                timestamp = datetime.fromisoformat(entry['timestamp'])
+                if (start and timestamp < start) or (end and timestamp >= end):
+                    continue
+                yield entry
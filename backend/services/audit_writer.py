@@ -0,0 +1,204 @@
+"""
+Buffered writer for audit log entries.
+
+AuditLog.log_action used to add and commit on the request's own session: an
+extra commit (and on SQLite an extra fsync and write lock) per audited action,
+which also committed whatever else the caller had pending. With the writer
+enabled, entries go into a bounded in-memory queue and a background thread
+inserts them in batches on its own connection, every AUDIT_FLUSH_INTERVAL_MS
+or every AUDIT_BATCH_SIZE entries, whichever comes first.
+
+Entries are best effort: when the queue is full they are dropped and counted,
+and entries that wait longer than AUDIT_LATE_AFTER seconds before being
+written are counted as late. A batch that fails is retried one entry at a
+time, so only the entries that cannot be written are counted as failed.
+Whatever is queued is flushed at shutdown.
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from sqlalchemy.exc import OperationalError
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class AuditLogWriter:
+    def __init__(self, engine, table, batch_size=100, flush_interval=0.2,
+                 max_queue=10000, late_after=5.0):
+        self.engine = engine
+        self.table = table
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.late_after = late_after
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self.written = 0
+        self.dropped = 0
+        self.late = 0
+        self.failed = 0
+        self.batches = 0
+        self.largest_batch = 0
+
+    def write(self, entry):
+        """Queue an entry (a dict of audit_logs column values). Returns False if it was dropped."""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((time.monotonic(), entry))
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+                dropped = self.dropped
+            # Log the first drop and then every hundredth to avoid flooding the log
+            if dropped == 1 or dropped % 100 == 0:
+                logger.warning(f"Audit log queue full; {dropped} entries dropped so far")
+            return False
+
+    def stats(self):
+        with self._lock:
+            return {
+                'queued': self._queue.qsize(),
+                'max_queue': self._queue.maxsize,
+                'written': self.written,
+                'dropped': self.dropped,
+                'late': self.late,
+                'failed': self.failed,
+                'batches': self.batches,
+                'largest_batch': self.largest_batch
+            }
+
+    def shutdown(self, timeout=10):
+        """Flush everything queued so far and stop the background thread"""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.error("Audit log queue still full at shutdown; pending entries lost")
+            return
+        self._thread.join(timeout)
+        self._thread = None
+        stats = self.stats()
+        if stats['dropped'] or stats['late'] or stats['failed']:
+            logger.warning(f"Audit log writer stopped: {stats}")
+
+    def _ensure_started(self):
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='audit-log-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = []
+            stop = False
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=max(remaining, 0)) if batch else self._queue.get()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+                if len(batch) == 1:
+                    # The flush interval runs from the first entry of the batch
+                    deadline = time.monotonic() + self.flush_interval
+
+            if stop:
+                # Drain whatever was queued before the stop marker
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is not _STOP:
+                        batch.append(item)
+
+            if batch:
+                self._flush(batch)
+            if stop:
+                return
+
+    def _flush(self, batch):
+        rows = [entry for _, entry in batch]
+        for attempt in range(3):
+            try:
+                with self.engine.begin() as connection:
+                    connection.execute(self.table.insert(), rows)
+                break
+            except OperationalError as e:
+                if "database is locked" in str(e).lower() and attempt < 2:
+                    time.sleep(0.5 * (attempt + 1))
+                    continue
+                self._record_failure(rows, e)
+                return
+            except Exception as e:
+                if len(rows) > 1:
+                    # One bad entry fails the whole multi-row insert; retry the
+                    # entries one at a time so only the bad ones are lost
+                    batch = self._flush_each(batch)
+                    rows = [entry for _, entry in batch]
+                    break
+                self._record_failure(rows, e)
+                return
+
+        now = time.monotonic()
+        late = sum(1 for queued_at, _ in batch if now - queued_at > self.late_after)
+        with self._lock:
+            self.written += len(rows)
+            self.late += late
+            self.batches += 1
+            self.largest_batch = max(self.largest_batch, len(rows))
+
+    def _flush_each(self, batch):
+        """Insert entries one per transaction; returns the ones that were written"""
+        written = []
+        for item in batch:
+            try:
+                with self.engine.begin() as connection:
+                    connection.execute(self.table.insert(), [item[1]])
+                written.append(item)
+            except Exception as e:
+                self._record_failure([item[1]], e)
+        return written
+
+    def _record_failure(self, rows, error):
+        with self._lock:
+            self.failed += len(rows)
+        logger.error(f"Failed to write {len(rows)} audit log entries: {error}")
+
+
+def init_audit_writer(app, db):
+    """Create the buffered audit writer when AUDIT_LOG_MODE is 'buffered'"""
+    if app.config.get('AUDIT_LOG_MODE', 'buffered') != 'buffered':
+        return None
+
+    from backend.models.audit_log import AuditLog
+
+    with app.app_context():
+        engine = db.engine
+    writer = AuditLogWriter(
+        engine,
+        AuditLog.__table__,
+        batch_size=app.config.get('AUDIT_BATCH_SIZE', 100),
+        flush_interval=app.config.get('AUDIT_FLUSH_INTERVAL_MS', 200) / 1000.0,
+        max_queue=app.config.get('AUDIT_QUEUE_SIZE', 10000),
+        late_after=app.config.get('AUDIT_LATE_AFTER', 5.0)
+    )
+    app.extensions['audit_writer'] = writer
+    atexit.register(writer.shutdown)
+    return writer
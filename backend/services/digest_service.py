@@ -0,0 +1,99 @@
+"""
+Periodic digests of approval-workflow notifications.
+
+Approvers whose notification preference is 'hourly' or 'daily' get their
+new-request and stage-approval notices collected in pending_notifications;
+send_digests() renders each approver's backlog into a single email. Run it
+from cron via `flask email send-digests --frequency hourly|daily`.
+"""
+import logging
+from datetime import datetime
+from html import escape
+from flask import current_app
+from backend.models.database import db
+from backend.models.user import User, NotificationPreferenceEnum
+from backend.models.pending_notification import PendingNotification
+from backend.services.email_service import EmailService
+from backend.services.email_queue import EmailPriority
+
+logger = logging.getLogger(__name__)
+
+
+def send_digests(frequency):
+    """Send one digest per approver with the given preference. Returns (sent, failed)."""
+    preference = NotificationPreferenceEnum(frequency)
+    preferences = [preference]
+    if preference == NotificationPreferenceEnum.hourly:
+        # Sweep up notifications left over by users who switched back to immediate
+        preferences.append(NotificationPreferenceEnum.immediate)
+
+    pending = (
+        PendingNotification.query
+        .join(User, PendingNotification.user_id == User.id)
+        .filter(
+            PendingNotification.digested_at.is_(None),
+            User.notification_preference.in_(preferences),
+            User.is_active == True
+        )
+        .order_by(PendingNotification.user_id, PendingNotification.created_at)
+        .all()
+    )
+
+    by_user = {}
+    for notification in pending:
+        by_user.setdefault(notification.user_id, []).append(notification)
+
+    email_service = EmailService()
+    sent = failed = 0
+    for notifications in by_user.values():
+        user = notifications[0].user
+        subject = f"METIS Lab {preference.value.title()} Digest - {len(notifications)} update(s)"
+        html_content = _render_digest_html(user, notifications)
+        text_content = _render_digest_text(user, notifications)
+
+        if email_service.send_email(user.email, subject, html_content, text_content,
+                                    priority=EmailPriority.digest):
+            now = datetime.utcnow()
+            for notification in notifications:
+                notification.digested_at = now
+            db.session.commit()
+            sent += 1
+        else:
+            failed += 1
+
+    logger.info(f"{preference.value.title()} digests: {sent} sent, {failed} failed, {len(pending)} notifications")
+    return sent, failed
+
+
+def _render_digest_html(user, notifications):
+    base_url = current_app.config.get('BASE_URL', 'http://localhost:5000')
+    items = "".join(
+        f"<li style='margin-bottom:8px;'><strong>{escape(n.subject)}</strong><br>"
+        f"{escape(n.summary or '')}<br>"
+        f"<span style='color:#666;font-size:12px;'>{n.created_at.strftime('%B %d, %Y at %I:%M %p')}</span></li>"
+        for n in notifications
+    )
+    return f"""
+    <html><body style='font-family:Arial,sans-serif;'>
+    <div style='background:linear-gradient(135deg,#1e3c72,#2a5298);color:white;padding:20px;text-align:center;'>
+    <h2>METIS Lab Notification Digest</h2></div>
+    <div style='padding:20px;'>
+    <p>Dear {escape(user.full_name)},</p>
+    <p>The following {len(notifications)} update(s) need your attention:</p>
+    <ul>{items}</ul>
+    <p><a href='{base_url}/dashboard'>Open the METIS Lab dashboard</a></p>
+    </div>
+    <div style='background:#f7f9fc;padding:15px;text-align:center;font-size:12px;color:#666;'>
+    <p>METIS Lab Management System - Automated Notification</p>
+    </div></body></html>
+    """
+
+
+def _render_digest_text(user, notifications):
+    lines = [f"Dear {user.full_name},", "", f"The following {len(notifications)} update(s) need your attention:", ""]
+    for n in notifications:
+        lines.append(f"- {n.subject}")
+        if n.summary:
+            lines.append(f"  {n.summary}")
+    lines += ["", "METIS Lab Management System - Automated Notification"]
+    return "\n".join(lines)
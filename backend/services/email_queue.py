@@ -0,0 +1,255 @@
+"""
+Background delivery queue for outbound email.
+
+Request handlers hand a fully built message to the queue and return straight
+away; a small pool of worker threads performs the SMTP conversation, retrying
+transient failures with exponential backoff. Workers always take the most
+urgent lane first, so workflow notifications are never stuck behind digests.
+Critical mail (OTP, credentials) is never queued: EmailService sends it
+inline so the caller knows whether it was delivered.
+"""
+import atexit
+import itertools
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from enum import Enum
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class EmailPriority(str, Enum):
+    critical = "critical"  # OTP and credentials; sent inline, never queued
+    workflow = "workflow"  # approval notifications
+    digest = "digest"
+
+# Lower sorts first in the priority queue; the stop sentinel goes behind everything
+_PRIORITY_RANK = {EmailPriority.workflow: 0, EmailPriority.digest: 1}
+_STOP_RANK = 99
+
+
+class EmailJob:
+    """A single queued message and its delivery state"""
+
+    def __init__(self, deliver, recipients, subject, message, priority=EmailPriority.workflow):
+        self.id = uuid.uuid4().hex
+        self.priority = priority
+        self.deliver = deliver
+        self.recipients = list(recipients)
+        self.subject = subject
+        self.message = message
+        self.status = 'queued'
+        self.attempts = 0
+        self.last_error = None
+        self.refused = {}
+        self.created_at = datetime.utcnow()
+        self.updated_at = self.created_at
+        self.delivered_at = None
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'recipients': self.recipients,
+            'subject': self.subject,
+            'priority': self.priority.value,
+            'status': self.status,
+            'attempts': self.attempts,
+            'last_error': self.last_error,
+            'refused': self.refused,
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat(),
+            'delivered_at': self.delivered_at.isoformat() if self.delivered_at else None
+        }
+
+
+class EmailQueue:
+    """Bounded in-process priority queue drained by a pool of worker threads.
+
+    max_size bounds the workflow and digest lanes together.
+    """
+
+    def __init__(self, workers=2, max_size=1000, max_attempts=4,
+                 retry_backoff=2.0, status_retention=1000):
+        self.workers = max(1, workers)
+        self.max_size = max_size
+        self.max_attempts = max(1, max_attempts)
+        self.retry_backoff = retry_backoff
+        self.status_retention = status_retention
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._depth = {priority: 0 for priority in _PRIORITY_RANK}
+        self._rejected = {priority: 0 for priority in _PRIORITY_RANK}
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._pid = None
+        self._stopping = False
+
+    def submit(self, deliver, recipients, subject, message, priority=EmailPriority.workflow):
+        """Queue a message for delivery. Returns the job, or None if the queue is full."""
+        if priority not in _PRIORITY_RANK:
+            raise ValueError(f"{priority.value} mail is sent inline, not queued")
+        self._ensure_started()
+        job = EmailJob(deliver, recipients, subject, message, priority)
+        if not self._put(job):
+            logger.warning(f"Email queue full ({self.max_size}); cannot queue '{subject}'")
+            return None
+        self._remember(job)
+        return job
+
+    def get_status(self, job_id):
+        """Return the delivery status of a queued message, if still tracked"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job else None
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            depth = dict(self._depth)
+            rejected = dict(self._rejected)
+
+        # Age of the oldest message waiting in each lane: the backpressure signal
+        now = datetime.utcnow()
+        oldest = {}
+        with self._queue.mutex:
+            waiting = [entry[2] for entry in self._queue.queue if entry[2] is not _STOP]
+        for job in waiting:
+            age = (now - job.created_at).total_seconds()
+            oldest[job.priority] = max(oldest.get(job.priority, 0), age)
+
+        return {
+            'queued': sum(depth.values()),
+            'max_size': self.max_size,
+            'workers': len([t for t in self._threads if t.is_alive()]),
+            'by_status': counts,
+            'lanes': {
+                priority.value: {
+                    'depth': depth[priority],
+                    'rejected': rejected[priority],
+                    'oldest_seconds': round(oldest.get(priority, 0), 3)
+                }
+                for priority in _PRIORITY_RANK
+            }
+        }
+
+    def shutdown(self, timeout=10):
+        """Stop the workers once the messages already queued have been sent"""
+        if not self._threads or self._pid != os.getpid():
+            return
+        self._stopping = True
+        for _ in self._threads:
+            self._queue.put((_STOP_RANK, next(self._sequence), _STOP))
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(max(0, deadline - time.monotonic()))
+        self._threads = []
+
+    def _ensure_started(self):
+        # Workers are started lazily, and again after a fork (gunicorn --preload)
+        if self._pid == os.getpid() and self._threads:
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._threads:
+                return
+            self._pid = os.getpid()
+            self._stopping = False
+            self._threads = []
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"email-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _remember(self, job):
+        with self._lock:
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.status_retention:
+                self._jobs.popitem(last=False)
+
+    def _put(self, job):
+        with self._lock:
+            if sum(self._depth.values()) >= self.max_size:
+                self._rejected[job.priority] += 1
+                return False
+            self._depth[job.priority] += 1
+        self._queue.put((_PRIORITY_RANK[job.priority], next(self._sequence), job))
+        return True
+
+    def _worker(self):
+        while True:
+            _, _, job = self._queue.get()
+            try:
+                if job is _STOP:
+                    return
+                with self._lock:
+                    self._depth[job.priority] -= 1
+                self._attempt(job)
+            finally:
+                self._queue.task_done()
+
+    def _attempt(self, job):
+        job.attempts += 1
+        job.status = 'sending'
+        job.updated_at = datetime.utcnow()
+        try:
+            refused = job.deliver(job.recipients, job.message)
+        except Exception as e:
+            job.last_error = str(e)
+            job.updated_at = datetime.utcnow()
+            if job.attempts < self.max_attempts and not self._stopping:
+                delay = self.retry_backoff * (2 ** (job.attempts - 1))
+                delay += random.uniform(0, delay / 2)
+                job.status = 'retrying'
+                logger.warning(f"Email '{job.subject}' attempt {job.attempts} failed: {e}; retrying in {delay:.1f}s")
+                timer = threading.Timer(delay, self._requeue, [job])
+                timer.daemon = True
+                timer.start()
+            else:
+                job.status = 'failed'
+                logger.error(f"Email '{job.subject}' to {', '.join(job.recipients)} failed after {job.attempts} attempts: {e}")
+            return
+
+        job.status = 'sent'
+        job.refused = {r: str(reason) for r, reason in (refused or {}).items()}
+        job.delivered_at = datetime.utcnow()
+        job.updated_at = job.delivered_at
+        # Drop the payload once delivered; only the status is kept around
+        job.message = None
+
+    def _requeue(self, job):
+        if not self._put(job):
+            job.status = 'failed'
+            job.last_error = 'Email queue full on retry'
+            logger.error(f"Email '{job.subject}' dropped: queue full on retry")
+
+
+def init_email_queue(app):
+    """Create the application's email queue when queued delivery is enabled"""
+    if app.config.get('EMAIL_DELIVERY_MODE', 'sync') != 'queued':
+        return None
+
+    email_queue = EmailQueue(
+        workers=app.config.get('EMAIL_QUEUE_WORKERS', 2),
+        max_size=app.config.get('EMAIL_QUEUE_MAX_SIZE', 1000),
+        max_attempts=app.config.get('EMAIL_MAX_ATTEMPTS', 4),
+        retry_backoff=app.config.get('EMAIL_RETRY_BACKOFF', 2.0)
+    )
+    app.extensions['email_queue'] = email_queue
+
+    def _shutdown():
+        from backend.services.smtp_pool import close_smtp_pools
+        email_queue.shutdown()
+        close_smtp_pools()
+
+    atexit.register(_shutdown)
+    return email_queue
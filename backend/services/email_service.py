@@ -1,62 +1,304 @@
 import smtplib
 import logging
+import json
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
 from email import encoders
 from datetime import datetime
 from flask import current_app
-from backend.models.user import User
+from backend.models.database import db
+from backend.models.user import User, NotificationPreferenceEnum
 from backend.models.project_request import ProjectRequest
+from backend.models.email_outbox import EmailOutbox
+from backend.models.pending_notification import PendingNotification
+from backend.services.smtp_pool import get_smtp_pool
+from backend.services.email_queue import EmailPriority
+from backend.services.rate_limiter import get_rate_limiter
+from backend.services.role_directory import get_approvers
+from backend.utils.database_utils import run_after_commit
 
 logger = logging.getLogger(__name__)
 
 class EmailService:
-    def __init__(self):
+    def __init__(self, transactional=False):
         self.smtp_server = current_app.config.get('SMTP_SERVER', 'smtp.gmail.com')
         self.smtp_port = current_app.config.get('SMTP_PORT', 587)
         self.smtp_username = current_app.config.get('SMTP_USERNAME')
         self.smtp_password = current_app.config.get('SMTP_PASSWORD')
         self.from_email = current_app.config.get('FROM_EMAIL', 'maths.hub143@gmail.com')
         self.from_name = current_app.config.get('FROM_NAME', 'METIS Lab')
+        self.smtp_timeout = current_app.config.get('SMTP_TIMEOUT', 10)
+        self.pool_options = {
+            'use_tls': current_app.config.get('SMTP_USE_TLS', True),
+            'max_size': current_app.config.get('SMTP_POOL_SIZE', 4),
+            'idle_timeout': current_app.config.get('SMTP_POOL_IDLE_TIMEOUT', 60),
+            'max_messages': current_app.config.get('SMTP_MAX_MESSAGES_PER_CONNECTION', 100)
+        }
+        self.max_recipients = max(1, current_app.config.get('SMTP_MAX_RECIPIENTS', 50))
+        self.rate_limit = {
+            'per_minute': current_app.config.get('SMTP_RATE_LIMIT_PER_MINUTE', 0),
+            'burst': current_app.config.get('SMTP_RATE_LIMIT_BURST', 10),
+            'reserve': current_app.config.get('SMTP_RATE_LIMIT_CRITICAL_RESERVE', 2)
+        }
+        self.rate_limit_timeout = current_app.config.get('SMTP_RATE_LIMIT_TIMEOUT', 60)
+        self.delivery_mode = current_app.config.get('EMAIL_DELIVERY_MODE', 'sync')
+        self.email_queue = current_app.extensions.get('email_queue')
+        # Transactional callers commit db.session themselves: mail is written to the
+        # outbox inside their transaction, or held back until it commits
+        self.transactional = transactional
+
+    def send_email(self, to_email, subject, html_content, text_content=None,
+                   priority=EmailPriority.workflow):
+        """Send email to recipient.
 
-    def send_email(self, to_email, subject, html_content, text_content=None):
-        """Send email to recipient"""
+        Depending on EMAIL_DELIVERY_MODE the message is sent inline ('sync'),
+        handed to the background queue ('queued') or written to the email
+        outbox table ('outbox'); True means it was accepted for delivery.
+        Critical mail (OTP, credentials) is always sent inline, ahead of any
+        queued backlog, and True means it was delivered.
+        """
         try:
             if not self.smtp_username or not self.smtp_password:
                 logger.warning("SMTP credentials not configured. Email not sent.")
                 return False
 
-            logger.info(f"Attempting to send email via {self.smtp_server}:{self.smtp_port}")
-            logger.info(f"SMTP Username: {self.smtp_username}")
-            
-            # Create message
-            msg = MIMEMultipart('alternative')
-            msg['From'] = f"{self.from_name} <{self.from_email}>"
-            msg['To'] = to_email
-            msg['Subject'] = subject
-
-            # Add text and HTML parts
-            if text_content:
-                text_part = MIMEText(text_content, 'plain')
-                msg.attach(text_part)
-
-            html_part = MIMEText(html_content, 'html')
-            msg.attach(html_part)
+            msg = self._build_message(to_email, subject, html_content, text_content)
+            if priority == EmailPriority.critical:
+                self._deliver([to_email], msg, critical=True)
+                logger.info(f"Critical email '{subject}' sent to {to_email}")
+                return True
 
-            # Send email with 10 second timeout
-            with smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=10) as server:
-                server.starttls()
-                server.login(self.smtp_username, self.smtp_password)
-                server.send_message(msg)
+            if self.delivery_mode == 'outbox':
+                self._stage_outbox([to_email], subject, html_content, text_content, priority)
+                return True
 
-            logger.info(f"Email sent successfully to {to_email}")
+            if self.transactional:
+                self._dispatch_after_commit([to_email], subject, msg, priority)
+            else:
+                self._dispatch([to_email], subject, msg, priority)
             return True
 
         except Exception as e:
             logger.error(f"Failed to send email to {to_email}: {str(e)}")
             return False
 
+    def _build_message(self, to_email, subject, html_content, text_content=None):
+        """Build a multipart message with optional plain-text alternative"""
+        msg = MIMEMultipart('alternative')
+        msg['From'] = f"{self.from_name} <{self.from_email}>"
+        msg['To'] = to_email
+        msg['Subject'] = subject
+
+        # Add text and HTML parts
+        if text_content:
+            text_part = MIMEText(text_content, 'plain')
+            msg.attach(text_part)
+
+        if html_content:
+            html_part = MIMEText(html_content, 'html')
+            msg.attach(html_part)
+        return msg
+
+    def send_many(self, messages):
+        """Send several messages, reusing pooled SMTP sessions.
+
+        ``messages`` is a list of (to_email, subject, html_content, text_content)
+        tuples. Returns a list of booleans in the same order.
+        """
+        if not self.smtp_username or not self.smtp_password:
+            logger.warning("SMTP credentials not configured. Emails not sent.")
+            return [False] * len(messages)
+
+        if self.delivery_mode != 'sync' or self.transactional:
+            return [self.send_email(*message) for message in messages]
+
+        results = []
+        pool = self._smtp_pool()
+        for to_email, subject, html_content, text_content in messages:
+            try:
+                msg = self._build_message(to_email, subject, html_content, text_content)
+                self._deliver([to_email], msg, pool)
+                results.append(True)
+            except Exception as e:
+                logger.error(f"Failed to send email to {to_email}: {str(e)}")
+                results.append(False)
+        logger.info(f"Batch of {len(messages)} emails sent, {results.count(True)} succeeded")
+        return results
+
+    def send_bulk_email(self, recipients, subject, html_content, text_content=None,
+                        priority=EmailPriority.workflow):
+        """Send identical content to many recipients in as few SMTP transactions as possible.
+
+        Recipients are chunked to SMTP_MAX_RECIPIENTS and delivered as envelope
+        (RCPT TO) addresses only, so nobody sees the rest of the list. Returns a
+        dict mapping each recipient to True/False.
+        """
+        recipients = list(dict.fromkeys(r for r in recipients if r))
+        if not recipients:
+            return {}
+        if not self.smtp_username or not self.smtp_password:
+            logger.warning("SMTP credentials not configured. Email not sent.")
+            return {r: False for r in recipients}
+
+        chunks = [recipients[i:i + self.max_recipients] for i in range(0, len(recipients), self.max_recipients)]
+        results = {}
+
+        if self.delivery_mode == 'outbox':
+            try:
+                for chunk in chunks:
+                    self._stage_outbox(chunk, subject, html_content, text_content, priority)
+                return {r: True for r in recipients}
+            except Exception as e:
+                logger.error(f"Failed to stage '{subject}' in email outbox: {str(e)}")
+                return {r: False for r in recipients}
+
+        msg = self._build_message('undisclosed-recipients:;', subject, html_content, text_content)
+        for chunk in chunks:
+            if self.transactional:
+                self._dispatch_after_commit(chunk, subject, msg, priority)
+                results.update({r: True for r in chunk})
+                continue
+
+            try:
+                refused = self._dispatch(chunk, subject, msg, priority)
+            except smtplib.SMTPRecipientsRefused as e:
+                refused = e.recipients
+            except Exception as e:
+                logger.error(f"Failed to send '{subject}' to {len(chunk)} recipients: {str(e)}")
+                refused = {r: str(e) for r in chunk}
+            for r in chunk:
+                results[r] = r not in refused
+            for r, reason in refused.items():
+                logger.warning(f"Recipient {r} refused for '{subject}': {reason}")
+
+        logger.info(f"Bulk email '{subject}' accepted for {sum(results.values())}/{len(recipients)} recipients")
+        return results
+
+    def deliver_message(self, recipients, subject, html_content, text_content=None):
+        """Send a message straight over SMTP, whatever the delivery mode.
+
+        Used by the outbox drainer for staged mail. A single recipient is named
+        in the To header; several are envelope-only. Returns a dict of refused
+        recipients; raises if the whole transaction fails.
+        """
+        header_to = recipients[0] if len(recipients) == 1 else 'undisclosed-recipients:;'
+        msg = self._build_message(header_to, subject, html_content, text_content)
+        return self._deliver(recipients, msg)
+
+    def _notify_approvers(self, approvers, request_obj, kind, subject, html_content, text_content, summary):
+        """Email approvers who want immediate notifications; hold the rest for their digest.
+
+        Returns the number of approvers emailed or queued for a digest.
+        """
+        immediate = []
+        digest = []
+        for approver in approvers:
+            if approver.notification_preference in (None, NotificationPreferenceEnum.immediate):
+                immediate.append(approver)
+            else:
+                digest.append(approver)
+
+        notified = 0
+        if immediate:
+            # Identical content for every approver: deliver as one envelope per chunk
+            results = self.send_bulk_email(
+                [approver.email for approver in immediate], subject, html_content, text_content
+            )
+            notified += sum(results.values())
+
+        if digest:
+            try:
+                for approver in digest:
+                    db.session.add(PendingNotification(
+                        user_id=approver.id,
+                        project_request_id=request_obj.id,
+                        kind=kind,
+                        subject=subject,
+                        summary=summary
+                    ))
+                if not self.transactional:
+                    db.session.commit()
+                notified += len(digest)
+            except Exception as e:
+                if not self.transactional:
+                    db.session.rollback()
+                logger.error(f"Failed to queue '{subject}' for digest: {str(e)}")
+
+        return notified
+
+    def _dispatch(self, recipients, subject, msg, priority=EmailPriority.workflow):
+        """Queue or deliver a built message according to the delivery mode.
+
+        Returns a dict of refused recipients (always empty once queued).
+        """
+        if self.delivery_mode == 'queued' and self.email_queue is not None:
+            job = self.email_queue.submit(self._deliver, recipients, subject, msg, priority)
+            if job:
+                logger.info(f"Email '{subject}' to {len(recipients)} recipient(s) queued as {job.id}")
+                return {}
+            logger.warning(f"Email queue unavailable, sending '{subject}' inline")
+
+        refused = self._deliver(recipients, msg)
+        logger.info(f"Email sent successfully to {', '.join(r for r in recipients if r not in refused)}")
+        return refused
+
+    def _dispatch_after_commit(self, recipients, subject, msg, priority=EmailPriority.workflow):
+        """Hold a message until the caller's transaction commits"""
+        def dispatch():
+            try:
+                self._dispatch(recipients, subject, msg, priority)
+            except Exception as e:
+                logger.error(f"Failed to send '{subject}' after commit: {str(e)}")
+        run_after_commit(db.session, dispatch)
+
+    def _stage_outbox(self, recipients, subject, html_content, text_content=None,
+                      priority=EmailPriority.workflow):
+        """Write a message to the email outbox for the drainer to deliver"""
+        db.session.add(EmailOutbox(
+            recipients=json.dumps(recipients),
+            subject=subject,
+            html_content=html_content,
+            text_content=text_content,
+            priority=priority.value
+        ))
+        if not self.transactional:
+            try:
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+    def _smtp_pool(self):
+        return get_smtp_pool(
+            self.smtp_server, self.smtp_port, self.smtp_username, self.smtp_password,
+            timeout=self.smtp_timeout, **self.pool_options
+        )
+
+    def _rate_limiter(self):
+        return get_rate_limiter(self.smtp_server, **self.rate_limit)
+
+    def _deliver(self, recipients, msg, pool=None, critical=False):
+        """Hand a built message to the SMTP server over a pooled session.
+
+        Waits for a token from the provider's rate limiter first. Returns a dict
+        of refused recipients; raises if the whole transaction fails.
+        """
+        limiter = self._rate_limiter()
+        if limiter and not limiter.acquire(critical=critical, timeout=self.rate_limit_timeout):
+            raise smtplib.SMTPException(f"Rate limit for {self.smtp_server} not released within {self.rate_limit_timeout}s")
+
+        pool = pool or self._smtp_pool()
+        try:
+            with pool.connection() as server:
+                return server.send_message(msg, to_addrs=recipients)
+        except smtplib.SMTPServerDisconnected:
+            # A pooled session can be dropped by the server between the liveness
+            # check and the send; retry once on a fresh session
+            logger.info(f"SMTP session to {self.smtp_server} was closed, reconnecting")
+            with pool.connection() as server:
+                return server.send_message(msg, to_addrs=recipients)
+
     def send_credentials_email(self, user, raw_password):
         """Send initial credentials to a newly registered user."""
         try:
@@ -84,18 +326,18 @@ class EmailService:
                 f"Please change your password after logging in."
             )
 
-            return self.send_email(user.email, subject, html_content, text_content)
+            return self.send_email(user.email, subject, html_content, text_content,
+                                   priority=EmailPriority.critical)
         except Exception as e:
             logger.error(f"Failed to send credentials email: {str(e)}")
             return False
 
-    def send_welcome_email(self, user, raw_password):
-        """Send welcome email with generated user ID and temporary password."""
-        try:
-            subject = "Welcome to METIS Portal"
-            login_id = user.student_id or user.email
-            dept = user.department if getattr(user, 'department', None) else 'N/A'
-            html_content = f"""
+    def welcome_email_content(self, user, raw_password):
+        """Subject, HTML and text of the welcome email with the user's ID and temporary password"""
+        subject = "Welcome to METIS Portal"
+        login_id = user.student_id or user.email
+        dept = user.department if getattr(user, 'department', None) else 'N/A'
+        html_content = f"""
             <html>
               <body style='font-family:Arial,sans-serif'>
                 <h2>Welcome to METIS Portal</h2>
@@ -112,15 +354,22 @@ class EmailService:
               </body>
             </html>
             """
-            text_content = (
-                f"Welcome to METIS Portal\n\n"
-                f"User ID: {login_id}\n"
-                f"Email: {user.email}\n"
-                f"Department: {dept}\n"
-                f"Temporary Password: {raw_password}\n\n"
-                f"Please change your password after your first login."
-            )
-            return self.send_email(user.email, subject, html_content, text_content)
+        text_content = (
+            f"Welcome to METIS Portal\n\n"
+            f"User ID: {login_id}\n"
+            f"Email: {user.email}\n"
+            f"Department: {dept}\n"
+            f"Temporary Password: {raw_password}\n\n"
+            f"Please change your password after your first login."
+        )
+        return subject, html_content, text_content
+
+    def send_welcome_email(self, user, raw_password):
+        """Send welcome email with generated user ID and temporary password."""
+        try:
+            subject, html_content, text_content = self.welcome_email_content(user, raw_password)
+            return self.send_email(user.email, subject, html_content, text_content,
+                                   priority=EmailPriority.critical)
         except Exception as e:
             logger.error(f"Failed to send welcome email: {str(e)}")
             return False
@@ -129,15 +378,16 @@ class EmailService:
         """Send notification to appropriate approvers about new request"""
         try:
             # Check if request is from faculty - they skip project guide
-            submitter = User.query.get(request_obj.user_id)
+            # (session.get answers from the identity map when the submitter is already loaded)
+            submitter = db.session.get(User, request_obj.user_id)
             
             if submitter and submitter.role.value == 'faculty':
                 # Faculty requests go directly to HOD
-                approvers = User.query.filter_by(role='hod', is_active=True).all()
+                approvers = get_approvers('hod')
                 approver_type = "HOD"
             else:
                 # Student/External requests go to project guides first
-                approvers = User.query.filter_by(role='project_guide', is_active=True).all()
+                approvers = get_approvers('project_guide')
                 approver_type = "project guide"
             
             if not approvers:
@@ -150,11 +400,10 @@ class EmailService:
             html_content = self._get_new_request_email_template(request_obj)
             text_content = self._get_new_request_email_text(request_obj)
 
-            # Send to all appropriate approvers
-            success_count = 0
-            for approver in approvers:
-                if self.send_email(approver.email, subject, html_content, text_content):
-                    success_count += 1
+            summary = f"New request #{request_obj.id}: {request_obj.project_title}"
+            success_count = self._notify_approvers(
+                approvers, request_obj, 'new_request', subject, html_content, text_content, summary
+            )
 
             logger.info(f"New request notification sent to {success_count}/{len(approvers)} {approver_type}s")
             return success_count > 0
@@ -219,7 +468,7 @@ class EmailService:
                 return False
             
             # Get users with the next role
-            next_approvers = User.query.filter_by(role=next_role, is_active=True).all()
+            next_approvers = get_approvers(next_role)
             
             if not next_approvers:
                 logger.warning(f"No {next_role} users found for stage approval notification")
@@ -231,11 +480,11 @@ class EmailService:
             html_content = self._get_stage_approval_email_template(request_obj, approved_by, stage, next_role)
             text_content = self._get_stage_approval_email_text(request_obj, approved_by, stage, next_role)
 
-            # Send to all next approvers
-            success_count = 0
-            for approver in next_approvers:
-                if self.send_email(approver.email, subject, html_content, text_content):
-                    success_count += 1
+            summary = (f"Request #{request_obj.id}: {request_obj.project_title} - approved at "
+                       f"{stage.replace('_', ' ').title()} stage by {approved_by.full_name}")
+            success_count = self._notify_approvers(
+                next_approvers, request_obj, 'stage_approval', subject, html_content, text_content, summary
+            )
 
             logger.info(f"Stage approval notification sent to {success_count}/{len(next_approvers)} {next_role} users")
             return success_count > 0
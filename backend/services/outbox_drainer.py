@@ -0,0 +1,265 @@
+"""
+Delivers rows from the email outbox.
+
+Rows are claimed in batches so that several drainers can run side by side:
+PostgreSQL uses SELECT ... FOR UPDATE SKIP LOCKED, SQLite (which has no row
+locks) claims rows by stamping a lease in a single UPDATE. A lease that is not
+released in time - the drainer died mid-batch - makes the row claimable again,
+which gives at-least-once delivery.
+
+With EMAIL_DELIVERY_MODE=outbox, `flask email drain-outbox` runs as its own
+process. In the other modes only bulk jobs (user imports) write to the outbox,
+and each web process drains it from a background thread instead
+(drain_in_background), resuming on its first request after a restart.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import and_, case, func, or_
+from backend.models.database import db
+from backend.models.email_outbox import EmailOutbox, OutboxStatusEnum
+
+logger = logging.getLogger(__name__)
+
+
+def _clear_body(row):
+    # Bodies can carry temporary passwords (welcome and credential mails); once a row
+    # will not be sent again only its envelope and status are kept
+    row.html_content = ''
+    row.text_content = None
+
+
+class OutboxDrainer:
+    def __init__(self, email_service, batch_size=50, lease_seconds=300,
+                 max_attempts=5, retry_backoff=60):
+        self.email_service = email_service
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+    # Workflow notifications are claimed ahead of digests
+    _priority_order = case((EmailOutbox.priority == 'digest', 1), else_=0)
+
+    def _claimable(self, now):
+        return or_(
+            and_(EmailOutbox.status == OutboxStatusEnum.pending, EmailOutbox.next_attempt_at <= now),
+            and_(EmailOutbox.status == OutboxStatusEnum.sending, EmailOutbox.lease_expires_at < now)
+        )
+
+    def claim_batch(self):
+        """Lease up to batch_size due rows to this drainer and return them"""
+        now = datetime.utcnow()
+        lease_expires_at = now + timedelta(seconds=self.lease_seconds)
+
+        if db.engine.dialect.name == 'postgresql':
+            rows = (
+                EmailOutbox.query
+                .filter(self._claimable(now))
+                .order_by(self._priority_order, EmailOutbox.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+            for row in rows:
+                row.status = OutboxStatusEnum.sending
+                row.lease_owner = self.worker_id
+                row.lease_expires_at = lease_expires_at
+            db.session.commit()
+            return rows
+
+        # No row locks: the claim is the UPDATE itself, guarded by the same
+        # predicate so two drainers cannot both lease a row
+        due_ids = (
+            db.session.query(EmailOutbox.id)
+            .filter(self._claimable(now))
+            .order_by(self._priority_order, EmailOutbox.id)
+            .limit(self.batch_size)
+            .scalar_subquery()
+        )
+        EmailOutbox.query.filter(
+            EmailOutbox.id.in_(due_ids),
+            self._claimable(now)
+        ).update({
+            EmailOutbox.status: OutboxStatusEnum.sending,
+            EmailOutbox.lease_owner: self.worker_id,
+            EmailOutbox.lease_expires_at: lease_expires_at
+        }, synchronize_session=False)
+        db.session.commit()
+
+        return (
+            EmailOutbox.query
+            .filter_by(status=OutboxStatusEnum.sending, lease_owner=self.worker_id)
+            .order_by(self._priority_order, EmailOutbox.id)
+            .all()
+        )
+
+    def deliver(self, row):
+        """Send one outbox row, recording success or scheduling a retry"""
+        row.attempts += 1
+        try:
+            refused = self.email_service.deliver_message(
+                row.recipient_list, row.subject, row.html_content, row.text_content
+            )
+        except Exception as e:
+            row.last_error = str(e)
+            row.lease_owner = None
+            row.lease_expires_at = None
+            if row.attempts >= self.max_attempts:
+                row.status = OutboxStatusEnum.failed
+                _clear_body(row)
+                logger.error(f"Outbox email {row.id} failed after {row.attempts} attempts: {e}")
+            else:
+                row.status = OutboxStatusEnum.pending
+                row.next_attempt_at = datetime.utcnow() + timedelta(
+                    seconds=self.retry_backoff * (2 ** (row.attempts - 1))
+                )
+                logger.warning(f"Outbox email {row.id} attempt {row.attempts} failed: {e}")
+            return False
+
+        row.status = OutboxStatusEnum.sent
+        row.sent_at = datetime.utcnow()
+        row.lease_owner = None
+        row.lease_expires_at = None
+        row.last_error = f"Refused: {', '.join(refused)}" if refused else None
+        _clear_body(row)
+        return True
+
+    def drain_once(self):
+        """Claim and deliver one batch. Returns (sent, failed) counts."""
+        rows = self.claim_batch()
+        sent = failed = 0
+        for row in rows:
+            if self.deliver(row):
+                sent += 1
+            else:
+                failed += 1
+        if rows:
+            db.session.commit()
+            logger.info(f"Outbox batch delivered: {sent} sent, {failed} failed")
+        return sent, failed
+
+    def run(self, interval=5.0, once=False):
+        """Drain until the outbox is empty (once) or forever, polling every interval seconds"""
+        total_sent = total_failed = 0
+        while True:
+            try:
+                sent, failed = self.drain_once()
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Outbox drain failed: {e}")
+                sent = failed = 0
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                continue
+            if once:
+                return total_sent, total_failed
+            time.sleep(interval)
+
+    def purge(self, older_than_days):
+        """Delete sent and failed rows created more than older_than_days ago. Returns the count."""
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+        deleted = EmailOutbox.query.filter(
+            EmailOutbox.status.in_([OutboxStatusEnum.sent, OutboxStatusEnum.failed]),
+            EmailOutbox.created_at < cutoff
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        return deleted
+
+    def next_due_in(self):
+        """Seconds until the next pending or leased row can be claimed, or None if none are left"""
+        next_attempt = db.session.query(func.min(EmailOutbox.next_attempt_at)).filter(
+            EmailOutbox.status == OutboxStatusEnum.pending
+        ).scalar()
+        lease_expiry = db.session.query(func.min(EmailOutbox.lease_expires_at)).filter(
+            EmailOutbox.status == OutboxStatusEnum.sending
+        ).scalar()
+        db.session.rollback()
+        due = [at for at in (next_attempt, lease_expiry) if at is not None]
+        if not due:
+            return None
+        return max(0.0, (min(due) - datetime.utcnow()).total_seconds())
+
+    def drain_backlog(self, max_sleep=30.0):
+        """Drain until no pending or leased rows are left, sleeping through retry backoffs"""
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = self.run(once=True)
+            total_sent += sent
+            total_failed += failed
+            wait = self.next_due_in()
+            if wait is None:
+                return total_sent, total_failed
+            time.sleep(min(max(wait, 0.5), max_sleep))
+
+
+def configured_drainer(batch_size=None):
+    """An OutboxDrainer set up from the app config"""
+    from backend.services.email_service import EmailService
+
+    config = current_app.config
+    return OutboxDrainer(
+        EmailService(),
+        batch_size=batch_size or config.get('OUTBOX_BATCH_SIZE', 50),
+        lease_seconds=config.get('OUTBOX_LEASE_SECONDS', 300),
+        max_attempts=config.get('OUTBOX_MAX_ATTEMPTS', 5),
+        retry_backoff=config.get('OUTBOX_RETRY_BACKOFF', 60)
+    )
+
+
+_background_lock = threading.Lock()
+_background = {'pid': None, 'thread': None, 'again': False}
+
+
+def drain_in_background(app):
+    """Drain the outbox from a daemon thread in this process, unless one is already at it"""
+    with _background_lock:
+        _background['again'] = True
+        thread = _background['thread']
+        if _background['pid'] == os.getpid() and thread is not None and thread.is_alive():
+            return
+        _background['pid'] = os.getpid()
+        thread = threading.Thread(target=_drain_thread, args=(app,), name='outbox-drain', daemon=True)
+        _background['thread'] = thread
+    thread.start()
+
+
+def _drain_thread(app):
+    with app.app_context():
+        try:
+            while True:
+                with _background_lock:
+                    if not _background['again']:
+                        # Checked under the lock so a row staged meanwhile starts a new thread
+                        _background['thread'] = None
+                        return
+                    _background['again'] = False
+                sent, failed = configured_drainer().drain_backlog()
+                if sent or failed:
+                    logger.info(f"Background outbox drain: {sent} sent, {failed} failed")
+        except Exception as e:
+            logger.error(f"Background outbox drain failed: {e}")
+            with _background_lock:
+                _background['thread'] = None
+        finally:
+            db.session.remove()
+
+
+def init_outbox_drain(app):
+    """Outside outbox mode, drain rows left in the outbox (e.g. by a restart mid-import) on each
+    process's first request, so they do not wait for the next import"""
+    if app.config.get('EMAIL_DELIVERY_MODE', 'sync') == 'outbox':
+        return
+
+    # On first request rather than here: threads do not survive a fork, and CLI commands build the app too
+    @app.before_request
+    def _resume_outbox_drain():
+        if _background['pid'] != os.getpid():
+            drain_in_background(app)
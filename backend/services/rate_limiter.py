@@ -0,0 +1,105 @@
+"""
+Token-bucket rate limiting for outbound SMTP.
+
+Every SMTP transaction takes one token from the bucket of the provider it is
+sent through, so a burst of notifications is smoothed out to the provider's
+sending quota instead of tripping it. Part of each bucket is reserved for
+critical mail (OTP and credential emails): other mail has to leave the
+reserve untouched, so a backlog of notifications cannot starve a password
+reset.
+"""
+import threading
+import time
+
+# Cap on a single wait so callers re-check the bucket periodically
+_MAX_SLEEP = 1.0
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `rate` tokens per second"""
+
+    def __init__(self, rate, capacity, reserve=0):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.reserve = min(max(0, reserve), self.capacity - 1)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.granted = 0
+        self.throttled = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+
+    def acquire(self, critical=False, timeout=None):
+        """Take a token, waiting for one if necessary.
+
+        Returns False if no token became available within timeout seconds.
+        """
+        floor = 0 if critical else self.reserve
+        deadline = None if timeout is None else time.monotonic() + timeout
+        started = time.monotonic()
+        waited = False
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens - 1 >= floor:
+                    self._tokens -= 1
+                    self.granted += 1
+                    if waited:
+                        self.wait_seconds += time.monotonic() - started
+                    return True
+                if not waited:
+                    self.throttled += 1
+                    waited = True
+                needed = floor + 1 - self._tokens
+                delay = needed / self.rate if self.rate > 0 else _MAX_SLEEP
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    with self._lock:
+                        self.timeouts += 1
+                        self.wait_seconds += time.monotonic() - started
+                    return False
+                delay = min(delay, remaining)
+            time.sleep(min(delay, _MAX_SLEEP))
+
+    def stats(self):
+        with self._lock:
+            self._refill()
+            return {
+                'tokens': round(self._tokens, 2),
+                'capacity': self.capacity,
+                'reserve': self.reserve,
+                'rate_per_minute': round(self.rate * 60, 2),
+                'granted': self.granted,
+                'throttled': self.throttled,
+                'timeouts': self.timeouts,
+                'wait_seconds': round(self.wait_seconds, 3)
+            }
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def get_rate_limiter(provider, per_minute, burst, reserve=0):
+    """Return the process-wide bucket for an SMTP provider, or None if unlimited"""
+    if not per_minute or per_minute <= 0:
+        return None
+    with _buckets_lock:
+        bucket = _buckets.get(provider)
+        if bucket is None:
+            bucket = TokenBucket(per_minute / 60.0, burst, reserve)
+            _buckets[provider] = bucket
+        return bucket
+
+
+def rate_limiter_stats():
+    with _buckets_lock:
+        buckets = dict(_buckets)
+    return {provider: bucket.stats() for provider, bucket in buckets.items()}
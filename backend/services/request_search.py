@@ -0,0 +1,249 @@
+"""
+Full-text search over project requests.
+
+Searching with ilike('%term%') cannot use an index, so every search scanned
+project_requests. The search index covers the title, purpose, description and
+the requester's name, and is kept in sync by database triggers, so every
+write path keeps it current, raw SQL included:
+
+    SQLite      FTS5 table project_requests_fts (rowid = request id),
+                ranked with bm25()
+    PostgreSQL  tsvector column project_requests.search_vector with a GIN
+                index, ranked with ts_rank()
+
+Both use simple tokenization (no stemming). Every word of the search term
+must match, as a prefix, so partial input like "mach lear" finds
+"Machine Learning". When neither index exists
+(e.g. SQLite built without FTS5) search falls back to ILIKE.
+
+The index is created by the add_request_search migration, or by
+ensure_search_index() for databases set up with db.create_all().
+"""
+import logging
+import re
+from sqlalchemy import Float, Integer, and_, column, inspect, or_, text
+from sqlalchemy.orm import aliased
+from backend.models.database import db
+from backend.models.project_request import ProjectRequest
+from backend.models.user import User
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+# Column weights, most to least important: title, requester, purpose, description
+_BM25_WEIGHTS = '10.0, 5.0, 3.0, 1.0'
+
+SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS project_requests_fts USING fts5(
+        project_title, requester, purpose, description, tokenize = 'unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS project_requests_fts_insert AFTER INSERT ON project_requests BEGIN
+        INSERT INTO project_requests_fts (rowid, project_title, requester, purpose, description)
+        VALUES (new.id, new.project_title,
+                (SELECT first_name || ' ' || last_name FROM users WHERE id = new.user_id),
+                new.purpose, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS project_requests_fts_update
+    AFTER UPDATE OF project_title, purpose, description, user_id ON project_requests BEGIN
+        DELETE FROM project_requests_fts WHERE rowid = old.id;
+        INSERT INTO project_requests_fts (rowid, project_title, requester, purpose, description)
+        VALUES (new.id, new.project_title,
+                (SELECT first_name || ' ' || last_name FROM users WHERE id = new.user_id),
+                new.purpose, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS project_requests_fts_delete AFTER DELETE ON project_requests BEGIN
+        DELETE FROM project_requests_fts WHERE rowid = old.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS users_fts_rename AFTER UPDATE OF first_name, last_name ON users BEGIN
+        UPDATE project_requests_fts SET requester = new.first_name || ' ' || new.last_name
+        WHERE rowid IN (SELECT id FROM project_requests WHERE user_id = new.id);
+    END""",
+]
+
+SQLITE_REBUILD = [
+    "DELETE FROM project_requests_fts",
+    """INSERT INTO project_requests_fts (rowid, project_title, requester, purpose, description)
+       SELECT r.id, r.project_title, u.first_name || ' ' || u.last_name, r.purpose, r.description
+       FROM project_requests r LEFT JOIN users u ON u.id = r.user_id""",
+]
+
+_PG_VECTOR = """
+    setweight(to_tsvector('simple', coalesce({r}.project_title, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce({requester}, '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce({r}.purpose, '')), 'C') ||
+    setweight(to_tsvector('simple', coalesce({r}.description, '')), 'D')
+"""
+
+POSTGRESQL_DDL = [
+    "ALTER TABLE project_requests ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    "CREATE INDEX IF NOT EXISTS ix_project_requests_search ON project_requests USING GIN (search_vector)",
+    """CREATE OR REPLACE FUNCTION project_requests_search_vector() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := """ + _PG_VECTOR.format(
+            r='NEW', requester="(SELECT first_name || ' ' || last_name FROM users WHERE id = NEW.user_id)") + """;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql""",
+    "DROP TRIGGER IF EXISTS project_requests_search_vector ON project_requests",
+    """CREATE TRIGGER project_requests_search_vector
+    BEFORE INSERT OR UPDATE OF project_title, purpose, description, user_id ON project_requests
+    FOR EACH ROW EXECUTE FUNCTION project_requests_search_vector()""",
+    """CREATE OR REPLACE FUNCTION users_search_rename() RETURNS trigger AS $$
+    BEGIN
+        IF NEW.first_name IS DISTINCT FROM OLD.first_name OR NEW.last_name IS DISTINCT FROM OLD.last_name THEN
+            -- Touching user_id fires the request trigger, which re-reads the name
+            UPDATE project_requests SET user_id = user_id WHERE user_id = NEW.id;
+        END IF;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql""",
+    "DROP TRIGGER IF EXISTS users_search_rename ON users",
+    """CREATE TRIGGER users_search_rename AFTER UPDATE OF first_name, last_name ON users
+    FOR EACH ROW EXECUTE FUNCTION users_search_rename()""",
+]
+
+POSTGRESQL_REBUILD = [
+    "UPDATE project_requests r SET search_vector = " + _PG_VECTOR.format(
+        r='r', requester="(SELECT first_name || ' ' || last_name FROM users u WHERE u.id = r.user_id)"),
+]
+
+# Created by the DDL above rather than declared on the models, so autogenerate
+# must not treat them as stale (FTS5 also adds project_requests_fts_* shadow tables)
+SEARCH_TABLE = 'project_requests_fts'
+SEARCH_COLUMN = ('project_requests', 'search_vector')
+SEARCH_INDEX = 'ix_project_requests_search'
+
+
+def is_search_object(name, type_, table_name=None):
+    """True for the tables, columns and indexes owned by the search index"""
+    if type_ == 'table':
+        return name == SEARCH_TABLE or name.startswith(SEARCH_TABLE + '_')
+    if type_ == 'column':
+        return (table_name, name) == SEARCH_COLUMN
+    if type_ == 'index':
+        return name == SEARCH_INDEX
+    return False
+
+
+_backends = {}
+
+
+def search_backend():
+    """'fts5', 'tsvector' or None when the database has no search index"""
+    engine = db.engine
+    key = str(engine.url)
+    if key not in _backends:
+        inspector = inspect(engine)
+        if engine.dialect.name == 'sqlite' and 'project_requests_fts' in inspector.get_table_names():
+            _backends[key] = 'fts5'
+        elif engine.dialect.name == 'postgresql' and any(
+            c['name'] == 'search_vector' for c in inspector.get_columns('project_requests')
+        ):
+            _backends[key] = 'tsvector'
+        else:
+            _backends[key] = None
+    return _backends[key]
+
+
+def ensure_search_index(rebuild=False):
+    """Create the search index and its triggers if missing (filling it from existing rows). Returns the backend."""
+    dialect = db.engine.dialect.name
+    existing = search_backend()
+    if dialect == 'sqlite':
+        statements, refill = SQLITE_DDL, SQLITE_REBUILD
+    elif dialect == 'postgresql':
+        statements, refill = POSTGRESQL_DDL, POSTGRESQL_REBUILD
+    else:
+        return None
+
+    try:
+        if existing is None:
+            for statement in statements:
+                db.session.execute(text(statement))
+        if existing is None or rebuild:
+            for statement in refill:
+                db.session.execute(text(statement))
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.warning(f"Full-text search index unavailable, falling back to ILIKE: {e}")
+        return None
+    finally:
+        _backends.pop(str(db.engine.url), None)
+    return search_backend()
+
+
+def _words(term):
+    return [word.lower() for word in _WORD.findall(term or '')]
+
+
+def _fts5_query(words):
+    # Quote each word so FTS5 operators in user input are taken literally
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def _tsquery(words):
+    return ' & '.join(f"{word}:*" for word in words)
+
+
+def _fallback_filter(words):
+    # Aliased so the EXISTS is not correlated with a users table the caller already joined
+    requester = aliased(User)
+    return and_(*[
+        or_(
+            ProjectRequest.project_title.ilike(f"%{word}%"),
+            ProjectRequest.purpose.ilike(f"%{word}%"),
+            ProjectRequest.description.ilike(f"%{word}%"),
+            ProjectRequest.user.of_type(requester).has(
+                or_(requester.first_name.ilike(f"%{word}%"), requester.last_name.ilike(f"%{word}%"))
+            )
+        )
+        for word in words
+    ])
+
+
+def search_filter(term):
+    """A WHERE clause matching project requests for a search term, or None if the term has no words"""
+    words = _words(term)
+    if not words:
+        return None
+    backend = search_backend()
+    if backend == 'fts5':
+        matches = text(
+            "SELECT rowid FROM project_requests_fts WHERE project_requests_fts MATCH :fts_query"
+        ).bindparams(fts_query=_fts5_query(words)).columns(column('rowid', Integer))
+        return ProjectRequest.id.in_(matches)
+    if backend == 'tsvector':
+        return text("project_requests.search_vector @@ to_tsquery('simple', :ts_query)").bindparams(
+            ts_query=_tsquery(words))
+    return _fallback_filter(words)
+
+
+def apply_search(query, term):
+    """Filter a ProjectRequest query by a search term, leaving its ordering alone"""
+    clause = search_filter(term)
+    return query.filter(clause) if clause is not None else query
+
+
+def ranked_search(query, term):
+    """Filter a ProjectRequest query by a search term and order it by relevance, best first"""
+    words = _words(term)
+    if not words:
+        return query
+    backend = search_backend()
+    if backend == 'fts5':
+        ranked = text(
+            f"SELECT rowid AS id, bm25(project_requests_fts, {_BM25_WEIGHTS}) AS rank "
+            f"FROM project_requests_fts WHERE project_requests_fts MATCH :fts_query"
+        ).bindparams(fts_query=_fts5_query(words)).columns(column('id', Integer), column('rank', Float)).subquery()
+        # bm25() is lower for better matches
+        return query.join(ranked, ranked.c.id == ProjectRequest.id).order_by(
+            None).order_by(ranked.c.rank, ProjectRequest.id.desc())
+    if backend == 'tsvector':
+        ts_query = _tsquery(words)
+        rank = text("ts_rank(project_requests.search_vector, to_tsquery('simple', :rank_query)) DESC").bindparams(
+            rank_query=ts_query)
+        return query.filter(search_filter(term)).order_by(None).order_by(rank, ProjectRequest.id.desc())
+    return query.filter(_fallback_filter(words)).order_by(None).order_by(
+        ProjectRequest.submitted_at.desc(), ProjectRequest.id.desc())
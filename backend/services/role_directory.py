@@ -0,0 +1,156 @@
+"""
+In-process cache of active users by role, used to resolve notification recipients.
+
+Notification fan-outs only need each approver's id, email, name and delivery
+preference, so the directory keeps exactly that per role instead of loading
+full User rows on every send. Entries are dropped when a User is inserted,
+deleted or has one of the cached columns changed; the commit also touches a
+shared version file so other worker processes drop theirs on their next
+lookup. A TTL bounds staleness if the file cannot be written.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+from backend.models.database import db
+from backend.models.user import User, RoleEnum
+
+logger = logging.getLogger(__name__)
+
+ApproverContact = namedtuple('ApproverContact', ['id', 'email', 'full_name', 'notification_preference'])
+
+# Columns whose change makes a cached entry wrong; last_login, updated_at etc. are ignored
+_CACHED_COLUMNS = ('role', 'is_active', 'email', 'first_name', 'last_name', 'notification_preference')
+
+
+class RoleDirectory:
+    def __init__(self, version_file, ttl=300):
+        self.version_file = version_file
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, role):
+        """Return the active users with a role as a list of ApproverContact"""
+        role = RoleEnum(role)
+        version = self._read_version()
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get(role)
+            if cached and cached[0] == version and now - cached[1] < self.ttl:
+                self.hits += 1
+                return cached[2]
+            self.misses += 1
+
+        rows = (
+            db.session.query(User.id, User.email, User.first_name, User.last_name, User.notification_preference)
+            .filter(User.role == role, User.is_active == True)
+            .order_by(User.id)
+            .all()
+        )
+        contacts = [
+            ApproverContact(row.id, row.email, f"{row.first_name} {row.last_name}", row.notification_preference)
+            for row in rows
+        ]
+        with self._lock:
+            self._entries[role] = (version, now, contacts)
+        return contacts
+
+    def invalidate(self, broadcast=True):
+        with self._lock:
+            self._entries.clear()
+        if broadcast:
+            self._bump_version()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'roles_cached': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+    def _read_version(self):
+        try:
+            return os.stat(self.version_file).st_mtime_ns
+        except OSError:
+            return 0
+
+    def _bump_version(self):
+        try:
+            with open(self.version_file, 'a'):
+                pass
+            # Nanosecond stamp so two bumps within a coarse mtime tick still differ
+            now = time.time_ns()
+            os.utime(self.version_file, ns=(now, now))
+        except OSError as e:
+            logger.warning(f"Could not update role directory version file {self.version_file}: {e}")
+
+
+def _user_changed(mapper, connection, target):
+    state = inspect(target)
+    if state.session is not None and any(state.attrs[name].history.has_changes() for name in _CACHED_COLUMNS):
+        state.session.info['role_directory_dirty'] = True
+
+
+def _user_added_or_removed(mapper, connection, target):
+    session = inspect(target).session
+    if session is not None:
+        session.info['role_directory_dirty'] = True
+
+
+def invalidate_on_commit(session):
+    """Drop cached entries once session commits users written outside the unit of work"""
+    session.info['role_directory_dirty'] = True
+
+
+def _after_commit(session):
+    if session.info.pop('role_directory_dirty', False) and has_app_context():
+        # Other apps on the same database see the version file change
+        directory = current_app.extensions.get('role_directory')
+        if directory is not None:
+            directory.invalidate()
+
+
+def _after_rollback(session):
+    session.info.pop('role_directory_dirty', None)
+
+
+event.listen(User, 'after_insert', _user_added_or_removed)
+event.listen(User, 'after_delete', _user_added_or_removed)
+event.listen(User, 'after_update', _user_changed)
+
+
+def init_role_directory(app):
+    """Create the application's role directory and hook invalidation into db.session"""
+    version_file = app.config.get('ROLE_DIRECTORY_VERSION_FILE')
+    if not version_file:
+        # One file per database, shared by every worker on the host
+        digest = hashlib.sha1(app.config['SQLALCHEMY_DATABASE_URI'].encode()).hexdigest()[:12]
+        version_file = os.path.join(tempfile.gettempdir(), f"metis_role_directory_{digest}.version")
+
+    directory = RoleDirectory(version_file, ttl=app.config.get('ROLE_DIRECTORY_TTL', 300))
+    app.extensions['role_directory'] = directory
+
+    if not event.contains(db.session, 'after_commit', _after_commit):
+        event.listen(db.session, 'after_commit', _after_commit)
+        event.listen(db.session, 'after_rollback', _after_rollback)
+    return directory
+
+
+def get_approvers(role):
+    """Active users with a role, from the directory when the app has one"""
+    directory = current_app.extensions.get('role_directory')
+    if directory is not None:
+        return directory.get(role)
+    return [
+        ApproverContact(user.id, user.email, user.full_name, user.notification_preference)
+        for user in User.query.filter_by(role=role, is_active=True).all()
+    ]
@@ -0,0 +1,209 @@
+"""
+Pool of authenticated SMTP sessions shared by EmailService.
+
+Opening a session costs a TCP connect, STARTTLS and AUTH; the pool keeps
+sessions open and reuses them for many messages, probing idle sessions with
+NOOP and resetting the envelope with RSET before handing them back out.
+"""
+import logging
+import os
+import smtplib
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+def _session_survives(error):
+    """True if the server answered with a refusal rather than dropping the session"""
+    if isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPHeloError,
+                          smtplib.SMTPAuthenticationError)):
+        return False
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    # 421 means the server is closing the channel
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code != 421
+
+
+class PooledConnection:
+    """An authenticated SMTP session plus bookkeeping used by the pool"""
+
+    def __init__(self, smtp):
+        self.smtp = smtp
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.messages_sent = 0
+
+    def close(self):
+        try:
+            self.smtp.quit()
+        except Exception:
+            try:
+                self.smtp.close()
+            except Exception:
+                pass
+
+
+class SMTPConnectionPool:
+    """Bounded pool of reusable SMTP sessions for one server/account"""
+
+    def __init__(self, host, port, username, password, use_tls=True, timeout=10,
+                 max_size=4, idle_timeout=60, max_messages=100, probe_after=5):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.max_size = max(1, max_size)
+        self.idle_timeout = idle_timeout
+        self.max_messages = max_messages
+        self.probe_after = probe_after
+        self._idle = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_size)
+        self.handshakes = 0
+        self.reused = 0
+        self.discarded = 0
+        self.messages = 0
+
+    @contextmanager
+    def connection(self):
+        """Borrow a live session.
+
+        It is returned to the pool afterwards, also when the server refused the
+        message or its recipients (the session is still good once RSET); any
+        other error discards it.
+        """
+        self._slots.acquire()
+        conn = None
+        try:
+            conn = self._checkout()
+            yield conn.smtp
+        except Exception as e:
+            if conn is not None:
+                if _session_survives(e):
+                    self._checkin(conn)
+                else:
+                    self._discard(conn)
+                conn = None
+            raise
+        else:
+            conn.messages_sent += 1
+            conn.last_used = time.monotonic()
+            with self._lock:
+                self.messages += 1
+            self._checkin(conn)
+        finally:
+            self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'idle': len(self._idle),
+                'max_size': self.max_size,
+                'handshakes': self.handshakes,
+                'reused': self.reused,
+                'discarded': self.discarded,
+                'messages': self.messages
+            }
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def _checkout(self):
+        while True:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                return self._connect()
+
+            idle_for = time.monotonic() - conn.last_used
+            if idle_for > self.idle_timeout:
+                self._discard(conn)
+                continue
+            if idle_for > self.probe_after and not self._is_alive(conn):
+                self._discard(conn)
+                continue
+            with self._lock:
+                self.reused += 1
+            return conn
+
+    def _checkin(self, conn):
+        if self.max_messages and conn.messages_sent >= self.max_messages:
+            self._discard(conn)
+            return
+        try:
+            # Clear any envelope state left behind; also tells us the session survived
+            code, _ = conn.smtp.rset()
+            if code != 250:
+                raise smtplib.SMTPException(f"RSET returned {code}")
+        except Exception:
+            self._discard(conn)
+            return
+        with self._lock:
+            self._idle.append(conn)
+
+    def _connect(self):
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                smtp.starttls()
+            if self.username and self.password:
+                smtp.login(self.username, self.password)
+        except Exception:
+            smtp.close()
+            raise
+        with self._lock:
+            self.handshakes += 1
+        return PooledConnection(smtp)
+
+    def _is_alive(self, conn):
+        try:
+            code, _ = conn.smtp.noop()
+            return code == 250
+        except Exception:
+            return False
+
+    def _discard(self, conn):
+        with self._lock:
+            self.discarded += 1
+        conn.close()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+_pools_pid = None
+
+
+def get_smtp_pool(host, port, username, password, **options):
+    """Return the process-wide pool for an SMTP server and account"""
+    global _pools_pid
+    key = (host, port, username)
+    with _pools_lock:
+        # Sockets must not be shared with a forked child; start afresh
+        if _pools_pid != os.getpid():
+            _pools.clear()
+            _pools_pid = os.getpid()
+        pool = _pools.get(key)
+        if pool is None:
+            pool = SMTPConnectionPool(host, port, username, password, **options)
+            _pools[key] = pool
+        return pool
+
+
+def smtp_pool_stats():
+    with _pools_lock:
+        pools = dict(_pools) if _pools_pid == os.getpid() else {}
+    return {f"{host}:{port}": pool.stats() for (host, port, _), pool in pools.items()}
+
+
+def close_smtp_pools():
+    with _pools_lock:
+        pools = list(_pools.values()) if _pools_pid == os.getpid() else []
+    for pool in pools:
+        pool.close_all()
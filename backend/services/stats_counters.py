@@ -0,0 +1,238 @@
+"""
+Incrementally maintained counters behind the dashboard statistics.
+
+The dashboards used to run a COUNT(*) per figure on every load. Instead, an
+after_flush hook on db.session turns each User and ProjectRequest insert,
+delete and role/is_active/status/owner change into deltas on stats_counters
+rows, written in the same transaction as the change itself, so a rollback
+takes the counter update with it. The dashboards read all their figures with
+one primary-key lookup (read_counters).
+
+Changes that bypass the ORM unit of work (Query.update/delete, raw SQL) are
+not seen by the hook; bulk inserts report themselves (count_new_users), and
+`flask --app app stats reconcile` rebuilds the table from the source tables
+and reports any drift.
+"""
+import logging
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import event, func, inspect
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from backend.models.database import db
+from backend.models.stats_counter import StatsCounter
+from backend.models.user import User, RoleEnum
+from backend.models.project_request import ProjectRequest, StatusEnum
+
+logger = logging.getLogger(__name__)
+
+
+def _value(value):
+    return value.value if hasattr(value, 'value') else value
+
+
+def user_keys(role, is_active):
+    keys = ['users.total', f"users.role.{_value(role)}"]
+    if is_active:
+        keys.append('users.active')
+    return keys
+
+
+def request_keys(user_id, status):
+    status = _value(status)
+    return [
+        'requests.total',
+        f"requests.status.{status}",
+        f"requests.user.{user_id}.total",
+        f"requests.user.{user_id}.status.{status}"
+    ]
+
+
+# What each model contributes to the counters, and the columns that decide it
+_TRACKED = {
+    User: (('role', 'is_active'), user_keys),
+    ProjectRequest: (('user_id', 'status'), request_keys),
+}
+
+
+def _current(state, columns):
+    return [state.attrs[name].value for name in columns]
+
+
+def _previous(state, columns):
+    values = []
+    for name in columns:
+        history = state.attrs[name].history
+        values.append(history.deleted[0] if history.deleted else state.attrs[name].value)
+    return values
+
+
+def _collect_deltas(session):
+    deltas = Counter()
+    for obj in session.new:
+        tracked = _TRACKED.get(type(obj))
+        if tracked:
+            columns, keys = tracked
+            for key in keys(*_current(inspect(obj), columns)):
+                deltas[key] += 1
+    for obj in session.deleted:
+        tracked = _TRACKED.get(type(obj))
+        if tracked:
+            columns, keys = tracked
+            for key in keys(*_previous(inspect(obj), columns)):
+                deltas[key] -= 1
+    for obj in session.dirty:
+        tracked = _TRACKED.get(type(obj))
+        if not tracked or obj in session.deleted:
+            continue
+        columns, keys = tracked
+        state = inspect(obj)
+        if not any(state.attrs[name].history.has_changes() for name in columns):
+            continue
+        for key in keys(*_previous(state, columns)):
+            deltas[key] -= 1
+        for key in keys(*_current(state, columns)):
+            deltas[key] += 1
+    return {key: delta for key, delta in deltas.items() if delta}
+
+
+def _upsert(connection, deltas):
+    table = StatsCounter.__table__
+    now = datetime.utcnow()
+    dialect = connection.dialect.name
+    # Sorted so concurrent transactions lock counter rows in the same order
+    for key in sorted(deltas):
+        delta = deltas[key]
+        if dialect in ('postgresql', 'sqlite'):
+            insert = postgresql_insert if dialect == 'postgresql' else sqlite_insert
+            statement = insert(table).values(key=key, value=delta, updated_at=now)
+            statement = statement.on_conflict_do_update(
+                index_elements=[table.c.key],
+                set_={'value': table.c.value + statement.excluded.value, 'updated_at': now}
+            )
+            connection.execute(statement)
+        else:
+            result = connection.execute(
+                table.update().where(table.c.key == key).values(value=table.c.value + delta, updated_at=now)
+            )
+            if result.rowcount == 0:
+                connection.execute(table.insert().values(key=key, value=delta, updated_at=now))
+
+
+def _before_flush(session, flush_context, instances):
+    # After the flush a deleted row can no longer be loaded, so read what it counted towards now
+    for obj in session.deleted:
+        tracked = _TRACKED.get(type(obj))
+        if tracked:
+            _current(inspect(obj), tracked[0])
+
+
+def _after_flush(session, flush_context):
+    deltas = _collect_deltas(session)
+    if deltas:
+        _upsert(session.connection(), deltas)
+
+
+def _load_active_history(target, value, oldvalue, initiator):
+    return value
+
+
+def init_stats_counters(db):
+    """Register the flush hook that keeps stats_counters in step with users and requests"""
+    if event.contains(db.session, 'after_flush', _after_flush):
+        return
+    # Load the old value before a tracked column is overwritten, even when the
+    # attribute was expired by a commit, so the old bucket can be decremented
+    for model, (columns, _) in _TRACKED.items():
+        for name in columns:
+            event.listen(getattr(model, name), 'set', _load_active_history, active_history=True, retval=True)
+    event.listen(db.session, 'before_flush', _before_flush)
+    event.listen(db.session, 'after_flush', _after_flush)
+
+
+def count_new_users(users):
+    """Add (role, is_active) pairs inserted outside the unit of work (bulk imports) to the counters"""
+    deltas = Counter()
+    for role, is_active in users:
+        for key in user_keys(role, is_active):
+            deltas[key] += 1
+    if deltas:
+        _upsert(db.session.connection(), deltas)
+
+
+def read_counters(keys):
+    """Return {key: value} for the given counter keys (missing counters read as 0) in one query"""
+    keys = list(keys)
+    rows = db.session.query(StatsCounter.key, StatsCounter.value).filter(StatsCounter.key.in_(keys)).all()
+    values = dict.fromkeys(keys, 0)
+    values.update({row.key: row.value for row in rows})
+    return values
+
+
+def compute_counters():
+    """Count everything from the source tables with grouped queries"""
+    counters = Counter()
+    for role, is_active, count in (
+        db.session.query(User.role, User.is_active, func.count(User.id)).group_by(User.role, User.is_active)
+    ):
+        for key in user_keys(role, is_active):
+            counters[key] += count
+    for user_id, status, count in (
+        db.session.query(ProjectRequest.user_id, ProjectRequest.status, func.count(ProjectRequest.id))
+        .group_by(ProjectRequest.user_id, ProjectRequest.status)
+    ):
+        for key in request_keys(user_id, status):
+            counters[key] += count
+    return counters
+
+
+def reconcile_counters(dry_run=False):
+    """Rebuild stats_counters from the source tables. Returns {key: (stored, actual)} for every drifted key."""
+    table = StatsCounter.__table__
+    if db.engine.dialect.name == 'postgresql':
+        # Hold off concurrent counter updates until the rebuilt rows are committed
+        db.session.execute(db.text("LOCK TABLE stats_counters IN EXCLUSIVE MODE"))
+
+    stored = dict(db.session.query(StatsCounter.key, StatsCounter.value).all())
+    actual = compute_counters()
+    drift = {
+        key: (stored.get(key, 0), actual.get(key, 0))
+        for key in set(stored) | set(actual)
+        if stored.get(key, 0) != actual.get(key, 0)
+    }
+
+    if dry_run:
+        db.session.rollback()
+        return drift
+
+    now = datetime.utcnow()
+    rows = [{'key': key, 'value': value, 'updated_at': now} for key, value in actual.items() if value]
+    db.session.execute(table.delete())
+    if rows:
+        db.session.execute(table.insert(), rows)
+    db.session.commit()
+    if drift:
+        logger.warning(f"Stats counters reconciled; {len(drift)} key(s) had drifted")
+    return drift
+
+
+def global_keys():
+    keys = ['users.total', 'users.active', 'requests.total']
+    keys += [f"users.role.{role.value}" for role in RoleEnum]
+    keys += [f"requests.status.{status.value}" for status in StatusEnum]
+    return keys
+
+
+def global_counters():
+    """All global user and request counters, keyed as in stats_counters, in one query"""
+    return read_counters(global_keys())
+
+
+def user_request_counters(user_id):
+    """A user's request total and per-status counts as {'total': n, 'by_status': {status: n}}"""
+    prefix = f"requests.user.{user_id}"
+    values = read_counters([f"{prefix}.total"] + [f"{prefix}.status.{status.value}" for status in StatusEnum])
+    return {
+        'total': values[f"{prefix}.total"],
+        'by_status': {status.value: values[f"{prefix}.status.{status.value}"] for status in StatusEnum}
+    }
@@ -0,0 +1,190 @@
+"""
+Shared dashboard statistics with a per-process TTL cache.
+
+Every dashboard used to compute its own copy of the same figures. StatsService
+builds one snapshot of the global user and request breakdowns and one per
+user, and keeps them for STATS_CACHE_TTL seconds. With STATS_SOURCE='counters'
+(default) a snapshot is a single primary-key read of stats_counters; with
+'grouped' it is one GROUP BY per table over users and project_requests, for
+deployments where the counters are not maintained.
+
+Cached snapshots are dropped when a commit in this process inserts or deletes
+a User or ProjectRequest or changes one of the columns the figures depend on.
+Other worker processes pick the change up when their TTL runs out.
+"""
+import threading
+import time
+from collections import Counter
+from flask import current_app, has_app_context
+from sqlalchemy import event, func, inspect
+from backend.models.database import db
+from backend.models.user import User, RoleEnum
+from backend.models.project_request import ProjectRequest, StatusEnum
+from backend.services.stats_counters import (
+    compute_counters, global_counters, global_keys, request_keys, user_request_counters
+)
+
+# Columns whose change alters a figure; anything else (last_login, updated_at, ...) is ignored
+_COUNTED_COLUMNS = {
+    User: ('role', 'is_active'),
+    ProjectRequest: ('user_id', 'status'),
+}
+
+
+class StatsService:
+    def __init__(self, ttl=30, source='counters', max_users=1000):
+        self.ttl = ttl
+        self.source = source
+        self.max_users = max_users
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._generation = 0
+
+    def global_stats(self):
+        """Global counters keyed as in stats_counters ('users.total', 'requests.status.pending', ...)"""
+        return self._cached('global', self._load_global)
+
+    def user_stats(self, user_id):
+        """A user's requests as {'total': n, 'by_status': {status: n}}"""
+        return self._cached(('user', user_id), lambda: self._load_user(user_id))
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'source': self.source,
+                'ttl': self.ttl,
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'invalidations': self.invalidations
+            }
+
+    def _cached(self, key, load):
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached and cached[0] > now:
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+            generation = self._generation
+
+        value = load()
+        with self._lock:
+            if generation != self._generation:
+                # Invalidated while loading; the value may predate the commit
+                return value
+            if len(self._entries) >= self.max_users:
+                # Per-user snapshots are cheap to rebuild; start over rather than track recency
+                self._entries.clear()
+            self._entries[key] = (now + self.ttl, value)
+        return value
+
+    def _load_global(self):
+        if self.source == 'grouped':
+            counters = compute_counters()
+            return {key: counters.get(key, 0) for key in global_keys()}
+        return global_counters()
+
+    def _load_user(self, user_id):
+        if self.source == 'grouped':
+            counters = Counter()
+            for status, count in (
+                db.session.query(ProjectRequest.status, func.count(ProjectRequest.id))
+                .filter(ProjectRequest.user_id == user_id)
+                .group_by(ProjectRequest.status)
+            ):
+                for key in request_keys(user_id, status):
+                    counters[key] += count
+            return {
+                'total': counters[f"requests.user.{user_id}.total"],
+                'by_status': {
+                    status.value: counters[f"requests.user.{user_id}.status.{status.value}"] for status in StatusEnum
+                }
+            }
+        return user_request_counters(user_id)
+
+
+def _mark_if_counted(session):
+    for obj in list(session.new) + list(session.deleted):
+        if type(obj) in _COUNTED_COLUMNS:
+            return True
+    for obj in session.dirty:
+        columns = _COUNTED_COLUMNS.get(type(obj))
+        if columns:
+            state = inspect(obj)
+            if any(state.attrs[name].history.has_changes() for name in columns):
+                return True
+    return False
+
+
+def _after_flush(session, flush_context):
+    if _mark_if_counted(session):
+        session.info['stats_dirty'] = True
+
+
+def _after_commit(session):
+    if session.info.pop('stats_dirty', False) and has_app_context():
+        service = current_app.extensions.get('stats_service')
+        if service is not None:
+            service.invalidate()
+
+
+def _after_rollback(session):
+    session.info.pop('stats_dirty', None)
+
+
+
+def init_stats_service(app):
+    """Create the application's StatsService and hook invalidation into db.session"""
+    service = StatsService(
+        ttl=app.config.get('STATS_CACHE_TTL', 30),
+        source=app.config.get('STATS_SOURCE', 'counters')
+    )
+    app.extensions['stats_service'] = service
+
+    if not event.contains(db.session, 'after_commit', _after_commit):
+        event.listen(db.session, 'after_flush', _after_flush)
+        event.listen(db.session, 'after_commit', _after_commit)
+        event.listen(db.session, 'after_rollback', _after_rollback)
+    return service
+
+
+def _service():
+    service = current_app.extensions.get('stats_service')
+    if service is None:
+        # No cache configured: behave like an always-expired one
+        service = StatsService(ttl=0, source=current_app.config.get('STATS_SOURCE', 'counters'))
+    return service
+
+
+def global_stats():
+    """Global counters from the app's StatsService"""
+    return _service().global_stats()
+
+
+def user_stats(user_id):
+    """A user's request counts from the app's StatsService"""
+    return _service().user_stats(user_id)
+
+
+def workflow_stats():
+    """The statistics block shared by the guide, HOD and IT services dashboards"""
+    counters = global_stats()
+    return {
+        'students_count': counters[f"users.role.{RoleEnum.student.value}"],
+        'total_requests': counters['requests.total'],
+        'pending_requests': counters[f"requests.status.{StatusEnum.pending.value}"],
+        'approved_requests': counters[f"requests.status.{StatusEnum.approved.value}"]
+    }
@@ -0,0 +1,342 @@
+"""
+Bulk user import (CSV or JSON) for onboarding a cohort.
+
+Creating users one POST at a time costs two uniqueness queries, a MAX
+student_id lookup, a password hash, a commit and an inline SMTP welcome mail
+per user. An import instead:
+
+    1. validates every row before writing anything: field checks per row,
+       duplicates within the file, and one IN query per chunk for emails and
+       student IDs that already exist; any error rejects the whole file
+    2. hashes the temporary passwords in a thread pool (the hash is by far
+       the slowest step; USER_IMPORT_HASH_WORKERS, default one per CPU)
+    3. in one transaction, allocates a block of MET student IDs, inserts the
+       users with executemany in chunks of USER_IMPORT_CHUNK_SIZE and writes
+       their welcome mails to the email outbox, so users and mail commit or
+       roll back together
+    4. after the commit, delivers the outbox in a background thread unless a
+       `flask email drain-outbox` worker already does (EMAIL_DELIVERY_MODE=outbox).
+       Each welcome mail is one SMTP transaction, so with SMTP_RATE_LIMIT_PER_MINUTE
+       set a large cohort takes about n / limit minutes to go out; a restart meanwhile
+       leaves the rest in the outbox, where the next web process picks it up
+
+The inserts bypass the ORM unit of work, so the dashboard counters, role
+directory, autocomplete index and read routing are told about the new users
+explicitly.
+"""
+import csv
+import io
+import json
+import logging
+import os
+import re
+import secrets
+import string
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from flask import current_app
+from sqlalchemy import insert
+from werkzeug.security import generate_password_hash
+from backend.models.database import db
+from backend.models.email_outbox import EmailOutbox
+from backend.models.user import User, RoleEnum, CampusEnum
+from backend.services.email_queue import EmailPriority
+from backend.services.outbox_drainer import configured_drainer, drain_in_background
+from backend.services.role_directory import invalidate_on_commit
+from backend.services.stats_counters import count_new_users
+from backend.services.user_lookup import UserEntry, index_on_commit
+from backend.utils.database_utils import safe_db_operation
+from backend.utils.pagination import invalidate_counts_on_commit
+from backend.utils.read_routing import read_primary_after_commit
+from backend.utils.validation import validate_user_data
+
+logger = logging.getLogger(__name__)
+
+STUDENT_ID_PREFIX = 'MET'
+_STUDENT_ID_PATTERN = re.compile(rf'^{STUDENT_ID_PREFIX}(\d+)$')
+
+IMPORT_COLUMNS = (
+    'email', 'first_name', 'last_name', 'role', 'department', 'campus', 'designation',
+    'student_id', 'phone', 'password', 'is_active'
+)
+_LENGTHS = {
+    'email': 120, 'first_name': 50, 'last_name': 50, 'department': 200,
+    'designation': 100, 'student_id': 20, 'phone': 15
+}
+
+# What the welcome mail needs of a user that was never an ORM object
+ImportedUser = namedtuple('ImportedUser', ['email', 'full_name', 'student_id', 'department'])
+
+
+class UserImportError(Exception):
+    """The import was rejected; errors is a list of {'row', 'field', 'message'}"""
+
+    def __init__(self, message, errors=None):
+        super().__init__(message)
+        self.message = message
+        self.errors = errors or []
+
+
+def parse_rows(content, filename=None):
+    """Rows (dicts) from CSV text, a JSON list, or a JSON object with a 'users' list"""
+    if isinstance(content, (list, dict)):
+        data = content
+    elif (filename or '').lower().endswith('.json') or content.lstrip().startswith(('[', '{')):
+        try:
+            data = json.loads(content)
+        except ValueError as e:
+            raise UserImportError(f"Invalid JSON: {e}")
+    else:
+        reader = csv.DictReader(io.StringIO(content.lstrip('\ufeff')))
+        if not reader.fieldnames:
+            raise UserImportError('The CSV file has no header row')
+        return [{(key or '').strip().lower(): value for key, value in row.items()} for row in reader]
+
+    if isinstance(data, dict):
+        data = data.get('users')
+    if not isinstance(data, list) or not all(isinstance(row, dict) for row in data):
+        raise UserImportError("Expected a list of user objects, or an object with a 'users' list")
+    return data
+
+
+def _clean(row):
+    cleaned = {}
+    for column in IMPORT_COLUMNS:
+        value = row.get(column)
+        if isinstance(value, str):
+            value = value.strip()
+        elif value is not None and not isinstance(value, bool):
+            value = str(value)
+        cleaned[column] = value if value not in ('', None) else None
+    if isinstance(cleaned['is_active'], str):
+        cleaned['is_active'] = cleaned['is_active'].lower() in ('true', '1', 'yes')
+    elif cleaned['is_active'] is None:
+        cleaned['is_active'] = True
+    return cleaned
+
+
+def _existing(column, values, chunk_size):
+    """The subset of values already present in users.column, one IN query per chunk"""
+    values = sorted(values)
+    found = set()
+    for start in range(0, len(values), chunk_size):
+        chunk = values[start:start + chunk_size]
+        found.update(value for (value,) in db.session.query(column).filter(column.in_(chunk)))
+    return found
+
+
+def validate_rows(rows, chunk_size=500):
+    """Clean and check every row. Returns the cleaned rows; raises UserImportError listing every problem."""
+    errors = []
+    cleaned = []
+    for number, row in enumerate(rows, start=1):
+        row = _clean(row)
+        cleaned.append(row)
+        is_valid, message = validate_user_data({key: value for key, value in row.items() if value is not None})
+        if not is_valid:
+            errors.append({'row': number, 'field': None, 'message': message})
+            continue
+        if not row['department']:
+            errors.append({'row': number, 'field': 'department', 'message': 'Department is required'})
+        if row['campus'] and row['campus'] not in [campus.value for campus in CampusEnum]:
+            errors.append({'row': number, 'field': 'campus', 'message': f"Unknown campus '{row['campus']}'"})
+        for column, length in _LENGTHS.items():
+            if row[column] and len(str(row[column])) > length:
+                errors.append({'row': number, 'field': column, 'message': f"{column} is longer than {length} characters"})
+
+    # Duplicates inside the file, then against the database
+    for column, model_column, label in (('email', User.email, 'Email'), ('student_id', User.student_id, 'Student ID')):
+        seen = Counter(row[column] for row in cleaned if row[column])
+        taken = _existing(model_column, seen, chunk_size)
+        first_row = {}
+        for number, row in enumerate(cleaned, start=1):
+            value = row[column]
+            if not value:
+                continue
+            if value in taken:
+                errors.append({'row': number, 'field': column, 'message': f"{label} {value} already exists"})
+            elif seen[value] > 1 and value in first_row:
+                errors.append({'row': number, 'field': column,
+                               'message': f"{label} {value} repeats row {first_row[value]}"})
+            first_row.setdefault(value, number)
+
+    if errors:
+        errors.sort(key=lambda error: error['row'])
+        raise UserImportError(f"{len({error['row'] for error in errors})} row(s) failed validation", errors)
+    return cleaned
+
+
+def temporary_password(first_name, phone):
+    """Temporary password per the registration policy: 3 letters of the first name,
+    the last 3 digits of the phone number and 3 random characters"""
+    first = (first_name or '').strip()
+    name_part = (first[:3] if len(first) >= 3 else (first + 'xxx')[:3]).lower()
+    phone_digits = ''.join(c for c in (phone or '') if c.isdigit())
+    phone_part = phone_digits[-3:] if len(phone_digits) >= 3 else ('000' + phone_digits)[-3:]
+    rand_part = ''.join(secrets.choice(string.ascii_lowercase + string.digits) for _ in range(3))
+    return name_part + phone_part + rand_part
+
+
+def hash_passwords(passwords, workers=None, method=None):
+    """generate_password_hash for each password, spread over a thread pool.
+
+    werkzeug's pbkdf2 and scrypt hashes run in hashlib, which releases the GIL,
+    so threads use every core. A process pool would have to fork a web process
+    that already runs worker threads (audit writer, email queue, outbox drain),
+    or spawn children that re-import the entry script and build the app again.
+    """
+    hasher = partial(generate_password_hash, method=method) if method else generate_password_hash
+    workers = min(workers or os.cpu_count() or 1, len(passwords))
+    if workers <= 1:
+        return [hasher(password) for password in passwords]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash') as pool:
+        return list(pool.map(hasher, passwords))
+
+
+def _next_student_sequence(rows):
+    """First free MET sequence number, past both the database and the file's own MET IDs"""
+    last = (
+        db.session.query(User.student_id)
+        .filter(User.student_id.like(f"{STUDENT_ID_PREFIX}%"))
+        .order_by(User.student_id.desc())
+        .first()
+    )
+    highest = 0
+    for student_id in [last[0] if last else None] + [row['student_id'] for row in rows]:
+        match = _STUDENT_ID_PATTERN.match(student_id or '')
+        if match:
+            highest = max(highest, int(match.group(1)))
+    return highest + 1
+
+
+def _write(rows, hashes, passwords, send_welcome, chunk_size):
+    """Allocate student IDs, insert users and stage welcome mail, then commit. Returns the created users."""
+    sequence = _next_student_sequence(rows)
+    now = datetime.utcnow()
+    records = []
+    for row, password_hash in zip(rows, hashes):
+        student_id = row['student_id']
+        if not student_id:
+            student_id = f"{STUDENT_ID_PREFIX}{sequence:06d}"
+            sequence += 1
+        records.append({
+            'email': row['email'],
+            'password_hash': password_hash,
+            'first_name': row['first_name'],
+            'last_name': row['last_name'],
+            'role': RoleEnum(row['role']),
+            'department': row['department'],
+            'campus': CampusEnum(row['campus']) if row['campus'] else None,
+            'designation': row['designation'],
+            'student_id': student_id,
+            'phone': row['phone'],
+            'is_active': row['is_active'],
+            'is_temp_password': True,
+            'created_at': now,
+            'updated_at': now
+        })
+
+    created = []
+    for start in range(0, len(records), chunk_size):
+        chunk = records[start:start + chunk_size]
+        # Ids are matched back by email rather than row order: asking for ordered
+        # RETURNING makes SQLite fall back to one INSERT per row
+        result = db.session.execute(insert(User).returning(User.id, User.email), chunk)
+        ids = {email: user_id for user_id, email in result.all()}
+        created.extend(dict(record, id=ids[record['email']]) for record in chunk)
+
+    count_new_users((user['role'], user['is_active']) for user in created)
+    invalidate_on_commit(db.session)
+    invalidate_counts_on_commit(db.session, User.__tablename__)
+    index_on_commit(db.session, [
+        UserEntry(user['id'], user['first_name'], user['last_name'], user['email'], user['student_id'],
+                  user['role'].value, bool(user['is_active']))
+        for user in created
+    ])
+    read_primary_after_commit(db.session)
+
+    if send_welcome:
+        _stage_welcome_emails(created, passwords, chunk_size)
+    db.session.commit()
+    return created
+
+
+def _stage_welcome_emails(created, passwords, chunk_size):
+    from backend.services.email_service import EmailService
+
+    email_service = EmailService(transactional=True)
+    now = datetime.utcnow()
+    messages = []
+    for user, password in zip(created, passwords):
+        recipient = ImportedUser(user['email'], f"{user['first_name']} {user['last_name']}",
+                                 user['student_id'], user['department'])
+        subject, html_content, text_content = email_service.welcome_email_content(recipient, password)
+        messages.append({
+            'recipients': json.dumps([user['email']]),
+            'subject': subject,
+            'html_content': html_content,
+            'text_content': text_content,
+            'priority': EmailPriority.workflow.value,
+            'next_attempt_at': now,
+            'created_at': now
+        })
+    for start in range(0, len(messages), chunk_size):
+        db.session.execute(insert(EmailOutbox), messages[start:start + chunk_size])
+
+
+def deliver_welcome_emails():
+    """Send what is due in the email outbox now. Returns (sent, failed)."""
+    return configured_drainer().run(once=True)
+
+
+def import_users(rows, send_welcome=True, dry_run=False, deliver=True):
+    """Validate and create users from row dicts.
+
+    Returns {'created': [user dicts with id and student_id], 'passwords': [...],
+    'welcome_emails': n}; with dry_run only validates and returns the row count.
+    Raises UserImportError if any row is invalid, in which case nothing is written.
+    With deliver=False the caller sends the staged welcome emails itself
+    (deliver_welcome_emails) when no outbox drainer runs.
+    """
+    config = current_app.config
+    max_rows = config.get('USER_IMPORT_MAX_ROWS', 10000)
+    chunk_size = max(1, config.get('USER_IMPORT_CHUNK_SIZE', 500))
+    if not rows:
+        raise UserImportError('No users to import')
+    if len(rows) > max_rows:
+        raise UserImportError(f"At most {max_rows} users can be imported at once (got {len(rows)})")
+
+    rows = validate_rows(rows, chunk_size)
+    # Done with reads: release the connection while the passwords are hashed
+    db.session.rollback()
+    if dry_run:
+        return {'validated': len(rows)}
+
+    passwords = [row['password'] or temporary_password(row['first_name'], row['phone']) for row in rows]
+    started = datetime.utcnow()
+    hashes = hash_passwords(
+        passwords,
+        workers=config.get('USER_IMPORT_HASH_WORKERS') or None,
+        method=config.get('USER_IMPORT_HASH_METHOD') or None
+    )
+    logger.info(f"Hashed {len(passwords)} passwords in {(datetime.utcnow() - started).total_seconds():.1f}s")
+
+    smtp_configured = bool(config.get('SMTP_USERNAME') and config.get('SMTP_PASSWORD'))
+    send_welcome = send_welcome and smtp_configured
+    created = safe_db_operation(_write, rows, hashes, passwords, send_welcome, chunk_size)
+
+    if send_welcome:
+        per_minute = config.get('SMTP_RATE_LIMIT_PER_MINUTE', 0)
+        if per_minute:
+            logger.info(f"{len(created)} welcome emails staged; about {len(created) / per_minute:.0f} "
+                        f"minute(s) to deliver at {per_minute}/min")
+        if deliver and config.get('EMAIL_DELIVERY_MODE') != 'outbox':
+            drain_in_background(current_app._get_current_object())
+
+    return {
+        'created': created,
+        'passwords': passwords,
+        'welcome_emails': len(created) if send_welcome else 0
+    }
@@ -0,0 +1,255 @@
+"""
+In-process prefix index of users for the admin autocomplete.
+
+Searching users with ilike('%term%') over four columns scans the whole users
+table, too slow to run on every keystroke of the search box (the user list
+itself still filters that way, once the search is applied). UserLookup keeps
+sorted lists of lower-cased (token, user id) pairs, one per first name, last
+name, full name, email, the email's local part and student id, so a lookup
+is a binary search to the first token starting with the term followed by
+a short forward scan that stops after `limit` users. Each user's display fields are kept alongside, so
+a lookup never touches the database.
+
+Tokens are kept in one sorted list per role, so a lookup filtered by role
+only scans that role's users; an unfiltered lookup merges the lists.
+
+The index is built on first use. Commits in this process that insert,
+delete or change users patch it in place; other worker processes pick such
+changes up when USER_LOOKUP_REBUILD_SECONDS runs out and the index is rebuilt
+in a background thread, while lookups keep using the old one.
+"""
+import bisect
+import heapq
+import logging
+import threading
+import time
+from collections import namedtuple
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+from backend.models.database import db
+from backend.models.user import User
+
+logger = logging.getLogger(__name__)
+
+UserEntry = namedtuple('UserEntry', ['id', 'first_name', 'last_name', 'email', 'student_id', 'role', 'is_active'])
+
+# Columns shown in or searched by the autocomplete; other changes leave the index alone
+_INDEXED_COLUMNS = UserEntry._fields[1:]
+
+
+def _tokens(entry):
+    first, last = (entry.first_name or '').lower(), (entry.last_name or '').lower()
+    email = (entry.email or '').lower()
+    tokens = {first, last, f"{first} {last}", email, email.split('@')[0], (entry.student_id or '').lower()}
+    tokens.discard('')
+    return tokens
+
+
+def _entry(user):
+    role = user.role.value if hasattr(user.role, 'value') else user.role
+    return UserEntry(user.id, user.first_name, user.last_name, user.email, user.student_id, role,
+                     bool(user.is_active))
+
+
+class UserLookup:
+    def __init__(self, rebuild_seconds=300, app=None):
+        self.rebuild_seconds = rebuild_seconds
+        self.app = app
+        self._keys = {}
+        self._entries = {}
+        self._built_at = None
+        self._building = False
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self.lookups = 0
+        self.rebuilds = 0
+        self.updates = 0
+
+    def search(self, term, limit=10, role=None, active_only=False):
+        """Up to limit UserEntry rows with a name, email or student id starting with term.
+
+        With several words, the first picks the candidates and every other
+        word must also prefix one of the user's tokens (so "ali smi" finds
+        Alice Smith). Results follow the order of the matched token.
+        """
+        words = (term or '').lower().split()
+        if not words:
+            return []
+        self._ensure_built()
+        prefix, rest = words[0], words[1:]
+        results, seen = [], set()
+        with self._lock:
+            self.lookups += 1
+            lists = [self._keys.get(role, [])] if role else list(self._keys.values())
+            for token, user_id in heapq.merge(*[_scan(keys, prefix) for keys in lists]):
+                if len(results) >= limit:
+                    break
+                if user_id in seen:
+                    continue
+                seen.add(user_id)
+                entry = self._entries[user_id]
+                if active_only and not entry.is_active:
+                    continue
+                if rest and not all(any(t.startswith(word) for t in _tokens(entry)) for word in rest):
+                    continue
+                results.append(entry)
+        return results
+
+    def apply(self, changes):
+        """Patch the index with {user_id: UserEntry, or None for a deleted user}"""
+        with self._lock:
+            if self._building:
+                # The build may have read the rows before this commit; replayed when it lands
+                self._pending.update(changes)
+            if self._built_at is None:
+                return
+            self._apply(changes)
+            self.updates += len(changes)
+
+    def _apply(self, changes):
+        for user_id, entry in changes.items():
+            old = self._entries.pop(user_id, None)
+            if old is not None:
+                keys = self._keys.get(old.role, [])
+                for token in _tokens(old):
+                    position = bisect.bisect_left(keys, (token, user_id))
+                    if position < len(keys) and keys[position] == (token, user_id):
+                        del keys[position]
+            if entry is not None:
+                self._entries[user_id] = entry
+                keys = self._keys.setdefault(entry.role, [])
+                for token in _tokens(entry):
+                    bisect.insort(keys, (token, user_id))
+
+    def invalidate(self):
+        with self._lock:
+            self._built_at = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'users': len(self._entries),
+                'tokens': sum(len(keys) for keys in self._keys.values()),
+                'lookups': self.lookups,
+                'rebuilds': self.rebuilds,
+                'updates': self.updates
+            }
+
+    def _ensure_built(self):
+        with self._lock:
+            built_at = self._built_at
+            if built_at is not None:
+                if time.monotonic() - built_at < self.rebuild_seconds or self._building or self.app is None:
+                    return
+                self._building = True
+        if built_at is None:
+            # Lookups arriving during the first build wait for it rather than starting their own
+            with self._build_lock:
+                with self._lock:
+                    if self._built_at is not None:
+                        return
+                    self._building = True
+                try:
+                    self._rebuild()
+                finally:
+                    with self._lock:
+                        self._building = False
+                        self._pending = {}
+            return
+        # Stale: keep serving the current index while a fresh one is built
+        threading.Thread(target=self._rebuild_in_background, name='user-lookup-rebuild', daemon=True).start()
+
+    def _rebuild_in_background(self):
+        try:
+            with self.app.app_context():
+                self._rebuild()
+                db.session.remove()
+        except Exception as e:
+            logger.error(f"User lookup rebuild failed: {e}")
+        finally:
+            with self._lock:
+                self._building = False
+                self._pending = {}
+
+    def _rebuild(self):
+        started = time.monotonic()
+        rows = db.session.query(
+            User.id, User.first_name, User.last_name, User.email, User.student_id, User.role, User.is_active
+        ).all()
+        entries = {row.id: _entry(row) for row in rows}
+        keys = {}
+        for user_id, entry in entries.items():
+            keys.setdefault(entry.role, []).extend((token, user_id) for token in _tokens(entry))
+        for role_keys in keys.values():
+            role_keys.sort()
+        with self._lock:
+            self._entries, self._keys = entries, keys
+            self._apply(self._pending)
+            self._pending = {}
+            self._built_at = started
+            self.rebuilds += 1
+        logger.info(f"User lookup index built: {len(entries)} users in {time.monotonic() - started:.2f}s")
+
+
+def _scan(keys, prefix):
+    position = bisect.bisect_left(keys, (prefix,))
+    while position < len(keys) and keys[position][0].startswith(prefix):
+        yield keys[position]
+        position += 1
+
+
+def _after_flush(session, flush_context):
+    changes = session.info.setdefault('user_lookup_changes', {})
+    for obj in session.new:
+        if isinstance(obj, User):
+            changes[obj.id] = _entry(obj)
+    for obj in session.dirty:
+        if isinstance(obj, User) and obj not in session.deleted:
+            state = inspect(obj)
+            if any(state.attrs[name].history.has_changes() for name in _INDEXED_COLUMNS):
+                changes[obj.id] = _entry(obj)
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            changes[obj.id] = None
+    if not changes:
+        session.info.pop('user_lookup_changes')
+
+
+def index_on_commit(session, entries):
+    """Add UserEntry rows inserted outside the unit of work to the index once session commits"""
+    changes = session.info.setdefault('user_lookup_changes', {})
+    for entry in entries:
+        changes[entry.id] = entry
+
+
+def _after_commit(session):
+    changes = session.info.pop('user_lookup_changes', None)
+    if changes and has_app_context():
+        lookup = current_app.extensions.get('user_lookup')
+        if lookup is not None:
+            lookup.apply(changes)
+
+
+def _after_rollback(session):
+    session.info.pop('user_lookup_changes', None)
+
+
+def init_user_lookup(app):
+    """Create the application's user lookup index and keep it in step with db.session commits"""
+    lookup = UserLookup(rebuild_seconds=app.config.get('USER_LOOKUP_REBUILD_SECONDS', 300), app=app)
+    app.extensions['user_lookup'] = lookup
+
+    if not event.contains(db.session, 'after_commit', _after_commit):
+        event.listen(db.session, 'after_flush', _after_flush)
+        event.listen(db.session, 'after_commit', _after_commit)
+        event.listen(db.session, 'after_rollback', _after_rollback)
+    return lookup
+
+
+def search_users(term, limit=10, role=None, active_only=False):
+    """Autocomplete matches from the app's UserLookup"""
+    lookup = current_app.extensions.get('user_lookup')
+    if lookup is None:
+        lookup = current_app.extensions['user_lookup'] = UserLookup()
+    return lookup.search(term, limit=limit, role=role, active_only=active_only)
@@ -4,10 +4,22 @@ Database utility functions to handle SQLite locking issues
 import time
 import logging
 from functools import wraps
+from sqlalchemy import event
 from sqlalchemy.exc import OperationalError
 
 logger = logging.getLogger(__name__)
 
+def _write_coordinator():
+    """The app's SQLite write coordinator, for writes outside GET/HEAD/OPTIONS requests"""
+    from flask import has_app_context, has_request_context, request
+    if not has_app_context():
+        return None
+    if has_request_context() and request.method in ('GET', 'HEAD', 'OPTIONS'):
+        # Reads should not queue behind writers
+        return None
+    from backend.utils.write_coordinator import get_write_coordinator
+    return get_write_coordinator()
+
 def retry_on_locking_error(max_retries=3, delay=1):
     """
     Decorator to retry database operations on SQLite locking errors
@@ -15,6 +27,9 @@ def retry_on_locking_error(max_retries=3, delay=1):
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
+            coordinator = _write_coordinator()
+            if coordinator is not None:
+                return coordinator.run(func, *args, **kwargs)
             for attempt in range(max_retries):
                 try:
                     return func(*args, **kwargs)
@@ -38,8 +53,13 @@ def retry_on_locking_error(max_retries=3, delay=1):
 
 def safe_db_operation(operation_func, *args, **kwargs):
     """
-    Safely execute a database operation with retry logic
+    Safely execute a database operation with retry logic.
+    With SQLITE_WRITE_COORDINATOR on, writes are queued through the coordinator instead.
     """
+    coordinator = _write_coordinator()
+    if coordinator is not None:
+        return coordinator.run(operation_func, *args, **kwargs)
+
     max_retries = 3
     delay = 1
     
@@ -50,6 +70,9 @@ def safe_db_operation(operation_func, *args, **kwargs):
             if "database is locked" in str(e).lower() or "e3q8" in str(e):
                 if attempt < max_retries - 1:
                     logger.warning(f"Database locked on attempt {attempt + 1}, retrying in {delay}s...")
+                    # Discard the failed transaction (and any mail staged in it) before retrying
+                    from backend.models.database import db
+                    db.session.rollback()
                     time.sleep(delay)
                     continue
                 else:
@@ -62,3 +85,29 @@ def safe_db_operation(operation_func, *args, **kwargs):
             raise
     
     return None
+
+def run_after_commit(session, callback):
+    """
+    Run callback once the session's current transaction commits.
+    The callback is dropped if the transaction rolls back instead.
+    """
+    session.info.setdefault('after_commit_callbacks', []).append(callback)
+
+def _run_after_commit_callbacks(session):
+    callbacks = session.info.pop('after_commit_callbacks', [])
+    for callback in callbacks:
+        try:
+            callback()
+        except Exception as e:
+            logger.error(f"After-commit callback failed: {e}")
+
+def _discard_after_commit_callbacks(session):
+    session.info.pop('after_commit_callbacks', None)
+
+def init_session_hooks(db):
+    """
+    Register the session listeners that back run_after_commit
+    """
+    if not event.contains(db.session, 'after_commit', _run_after_commit_callbacks):
+        event.listen(db.session, 'after_commit', _run_after_commit_callbacks)
+        event.listen(db.session, 'after_rollback', _discard_after_commit_callbacks)
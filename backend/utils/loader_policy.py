@@ -0,0 +1,47 @@
+"""
+Relationship loading policy, applied per endpoint family.
+
+On the models, references to a single row (ProjectRequest.user,
+Approval.admin, AuditLog.user) keep lazy loading: a detail page touches one
+of each. Collections that grow without bound (User.project_requests,
+User.audit_logs, ProjectRequest.approval, ...) are dynamic, so touching one
+issues a query the caller can filter and limit rather than loading every row.
+
+Anything that renders many rows applies one of the option sets below, so its
+query count does not grow with the page size:
+
+    - the relationships the serializer reads are loaded with selectinload,
+      one SELECT ... IN per relationship for the whole page
+    - every other relationship is raiseload(sql_only): a serializer that
+      starts touching one raises instead of quietly running a query per row.
+      Objects already in the session (current_user) still resolve.
+"""
+from sqlalchemy.orm import raiseload, selectinload
+from backend.models.approval import Approval
+from backend.models.project_request import ProjectRequest
+from backend.models.user import User
+
+
+def no_lazy_loads():
+    """Raise on any relationship load not set up by another option"""
+    return raiseload('*', sql_only=True)
+
+
+def requester_names():
+    """The requesters of a page of ProjectRequests, names only"""
+    return selectinload(ProjectRequest.user).load_only(User.first_name, User.last_name)
+
+
+def request_rows():
+    """ProjectRequests rendered with to_dict()"""
+    return (requester_names(), no_lazy_loads())
+
+
+def approval_rows():
+    """Approvals rendered with their admin's name (request history, approval exports)"""
+    return (selectinload(Approval.admin).load_only(User.first_name, User.last_name), no_lazy_loads())
+
+
+def user_rows():
+    """Users rendered with to_dict(), which reads no relationships"""
+    return (no_lazy_loads(),)
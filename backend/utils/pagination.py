@@ -0,0 +1,243 @@
+"""
+Keyset (seek) pagination helpers.
+
+Instead of OFFSET, each page continues after the sort key of the last row of
+the previous page, so the cost of fetching a page does not grow with its
+depth. Cursors are opaque URL-safe strings that encode that sort key.
+
+List endpoints use paginate_request(), which reads the standard query
+arguments:
+
+    per_page        page size (clamped to max_per_page)
+    cursor          next_cursor of the previous response: the page after it
+    before          prev_cursor of the previous response: the page before it
+    page            page number; without a cursor, jumps there with OFFSET
+                    (kept for clients that link to page N). Alongside a cursor
+                    it is only echoed back for display.
+    include_total   'false' skips the total. Otherwise it is counted exactly,
+                    or, for endpoints that pass cache_total=True (admin-wide
+                    lists), read from a per-process cache of COUNT results
+                    (PAGINATION_COUNT_TTL) that this process's commits clear
+                    for the tables they change
+"""
+import base64
+import json
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+from flask import current_app, has_app_context, request
+from sqlalchemy import event, inspect, tuple_
+from sqlalchemy.sql.util import find_tables
+from .error_handlers import ValidationError
+
+Page = namedtuple('Page', ['items', 'next_cursor', 'prev_cursor'])
+
+
+def encode_cursor(values):
+    """Encode the sort key of the last row on a page"""
+    payload = [{'dt': v.isoformat()} if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    """Decode a cursor produced by encode_cursor; raises ValidationError if malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        values = [datetime.fromisoformat(v['dt']) if isinstance(v, dict) else v for v in payload]
+    except (ValueError, TypeError, KeyError):
+        raise ValidationError('Invalid cursor', 'cursor')
+    if len(values) != size:
+        raise ValidationError('Invalid cursor', 'cursor')
+    return values
+
+
+def _row_key(columns, key):
+    if key is not None:
+        return key
+    return lambda row: [getattr(row, column.key) for column in columns]
+
+
+def keyset_page(query, columns, after=None, before=None, limit=50, descending=True, key=None):
+    """Fetch the page after (or before) a cursor of query ordered by columns.
+
+    The sort columns must be non-null and the last one unique. Rows must expose
+    them as attributes under their column names, or key(row) must return the
+    sort values. Returns a Page; a cursor is None when there is nothing beyond it.
+    """
+    key = _row_key(columns, key)
+    sort_key = tuple_(*columns)
+    backwards = before is not None and after is None
+
+    if after:
+        values = tuple_(*decode_cursor(after, len(columns)))
+        query = query.filter(sort_key < values if descending else sort_key > values)
+    elif backwards:
+        values = tuple_(*decode_cursor(before, len(columns)))
+        query = query.filter(sort_key > values if descending else sort_key < values)
+
+    # Walking backwards reads the preceding rows in reverse and flips them
+    reverse = descending != backwards
+    ordering = [column.desc() if reverse else column.asc() for column in columns]
+    rows = query.order_by(None).order_by(*ordering).limit(limit + 1).all()
+
+    more = len(rows) > limit
+    rows = rows[:limit]
+    if backwards:
+        rows.reverse()
+    if not rows:
+        return Page([], None, None)
+
+    first, last = encode_cursor(key(rows[0])), encode_cursor(key(rows[-1]))
+    if backwards:
+        return Page(rows, last, first if more else None)
+    return Page(rows, last if more else None, first if after else None)
+
+
+def keyset_paginate(query, columns, cursor=None, limit=50, descending=True):
+    """Fetch one page of query ordered by columns (the last column must be unique).
+
+    Returns (rows, next_cursor); next_cursor is None on the last page. Rows
+    must expose the sort columns as attributes under their column names.
+    """
+    page = keyset_page(query, columns, after=cursor, limit=limit, descending=descending)
+    return page.items, page.next_cursor
+
+
+class CountCache:
+    """COUNT results by SQL and parameters, each remembered with the tables it reads"""
+
+    def __init__(self, ttl=30, max_entries=1000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def count(self, query):
+        query = query.order_by(None).enable_eagerloads(False)
+        statement = query.statement
+        compiled = statement.compile()
+        cache_key = (str(compiled), tuple(sorted((k, str(v)) for k, v in compiled.params.items())))
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get(cache_key)
+            if cached and cached[0] > now:
+                return cached[1]
+
+        total = query.count()
+        tables = frozenset(
+            getattr(getattr(table, 'element', table), 'name', None)
+            for table in find_tables(statement, check_columns=True, include_aliases=True, include_joins=True)
+        )
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries.clear()
+            self._entries[cache_key] = (now + self.ttl, total, tables)
+        return total
+
+    def invalidate(self, tables):
+        """Drop the counts that read any of tables"""
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if entry[2] & tables]
+            for key in stale:
+                del self._entries[key]
+
+
+def cached_count(query, ttl=None):
+    """COUNT(*) of query from the app's CountCache, or counted directly when there is none"""
+    cache = current_app.extensions.get('count_cache') if has_app_context() else None
+    if cache is None:
+        return query.order_by(None).enable_eagerloads(False).count()
+    return cache.count(query)
+
+
+def _after_flush(session, flush_context):
+    tables = session.info.setdefault('count_cache_tables', set())
+    for obj in list(session.new) + list(session.deleted):
+        tables.add(inspect(obj).mapper.persist_selectable.name)
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            tables.add(inspect(obj).mapper.persist_selectable.name)
+    if not tables:
+        session.info.pop('count_cache_tables')
+
+
+def invalidate_counts_on_commit(session, *tables):
+    """Clear cached counts over tables once session commits (for writes that bypass the unit of work)"""
+    session.info.setdefault('count_cache_tables', set()).update(tables)
+
+
+def _after_commit(session):
+    tables = session.info.pop('count_cache_tables', None)
+    if tables and has_app_context():
+        cache = current_app.extensions.get('count_cache')
+        if cache is not None:
+            cache.invalidate(tables)
+
+
+def _after_rollback(session):
+    session.info.pop('count_cache_tables', None)
+
+
+def init_count_cache(app, db):
+    """Create the app's pagination COUNT cache and clear it on commits that change the counted tables"""
+    cache = CountCache(ttl=app.config.get('PAGINATION_COUNT_TTL', 30))
+    app.extensions['count_cache'] = cache
+    if not event.contains(db.session, 'after_commit', _after_commit):
+        event.listen(db.session, 'after_flush', _after_flush)
+        event.listen(db.session, 'after_commit', _after_commit)
+        event.listen(db.session, 'after_rollback', _after_rollback)
+    return cache
+
+
+def paginate_request(query, columns, default_per_page=20, max_per_page=100, descending=True, key=None,
+                     cache_total=False):
+    """Paginate query according to the request's pagination arguments.
+
+    Returns (items, pagination) where pagination has page, per_page, total,
+    pages, has_next, has_prev, next_cursor and prev_cursor. total and pages are
+    None when the client passed include_total=false. With cache_total the total
+    may come from the COUNT cache; per-user lists are cheap to count exactly.
+    """
+    per_page = min(max(request.args.get('per_page', default_per_page, type=int), 1), max_per_page)
+    cursor = request.args.get('cursor') or None
+    before = request.args.get('before') or None
+    page_number = request.args.get('page', type=int)
+
+    if cursor or before or not page_number or page_number <= 1:
+        page = keyset_page(query, columns, after=cursor, before=before, limit=per_page,
+                           descending=descending, key=key)
+        if not (cursor or before):
+            page_number = 1
+    else:
+        # Direct jump to page N: one OFFSET read, after which the client can follow cursors
+        key = _row_key(columns, key)
+        ordering = [column.desc() if descending else column.asc() for column in columns]
+        rows = query.order_by(None).order_by(*ordering).offset((page_number - 1) * per_page).limit(per_page + 1).all()
+        more = len(rows) > per_page
+        rows = rows[:per_page]
+        page = Page(
+            rows,
+            encode_cursor(key(rows[-1])) if rows and more else None,
+            encode_cursor(key(rows[0])) if rows else None
+        )
+
+    total = pages = None
+    if request.args.get('include_total', 'true').lower() not in ('false', '0', 'no'):
+        if cache_total:
+            total = cached_count(query)
+        else:
+            total = query.order_by(None).enable_eagerloads(False).count()
+        pages = (total + per_page - 1) // per_page
+
+    return page.items, {
+        'page': page_number,
+        'per_page': per_page,
+        'total': total,
+        'pages': pages,
+        'has_next': page.next_cursor is not None,
+        'has_prev': page.prev_cursor is not None,
+        'next_cursor': page.next_cursor,
+        'prev_cursor': page.prev_cursor
+    }
@@ -0,0 +1,212 @@
+"""
+Per-request SQL query counter and N+1 detector.
+
+Handlers easily trigger hidden lazy loads (to_dict() touching a relationship
+per row, an export reading approval.admin per approval), which show up as
+the same statement run once per row. A before_cursor_execute listener on
+every engine counts the statements and their time for whichever
+QueryCounter is active on the current thread:
+
+    - each request gets one (QUERY_COUNTER_ENABLED); statements are grouped
+      by shape (whitespace collapsed, IN lists and literals folded), and a
+      shape run QUERY_N_PLUS_ONE_THRESHOLD times or more is reported as a
+      likely N+1 in the log
+    - in debug (or with QUERY_COUNTER_HEADERS) responses carry X-Query-Count,
+      X-Query-Time-Ms and, when one was found, X-Query-Repeated
+    - per-endpoint totals are shown on /admin/stats/metrics
+
+query_budget() asserts a limit around any block of code, e.g. a test client
+call; backend.pytest_plugin exposes it as a pytest fixture.
+"""
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from flask import current_app, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_active = threading.local()
+
+_WHITESPACE = re.compile(r'\s+')
+_PARAM = r"(?:\?|%\(\w+\)s|%s|:\w+|'(?:[^']|'')*'|-?\d+(?:\.\d+)?)"
+_PARAM_LIST = re.compile(r'\(\s*' + _PARAM + r'(?:\s*,\s*' + _PARAM + r')*\s*\)')
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def statement_shape(statement):
+    """The statement with its values folded away, so the same query for different rows compares equal"""
+    shape = _WHITESPACE.sub(' ', statement).strip()
+    shape = _PARAM_LIST.sub('(?)', shape)
+    return _LITERAL.sub('?', shape)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised by query_budget() when a block runs more statements than allowed"""
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes = Counter()
+
+    def record(self, statement, seconds):
+        self.count += 1
+        self.seconds += seconds
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold=2):
+        """(shape, times) for statements run at least threshold times, most repeated first"""
+        return [(shape, times) for shape, times in self.shapes.most_common() if times >= threshold]
+
+    def report(self, limit=5):
+        lines = [f"{self.count} queries in {self.seconds * 1000:.1f}ms"]
+        for shape, times in self.repeated()[:limit]:
+            lines.append(f"  {times}x {shape[:300]}")
+        return '\n'.join(lines)
+
+
+def _counters():
+    stack = getattr(_active, 'counters', None)
+    if stack is None:
+        stack = _active.counters = []
+    return stack
+
+
+@contextmanager
+def count_queries():
+    """Count the statements run on this thread inside the block"""
+    counter = QueryCounter()
+    stack = _counters()
+    stack.append(counter)
+    try:
+        yield counter
+    finally:
+        stack.remove(counter)
+
+
+@contextmanager
+def query_budget(max_queries, max_repeats=None):
+    """Fail with QueryBudgetExceeded if the block runs more than max_queries statements,
+    or (with max_repeats) any one statement shape more than max_repeats times"""
+    with count_queries() as counter:
+        yield counter
+    if counter.count > max_queries:
+        raise QueryBudgetExceeded(f"Query budget of {max_queries} exceeded: {counter.report()}")
+    if max_repeats is not None and counter.repeated(max_repeats + 1):
+        raise QueryBudgetExceeded(f"Statement repeated more than {max_repeats} times: {counter.report()}")
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if getattr(_active, 'counters', None):
+        conn.info['query_counter_started'] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop('query_counter_started', None)
+    counters = getattr(_active, 'counters', None)
+    if not counters or started is None:
+        return
+    seconds = time.perf_counter() - started
+    for counter in counters:
+        counter.record(statement, seconds)
+
+
+class EndpointQueryStats:
+    """Per-endpoint totals of the requests counted in this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def add(self, endpoint, counter, n_plus_one):
+        with self._lock:
+            entry = self._endpoints.setdefault(endpoint, {
+                'requests': 0, 'queries': 0, 'max_queries': 0, 'seconds': 0.0, 'n_plus_one': 0
+            })
+            entry['requests'] += 1
+            entry['queries'] += counter.count
+            entry['max_queries'] = max(entry['max_queries'], counter.count)
+            entry['seconds'] += counter.seconds
+            entry['n_plus_one'] += 1 if n_plus_one else 0
+
+    def stats(self, limit=25):
+        """The endpoints with the most queries per request"""
+        with self._lock:
+            rows = [
+                {
+                    'endpoint': endpoint,
+                    'requests': entry['requests'],
+                    'avg_queries': round(entry['queries'] / entry['requests'], 1),
+                    'max_queries': entry['max_queries'],
+                    'avg_query_ms': round(entry['seconds'] * 1000 / entry['requests'], 2),
+                    'n_plus_one_requests': entry['n_plus_one']
+                }
+                for endpoint, entry in self._endpoints.items()
+            ]
+        rows.sort(key=lambda row: row['avg_queries'], reverse=True)
+        return rows[:limit]
+
+
+def _start_request():
+    counter = QueryCounter()
+    _counters().append(counter)
+    g.query_counter = counter
+
+
+def _finish_request(response):
+    counter = g.pop('query_counter', None)
+    if counter is None:
+        return response
+    stack = _counters()
+    if counter in stack:
+        stack.remove(counter)
+
+    threshold = current_app.config.get('QUERY_N_PLUS_ONE_THRESHOLD', 5)
+    repeated = counter.repeated(threshold)
+    if repeated:
+        logger.warning(f"Possible N+1 in {request.method} {request.path}: {counter.report()}")
+    elif counter.count > current_app.config.get('QUERY_COUNT_WARNING', 50):
+        logger.warning(f"{request.method} {request.path} ran {counter.report()}")
+
+    endpoint_stats = current_app.extensions.get('query_stats')
+    if endpoint_stats is not None and request.endpoint:
+        endpoint_stats.add(request.endpoint, counter, bool(repeated))
+
+    if current_app.debug or current_app.config.get('QUERY_COUNTER_HEADERS'):
+        response.headers['X-Query-Count'] = str(counter.count)
+        response.headers['X-Query-Time-Ms'] = f"{counter.seconds * 1000:.1f}"
+        if repeated:
+            shape, times = repeated[0]
+            response.headers['X-Query-Repeated'] = f"{times}x {shape[:200]}"
+    return response
+
+
+def _discard_request(exc):
+    # A request that raised never reaches after_request
+    counter = g.pop('query_counter', None)
+    if counter is not None and counter in _counters():
+        _counters().remove(counter)
+
+
+def init_query_counter(app):
+    """Count each request's queries and flag N+1 patterns. Returns the per-endpoint stats, or None."""
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        # Registered on the Engine class so replicas and the read-only engine are counted too
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+    if not app.config.get('QUERY_COUNTER_ENABLED', True):
+        return None
+
+    endpoint_stats = EndpointQueryStats()
+    app.extensions['query_stats'] = endpoint_stats
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_discard_request)
+    return endpoint_stats
@@ -0,0 +1,215 @@
+"""
+Read/write routing: SELECTs of GET requests go to read replicas.
+
+Most traffic only reads (dashboards, lists, exports, workflow views), yet it
+all ran on the primary. With DATABASE_READ_URLS set (comma-separated), each
+GET/HEAD/OPTIONS request picks one healthy replica, round-robin, and
+RoutingSession sends its SELECTs there; one replica per request keeps the
+request's reads on a single snapshot source. On SQLite without read URLs the
+replica is the read-only connection from backend.utils.sqlite_profile.
+
+Reads stay on the primary when:
+    - the request is not GET/HEAD/OPTIONS
+    - the request already flushed or ran a non-SELECT statement
+    - the user committed a write less than DATABASE_READ_YOUR_WRITES_SECONDS
+      ago (tracked in the Flask session, so it holds across workers), so
+      they never read a replica that has not caught up with their own write
+    - no replica is healthy
+
+A background thread checks each replica every DATABASE_READ_HEALTH_INTERVAL
+seconds with SELECT 1 and, on PostgreSQL, drops replicas whose replay lag
+exceeds DATABASE_READ_MAX_LAG. A replica that fails during a request is taken
+out of rotation until a check finds it healthy again.
+"""
+import itertools
+import logging
+import threading
+import time
+from flask import current_app, has_request_context, request, session as flask_session
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from backend.models.database import db
+from backend.models.audit_log import AuditLog
+from backend.utils.sqlite_profile import apply_pragmas_on_connect, sqlite_pragmas
+
+logger = logging.getLogger(__name__)
+
+_SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+_PRIMARY_UNTIL = '_read_primary_until'
+
+
+class ReadRouter:
+    def __init__(self, engines, health_interval=10, max_lag=None, read_your_writes=5):
+        self.engines = list(engines)
+        self.health_interval = health_interval
+        self.max_lag = max_lag
+        self.read_your_writes = read_your_writes
+        self._healthy = {engine: True for engine in self.engines}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._checker = None
+        self._probed = False
+        self.routed = {engine: 0 for engine in self.engines}
+        self.failures = {engine: 0 for engine in self.engines}
+        for engine in self.engines:
+            event.listen(engine, 'handle_error', self._on_error)
+
+    def engine(self):
+        """The next healthy replica engine, or None to use the primary"""
+        if not self._probed:
+            # Probe before the first request so a replica that is down never receives one
+            self._probed = True
+            self.check()
+        self._start_health_checks()
+        with self._lock:
+            for _ in range(len(self.engines)):
+                engine = self.engines[next(self._counter) % len(self.engines)]
+                if self._healthy[engine]:
+                    self.routed[engine] += 1
+                    return engine
+        return None
+
+    def mark_unhealthy(self, engine, reason):
+        with self._lock:
+            was_healthy = self._healthy.get(engine)
+            self._healthy[engine] = False
+            self.failures[engine] = self.failures.get(engine, 0) + 1
+        if was_healthy:
+            logger.warning(f"Read replica {engine.url.render_as_string(hide_password=True)} "
+                           f"taken out of rotation: {reason}")
+
+    def check(self):
+        """Probe every replica once and update its health"""
+        for engine in self.engines:
+            try:
+                with engine.connect() as connection:
+                    connection.execute(text('SELECT 1'))
+                    lag = self._replication_lag(connection)
+                if self.max_lag is not None and lag is not None and lag > self.max_lag:
+                    self.mark_unhealthy(engine, f"replication lag {lag:.1f}s")
+                    continue
+            except Exception as e:
+                self.mark_unhealthy(engine, e)
+                continue
+            with self._lock:
+                recovered = not self._healthy[engine]
+                self._healthy[engine] = True
+            if recovered:
+                logger.info(f"Read replica {engine.url.render_as_string(hide_password=True)} back in rotation")
+
+    def stats(self):
+        with self._lock:
+            return [
+                {
+                    'url': engine.url.render_as_string(hide_password=True),
+                    'healthy': self._healthy[engine],
+                    'routed_requests': self.routed[engine],
+                    'failures': self.failures[engine]
+                }
+                for engine in self.engines
+            ]
+
+    def _replication_lag(self, connection):
+        if connection.dialect.name != 'postgresql':
+            return None
+        # 0 when everything received has been replayed (an idle primary is not lag);
+        # NULL when this is not a replica
+        lag = connection.execute(text(
+            "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+            "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+        )).scalar()
+        return float(lag) if lag is not None else None
+
+    def _on_error(self, context):
+        if context.is_disconnect or context.connection is None:
+            self.mark_unhealthy(context.engine, context.original_exception)
+
+    def _start_health_checks(self):
+        if self._checker is not None and self._checker.is_alive():
+            return
+        with self._lock:
+            if self._checker is not None and self._checker.is_alive():
+                return
+            # Started lazily so forked workers each run their own checker
+            self._checker = threading.Thread(target=self._check_loop, name='read-replica-health', daemon=True)
+            self._checker.start()
+
+    def _check_loop(self):
+        while True:
+            time.sleep(self.health_interval)
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Read replica health check failed: {e}")
+
+
+def _route_request():
+    if request.method not in _SAFE_METHODS:
+        return
+    if flask_session.get(_PRIMARY_UNTIL, 0) > time.time():
+        return
+    router = _router()
+    engine = router.engine() if router else None
+    if engine is not None:
+        db.session.info['read_engine'] = engine
+
+
+def _router():
+    return current_app.extensions.get('read_router')
+
+
+def _after_flush(session, flush_context):
+    # Audit entries alone do not need to be read back
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        if not isinstance(obj, AuditLog):
+            session.info['read_your_writes'] = True
+            return
+
+
+def read_primary_after_commit(session):
+    """Keep the user's reads on the primary after a write made outside the unit of work"""
+    session.info['read_your_writes'] = True
+
+
+def _after_commit(session):
+    if session.info.pop('read_your_writes', False) and has_request_context():
+        router = _router()
+        if router and router.read_your_writes:
+            flask_session[_PRIMARY_UNTIL] = time.time() + router.read_your_writes
+
+
+def _after_rollback(session):
+    session.info.pop('read_your_writes', None)
+
+
+def _replica_engine(url, app):
+    if url.startswith('postgres://'):
+        url = url.replace('postgres://', 'postgresql://', 1)
+    engine = create_engine(url, **dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})))
+    if make_url(url).get_backend_name() == 'sqlite':
+        apply_pragmas_on_connect(engine, sqlite_pragmas(app.config, read_only=True))
+    return engine
+
+
+def init_read_routing(app, default_engines=()):
+    """Route GET requests' reads to DATABASE_READ_URLS (or default_engines). Returns the ReadRouter, or None."""
+    urls = [url.strip() for url in (app.config.get('DATABASE_READ_URLS') or '').split(',') if url.strip()]
+    engines = [_replica_engine(url, app) for url in urls] or list(default_engines)
+    if not engines:
+        return None
+
+    router = ReadRouter(
+        engines,
+        health_interval=app.config.get('DATABASE_READ_HEALTH_INTERVAL', 10),
+        max_lag=app.config.get('DATABASE_READ_MAX_LAG', 10),
+        read_your_writes=app.config.get('DATABASE_READ_YOUR_WRITES_SECONDS', 5)
+    )
+    app.extensions['read_router'] = router
+    app.before_request(_route_request)
+
+    if not event.contains(db.session, 'after_commit', _after_commit):
+        event.listen(db.session, 'after_flush', _after_flush)
+        event.listen(db.session, 'after_commit', _after_commit)
+        event.listen(db.session, 'after_rollback', _after_rollback)
+    logger.info(f"Read routing enabled over {len(engines)} replica(s)")
+    return router
@@ -0,0 +1,153 @@
+"""
+Sparse-fieldset serializers for list endpoints.
+
+to_dict() renders every column of a row, the requester's name through a
+lazy load, and about a dozen timestamps, which list pages mostly throw away.
+A FieldSet maps each JSON field to the columns it needs, so the same field
+list drives both the SQL projection (load_only, and one selectin load of the
+requesters only when user_name is asked for) and the JSON output. Any other
+relationship load raises (see backend.utils.loader_policy).
+
+List endpoints render a default summary (covering what the dashboards
+display) and accept ?fields=a,b,c to choose others, or ?fields=all for
+everything to_dict() returns. Detail endpoints keep using to_dict().
+"""
+from collections import namedtuple
+from flask import request
+from sqlalchemy.orm import load_only
+from backend.models.project_request import ProjectRequest
+from backend.models.user import User, NotificationPreferenceEnum
+from .error_handlers import ValidationError
+from .loader_policy import no_lazy_loads, requester_names
+
+Field = namedtuple('Field', ['columns', 'render', 'options'])
+
+
+def _value(name):
+    return Field((name,), lambda obj: getattr(obj, name), None)
+
+
+def _enum(name):
+    def render(obj):
+        value = getattr(obj, name)
+        return value.value if value is not None else None
+    return Field((name,), render, None)
+
+
+def _timestamp(name):
+    def render(obj):
+        value = getattr(obj, name)
+        return value.isoformat() if value else None
+    return Field((name,), render, None)
+
+
+class FieldSet:
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = fields
+
+    def requested(self, default):
+        """Field names from ?fields= (comma-separated, or 'all'), else default"""
+        raw = request.args.get('fields', '').strip()
+        if not raw:
+            return tuple(default)
+        if raw == 'all':
+            return tuple(self.fields)
+        names = tuple(dict.fromkeys(name.strip() for name in raw.split(',') if name.strip()))
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ValidationError(f"Unknown field(s): {', '.join(unknown)}", 'fields')
+        return names
+
+    def load(self, query, names, always=()):
+        """Restrict query to the columns behind names (plus the always columns, e.g. sort keys)"""
+        columns = {'id'} | set(always)
+        options = []
+        for name in names:
+            field = self.fields[name]
+            columns.update(field.columns)
+            if field.options is not None:
+                options.append(field.options())
+        attributes = [getattr(self.model, column) for column in sorted(columns)]
+        return query.options(load_only(*attributes), *options, no_lazy_loads())
+
+    def dump(self, obj, names):
+        return {name: self.fields[name].render(obj) for name in names}
+
+
+REQUEST_FIELDS = FieldSet(ProjectRequest, {
+    'id': _value('id'),
+    'user_id': _value('user_id'),
+    'user_name': Field(
+        ('user_id',),
+        lambda req: req.user.full_name if req.user else None,
+        requester_names
+    ),
+    'project_title': _value('project_title'),
+    'description': _value('description'),
+    'purpose': _value('purpose'),
+    'guide_email': _value('guide_email'),
+    'expected_duration': _value('expected_duration'),
+    'priority': _enum('priority'),
+    'status': _enum('status'),
+    'submitted_at': _timestamp('submitted_at'),
+    'approved_at': _timestamp('approved_at'),
+    'rejected_at': _timestamp('rejected_at'),
+    'rejection_reason': _value('rejection_reason'),
+    'guide_approved_at': _timestamp('guide_approved_at'),
+    'hod_approved_at': _timestamp('hod_approved_at'),
+    'it_services_approved_at': _timestamp('it_services_approved_at'),
+    'guide_approved_by': _value('guide_approved_by'),
+    'hod_approved_by': _value('hod_approved_by'),
+    'it_services_approved_by': _value('it_services_approved_by'),
+    'closed_at': _timestamp('closed_at'),
+    'closed_by': _value('closed_by'),
+    'updated_at': _timestamp('updated_at'),
+})
+
+# Request tables: who, what, state and when
+REQUEST_SUMMARY = (
+    'id', 'user_id', 'user_name', 'project_title', 'purpose', 'priority', 'status',
+    'submitted_at', 'rejected_at', 'closed_at', 'updated_at'
+)
+# Approval cards also show the description and the stage reached so far
+REQUEST_CARD = REQUEST_SUMMARY + (
+    'description', 'expected_duration', 'rejection_reason', 'approved_at',
+    'guide_approved_at', 'hod_approved_at', 'it_services_approved_at'
+)
+
+USER_FIELDS = FieldSet(User, {
+    'id': _value('id'),
+    'email': _value('email'),
+    'first_name': _value('first_name'),
+    'last_name': _value('last_name'),
+    'full_name': Field(('first_name', 'last_name'), lambda user: user.full_name, None),
+    'role': _enum('role'),
+    'department': _value('department'),
+    'campus': _enum('campus'),
+    'designation': _value('designation'),
+    'student_id': _value('student_id'),
+    'phone': _value('phone'),
+    'aadhar_card': _value('aadhar_card'),
+    'profession': _value('profession'),
+    'institution': _value('institution'),
+    'pincode': _value('pincode'),
+    'city': _value('city'),
+    'state': _value('state'),
+    'profile_photo': _value('profile_photo'),
+    'is_active': _value('is_active'),
+    'is_temp_password': _value('is_temp_password'),
+    'notification_preference': Field(
+        ('notification_preference',),
+        lambda user: (user.notification_preference or NotificationPreferenceEnum.immediate).value,
+        None
+    ),
+    'last_login': _timestamp('last_login'),
+    'created_at': _timestamp('created_at'),
+    'updated_at': _timestamp('updated_at'),
+})
+
+USER_SUMMARY = (
+    'id', 'email', 'first_name', 'last_name', 'full_name', 'role', 'department',
+    'student_id', 'is_active', 'last_login', 'created_at'
+)
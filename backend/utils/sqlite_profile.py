@@ -0,0 +1,83 @@
+"""
+SQLite engine profile: per-connection pragmas, WAL and read-only connections.
+
+Pragmas such as busy_timeout and synchronous are per connection, so running
+them once in create_app only configured whichever pooled connection happened
+to serve that statement. init_sqlite_profile() instead registers a 'connect'
+listener on the engine, so every new DBAPI connection gets them:
+
+    journal_mode=WAL        readers no longer block the writer (or vice versa)
+    synchronous=NORMAL      safe with WAL; fsync on checkpoint, not every commit
+    busy_timeout            wait for the write lock instead of failing at once
+    cache_size, temp_store, mmap_size
+
+With SQLITE_READ_ONLY_CONNECTIONS enabled, a second engine opens the same
+file with mode=ro and query_only; unless DATABASE_READ_URLS is set it is the
+read replica that backend.utils.read_routing sends GET requests' SELECTs to.
+PostgreSQL and other databases are left untouched.
+"""
+import logging
+from sqlalchemy import create_engine, event
+from backend.models.database import db
+
+logger = logging.getLogger(__name__)
+
+def sqlite_pragmas(config, read_only=False):
+    """The pragma statements to run on each new connection"""
+    pragmas = [
+        f"PRAGMA busy_timeout={int(config.get('SQLITE_BUSY_TIMEOUT', 60000))}",
+        f"PRAGMA cache_size={int(config.get('SQLITE_CACHE_SIZE', 10000))}",
+        "PRAGMA temp_store=MEMORY",
+        f"PRAGMA mmap_size={int(config.get('SQLITE_MMAP_SIZE', 268435456))}",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only=ON")
+    else:
+        # journal_mode is stored in the database file; setting it needs write access
+        pragmas.insert(0, f"PRAGMA journal_mode={config.get('SQLITE_JOURNAL_MODE', 'WAL')}")
+        pragmas.append(f"PRAGMA synchronous={config.get('SQLITE_SYNCHRONOUS', 'NORMAL')}")
+    return pragmas
+
+
+def apply_pragmas_on_connect(engine, pragmas):
+    """Run pragmas on every new DBAPI connection the engine opens"""
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def _read_only_url(url):
+    # file: URI so sqlite3 honours mode=ro; the uri flag tells pysqlite to open it as a URI
+    return url.set(database=f"file:{url.database}", query={'mode': 'ro', 'uri': 'true'})
+
+
+def _is_file_database(url):
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:') \
+        and not url.database.startswith('file:')
+
+
+def init_sqlite_profile(app):
+    """Apply the SQLite profile to the app's engine (no-op for other databases). Returns the read engine, if any."""
+    with app.app_context():
+        engine = db.engine
+    url = engine.url
+    if url.get_backend_name() != 'sqlite':
+        return None
+
+    apply_pragmas_on_connect(engine, sqlite_pragmas(app.config))
+    # Drop any connection opened before the listener existed, so every connection gets the pragmas
+    engine.dispose()
+
+    if not app.config.get('SQLITE_READ_ONLY_CONNECTIONS', True) or not _is_file_database(url):
+        return None
+
+    options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    read_engine = create_engine(_read_only_url(url), **options)
+    apply_pragmas_on_connect(read_engine, sqlite_pragmas(app.config, read_only=True))
+    logger.info(f"SQLite read-only connections enabled for {url.database}")
+    return read_engine
@@ -0,0 +1,237 @@
+"""
+Write coordinator for SQLite deployments (opt-in: SQLITE_WRITE_COORDINATOR).
+
+SQLite allows one writer at a time. Without coordination, concurrent
+approvals race for the lock and safe_db_operation sleeps a fixed second
+between attempts, stalling the worker and still failing under load. With the
+coordinator on, safe_db_operation runs each write function:
+
+    1. behind a FIFO lock, so the threads of a process take turns in
+       arrival order rather than all retrying at once
+    2. behind an flock on a lock file next to the database, so worker
+       processes take turns as well
+    3. in a BEGIN IMMEDIATE transaction, which takes the write lock before
+       the first read instead of failing when a read transaction upgrades
+    4. with jittered exponential backoff if the database is still locked by
+       a writer that does not go through the coordinator
+
+Queue depth and lock wait times are kept per process (stats()) and shown
+on /admin/stats/metrics.
+"""
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from flask import current_app
+from sqlalchemy.exc import OperationalError
+from backend.models.database import db
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, threads are still queued
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class WriteTimeout(Exception):
+    """Raised when a write could not get its turn within the coordinator's timeout"""
+
+
+def is_locked_error(error):
+    message = str(error).lower()
+    return 'database is locked' in message or 'database table is locked' in message
+
+
+def backoff_delay(attempt, base=0.05, cap=2.0):
+    """Full-jitter exponential backoff: a random delay up to base * 2**attempt, capped"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class _FairLock:
+    """A lock granted to waiting threads in arrival order"""
+
+    def __init__(self):
+        self._mutex = threading.Lock()
+        self._waiters = deque()
+        self._held = False
+
+    def acquire(self, timeout=None):
+        with self._mutex:
+            if not self._held and not self._waiters:
+                self._held = True
+                return True
+            turn = threading.Event()
+            self._waiters.append(turn)
+        if turn.wait(timeout):
+            return True
+        with self._mutex:
+            if turn.is_set():
+                # Handed over just as the wait timed out
+                return True
+            self._waiters.remove(turn)
+            return False
+
+    def release(self):
+        with self._mutex:
+            if self._waiters:
+                # Ownership passes straight to the next waiter
+                self._waiters.popleft().set()
+            else:
+                self._held = False
+
+    def depth(self):
+        with self._mutex:
+            return len(self._waiters)
+
+
+class WriteCoordinator:
+    def __init__(self, lock_file, timeout=30, max_attempts=5, backoff_base=0.05, backoff_max=2.0):
+        self.lock_file = lock_file
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._lock = _FairLock()
+        self._owner = None
+        self._fd = None
+        self._stats_lock = threading.Lock()
+        self._recent_waits = deque(maxlen=1000)
+        self.writes = 0
+        self.retries = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.max_depth = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def run(self, operation, *args, **kwargs):
+        """Run a write function (which commits db.session itself) as the process's only writer"""
+        if self._owner == threading.get_ident():
+            # Nested call from inside a coordinated write
+            return operation(*args, **kwargs)
+
+        waited = self._acquire()
+        self._owner = threading.get_ident()
+        try:
+            for attempt in range(self.max_attempts):
+                try:
+                    self._begin_immediate()
+                    result = operation(*args, **kwargs)
+                    with self._stats_lock:
+                        self.writes += 1
+                    return result
+                except OperationalError as e:
+                    db.session.rollback()
+                    if not is_locked_error(e) or attempt == self.max_attempts - 1:
+                        with self._stats_lock:
+                            self.failures += 1
+                        raise
+                    delay = backoff_delay(attempt, self.backoff_base, self.backoff_max)
+                    with self._stats_lock:
+                        self.retries += 1
+                    logger.warning(f"Database locked by an uncoordinated writer (attempt {attempt + 1}), "
+                                   f"retrying in {delay:.3f}s")
+                    time.sleep(delay)
+        finally:
+            self._owner = None
+            self._release()
+            if waited > 1:
+                logger.info(f"Write waited {waited:.2f}s for its turn")
+
+    def stats(self):
+        with self._stats_lock:
+            waits = sorted(self._recent_waits)
+            return {
+                'queue_depth': self._lock.depth(),
+                'max_queue_depth': self.max_depth,
+                'writes': self.writes,
+                'retries': self.retries,
+                'failures': self.failures,
+                'timeouts': self.timeouts,
+                'wait_seconds_total': round(self.wait_total, 4),
+                'wait_seconds_max': round(self.wait_max, 4),
+                'wait_seconds_p50': round(waits[len(waits) // 2], 4) if waits else None,
+                'wait_seconds_p95': round(waits[int(len(waits) * 0.95)], 4) if waits else None
+            }
+
+    def _acquire(self):
+        started = time.monotonic()
+        with self._stats_lock:
+            self.max_depth = max(self.max_depth, self._lock.depth() + 1)
+        if not self._lock.acquire(self.timeout):
+            self._timed_out()
+        try:
+            self._lock_file(started)
+        except Exception:
+            self._lock.release()
+            raise
+
+        waited = time.monotonic() - started
+        with self._stats_lock:
+            self._recent_waits.append(waited)
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+        return waited
+
+    def _release(self):
+        try:
+            if fcntl is not None and self._fd is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        finally:
+            self._lock.release()
+
+    def _lock_file(self, started):
+        if fcntl is None:
+            return
+        if self._fd is None:
+            self._fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+        attempt = 0
+        while True:
+            try:
+                fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return
+            except BlockingIOError:
+                if time.monotonic() - started > self.timeout:
+                    self._timed_out()
+                time.sleep(backoff_delay(min(attempt, 6), self.backoff_base / 5, self.backoff_max / 4))
+                attempt += 1
+
+    def _timed_out(self):
+        with self._stats_lock:
+            self.timeouts += 1
+        raise WriteTimeout(f"Timed out after {self.timeout}s waiting to write")
+
+    def _begin_immediate(self):
+        connection = db.session.connection()
+        if not connection.connection.dbapi_connection.in_transaction:
+            # Take the write lock now rather than on the first INSERT/UPDATE
+            connection.exec_driver_sql('BEGIN IMMEDIATE')
+
+
+def init_write_coordinator(app):
+    """Create the write coordinator when enabled for a SQLite file database. Returns it, or None."""
+    if not app.config.get('SQLITE_WRITE_COORDINATOR'):
+        return None
+    with app.app_context():
+        url = db.engine.url
+    if url.get_backend_name() != 'sqlite' or url.database in (None, '', ':memory:'):
+        logger.warning("SQLITE_WRITE_COORDINATOR is only used with a SQLite database file")
+        return None
+
+    coordinator = WriteCoordinator(
+        app.config.get('SQLITE_WRITE_LOCK_FILE') or f"{url.database}.writelock",
+        timeout=app.config.get('SQLITE_WRITE_TIMEOUT', 30),
+        max_attempts=app.config.get('SQLITE_WRITE_MAX_ATTEMPTS', 5),
+        backoff_base=app.config.get('SQLITE_WRITE_BACKOFF_BASE', 0.05),
+        backoff_max=app.config.get('SQLITE_WRITE_BACKOFF_MAX', 2.0)
+    )
+    app.extensions['write_coordinator'] = coordinator
+    return coordinator
+
+
+def get_write_coordinator():
+    """The app's WriteCoordinator, or None when coordination is off"""
+    return current_app.extensions.get('write_coordinator')
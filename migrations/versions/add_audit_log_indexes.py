@@ -0,0 +1,35 @@
+"""Add composite indexes for the admin audit log listing
+
+Revision ID: add_audit_log_indexes
+Revises: add_audit_log_partitions
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_audit_log_indexes'
+down_revision = 'add_audit_log_partitions'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = (
+    ('ix_audit_logs_timestamp_id', ['timestamp', 'id']),
+    ('ix_audit_logs_user_timestamp', ['user_id', 'timestamp', 'id']),
+    ('ix_audit_logs_action_timestamp', ['action', 'timestamp', 'id']),
+    ('ix_audit_logs_resource', ['resource_type', 'resource_id', 'timestamp', 'id']),
+)
+
+
+def upgrade():
+    # On PostgreSQL audit_logs is partitioned; an index on the parent is
+    # created on every partition, existing and future
+    for name, columns in INDEXES:
+        op.create_index(name, 'audit_logs', columns, unique=False)
+
+
+def downgrade():
+    for name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name='audit_logs')
@@ -0,0 +1,89 @@
+"""Partition audit_logs by month on PostgreSQL
+
+Revision ID: add_audit_log_partitions
+Revises: add_email_outbox_priority
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_audit_log_partitions'
+down_revision = 'add_email_outbox_priority'
+branch_labels = None
+depends_on = None
+
+
+def _add_months(value, months):
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def upgrade():
+    bind = op.get_bind()
+    # SQLite has no table partitioning; the archive job deletes by month instead
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_unpartitioned")
+    op.execute("ALTER INDEX IF EXISTS audit_logs_pkey RENAME TO audit_logs_unpartitioned_pkey")
+
+    # The partition key has to be part of the primary key
+    op.execute("""
+        CREATE TABLE audit_logs (
+            id INTEGER NOT NULL DEFAULT nextval('audit_logs_id_seq'),
+            user_id INTEGER NOT NULL REFERENCES users (id),
+            action actionenum NOT NULL,
+            resource_type VARCHAR(50) NOT NULL,
+            resource_id INTEGER,
+            details TEXT,
+            ip_address VARCHAR(45),
+            user_agent VARCHAR(500),
+            timestamp TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            PRIMARY KEY (id, timestamp)
+        ) PARTITION BY RANGE (timestamp)
+    """)
+    op.execute("ALTER SEQUENCE audit_logs_id_seq OWNED BY audit_logs.id")
+    op.execute("CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT")
+
+    oldest = bind.execute(sa.text("SELECT min(timestamp) FROM audit_logs_unpartitioned")).scalar()
+    now = datetime.utcnow()
+    month = datetime((oldest or now).year, (oldest or now).month, 1)
+    last = _add_months(datetime(now.year, now.month, 1), 3)
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE audit_logs_y{month.year}m{month.month:02d} PARTITION OF audit_logs "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        )
+        month = _add_months(month, 1)
+
+    op.execute("INSERT INTO audit_logs SELECT id, user_id, action, resource_type, resource_id, details, "
+               "ip_address, user_agent, timestamp FROM audit_logs_unpartitioned")
+    op.execute("DROP TABLE audit_logs_unpartitioned")
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_partitioned")
+    op.execute("""
+        CREATE TABLE audit_logs (
+            id INTEGER NOT NULL DEFAULT nextval('audit_logs_id_seq') PRIMARY KEY,
+            user_id INTEGER NOT NULL REFERENCES users (id),
+            action actionenum NOT NULL,
+            resource_type VARCHAR(50) NOT NULL,
+            resource_id INTEGER,
+            details TEXT,
+            ip_address VARCHAR(45),
+            user_agent VARCHAR(500),
+            timestamp TIMESTAMP WITHOUT TIME ZONE NOT NULL
+        )
+    """)
+    op.execute("ALTER SEQUENCE audit_logs_id_seq OWNED BY audit_logs.id")
+    op.execute("INSERT INTO audit_logs SELECT * FROM audit_logs_partitioned")
+    op.execute("DROP TABLE audit_logs_partitioned CASCADE")
@@ -0,0 +1,53 @@
+"""Store audit log details as JSON and extract endpoint/method columns
+
+Revision ID: add_audit_log_structured_details
+Revises: add_audit_log_indexes
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_audit_log_structured_details'
+down_revision = 'add_audit_log_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    with op.batch_alter_table('audit_logs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('endpoint', sa.String(length=120), nullable=True))
+        batch_op.add_column(sa.Column('http_method', sa.String(length=10), nullable=True))
+
+    if bind.dialect.name == 'postgresql':
+        # Every writer so far stored json.dumps() output or NULL, so the cast is safe
+        op.execute("ALTER TABLE audit_logs ALTER COLUMN details TYPE JSONB USING details::jsonb")
+        op.execute("UPDATE audit_logs SET endpoint = details->>'endpoint', http_method = details->>'method' "
+                   "WHERE details ? 'endpoint'")
+    else:
+        # SQLite keeps JSON as text either way; rebuilding the table just to
+        # change the declared type buys nothing, JSON1 reads the existing values
+        op.execute("UPDATE audit_logs SET endpoint = json_extract(details, '$.endpoint'), "
+                   "http_method = json_extract(details, '$.method') "
+                   "WHERE json_valid(details) AND json_type(details, '$.endpoint') IS NOT NULL")
+
+    op.create_index('ix_audit_logs_endpoint', 'audit_logs', ['endpoint', 'http_method', 'timestamp', 'id'], unique=False)
+    op.create_index('ix_audit_logs_ip', 'audit_logs', ['ip_address', 'timestamp', 'id'], unique=False)
+
+
+def downgrade():
+    bind = op.get_bind()
+
+    op.drop_index('ix_audit_logs_ip', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_endpoint', table_name='audit_logs')
+
+    if bind.dialect.name == 'postgresql':
+        op.execute("ALTER TABLE audit_logs ALTER COLUMN details TYPE TEXT USING details::text")
+
+    with op.batch_alter_table('audit_logs', schema=None) as batch_op:
+        batch_op.drop_column('http_method')
+        batch_op.drop_column('endpoint')
@@ -0,0 +1,26 @@
+"""Add priority to email outbox
+
+Revision ID: add_email_outbox_priority
+Revises: add_notification_digests
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_email_outbox_priority'
+down_revision = 'add_notification_digests'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('email_outbox', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('priority', sa.String(length=20), server_default='workflow', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('email_outbox', schema=None) as batch_op:
+        batch_op.drop_column('priority')
@@ -0,0 +1,42 @@
+"""Add secondary indexes for dashboard filters on requests, users, approvals and NDAs
+
+Revision ID: add_hot_filter_indexes
+Revises: add_audit_log_structured_details
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_hot_filter_indexes'
+down_revision = 'add_audit_log_structured_details'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = (
+    ('ix_project_requests_status_submitted', 'project_requests', ['status', sa.column('submitted_at').desc()]),
+    ('ix_project_requests_user_submitted', 'project_requests', ['user_id', sa.column('submitted_at').desc()]),
+    ('ix_project_requests_submitted_at', 'project_requests', [sa.column('submitted_at').desc()]),
+    ('ix_project_requests_guide_approver', 'project_requests', ['guide_approved_by', 'status', 'guide_approved_at']),
+    ('ix_project_requests_hod_approver', 'project_requests', ['hod_approved_by', 'status', 'hod_approved_at']),
+    ('ix_project_requests_it_services_approver', 'project_requests',
+     ['it_services_approved_by', 'status', 'it_services_approved_at']),
+    ('ix_users_role_active', 'users', ['role', 'is_active']),
+    ('ix_users_active_last_login', 'users', ['is_active', 'last_login']),
+    ('ix_users_created_at', 'users', ['created_at']),
+    ('ix_approvals_project_request', 'approvals', ['project_request_id', 'approved']),
+    ('ix_nda_uploads_user_id', 'nda_uploads', ['user_id']),
+)
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,53 @@
+"""Add notification preference and pending notifications for digests
+
+Revision ID: add_notification_digests
+Revises: add_email_outbox
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_notification_digests'
+down_revision = 'add_email_outbox'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    notification_preference = sa.Enum('immediate', 'hourly', 'daily', name='notificationpreferenceenum')
+    notification_preference.create(op.get_bind(), checkfirst=True)
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('notification_preference', notification_preference,
+                                      server_default='immediate', nullable=False))
+
+    op.create_table('pending_notifications',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('project_request_id', sa.Integer(), nullable=True),
+        sa.Column('kind', sa.String(length=50), nullable=False),
+        sa.Column('subject', sa.String(length=255), nullable=False),
+        sa.Column('summary', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('digested_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['project_request_id'], ['project_requests.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('pending_notifications', schema=None) as batch_op:
+        batch_op.create_index('ix_pending_notifications_user_digested', ['user_id', 'digested_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('pending_notifications', schema=None) as batch_op:
+        batch_op.drop_index('ix_pending_notifications_user_digested')
+
+    op.drop_table('pending_notifications')
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('notification_preference')
+
+    sa.Enum(name='notificationpreferenceenum').drop(op.get_bind(), checkfirst=True)
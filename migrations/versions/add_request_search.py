@@ -0,0 +1,55 @@
+"""Add a full-text search index over project requests
+
+Revision ID: add_request_search
+Revises: add_stats_counters
+Create Date: 2026-10-18 20:00:00.000000
+
+SQLite gets an FTS5 table and PostgreSQL a tsvector column with a GIN index,
+both kept in sync by triggers. The statements are defined once in
+backend.services.request_search; on SQLite builds without FTS5 the migration
+is a no-op and search falls back to ILIKE.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from backend.services.request_search import (
+    POSTGRESQL_DDL, POSTGRESQL_REBUILD, SQLITE_DDL, SQLITE_REBUILD,
+)
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_request_search'
+down_revision = 'add_stats_counters'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        compile_options = [row[0] for row in bind.execute(sa.text("PRAGMA compile_options"))]
+        if 'ENABLE_FTS5' not in compile_options:
+            return
+        statements = SQLITE_DDL + SQLITE_REBUILD
+    elif bind.dialect.name == 'postgresql':
+        statements = POSTGRESQL_DDL + POSTGRESQL_REBUILD
+    else:
+        return
+    for statement in statements:
+        op.execute(statement)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        for trigger in ('project_requests_fts_insert', 'project_requests_fts_update',
+                        'project_requests_fts_delete', 'users_fts_rename'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS project_requests_fts")
+    elif bind.dialect.name == 'postgresql':
+        op.execute("DROP TRIGGER IF EXISTS users_search_rename ON users")
+        op.execute("DROP TRIGGER IF EXISTS project_requests_search_vector ON project_requests")
+        op.execute("DROP FUNCTION IF EXISTS users_search_rename()")
+        op.execute("DROP FUNCTION IF EXISTS project_requests_search_vector()")
+        op.execute("DROP INDEX IF EXISTS ix_project_requests_search")
+        op.execute("ALTER TABLE project_requests DROP COLUMN IF EXISTS search_vector")
@@ -0,0 +1,56 @@
+"""Add stats_counters for the dashboard statistics
+
+Revision ID: add_stats_counters
+Revises: add_hot_filter_indexes
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from collections import Counter
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_stats_counters'
+down_revision = 'add_hot_filter_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    stats_counters = op.create_table('stats_counters',
+        sa.Column('key', sa.String(length=100), nullable=False),
+        sa.Column('value', sa.BigInteger(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('key')
+    )
+
+    # Same keys as backend.services.stats_counters; enum columns store the member
+    # names, which match the values for RoleEnum and StatusEnum
+    bind = op.get_bind()
+    counters = Counter()
+    for role, is_active, count in bind.execute(sa.text(
+        "SELECT role, is_active, count(id) FROM users GROUP BY role, is_active"
+    )):
+        counters['users.total'] += count
+        counters[f"users.role.{role}"] += count
+        if is_active:
+            counters['users.active'] += count
+    for user_id, status, count in bind.execute(sa.text(
+        "SELECT user_id, status, count(id) FROM project_requests GROUP BY user_id, status"
+    )):
+        counters['requests.total'] += count
+        counters[f"requests.status.{status}"] += count
+        counters[f"requests.user.{user_id}.total"] += count
+        counters[f"requests.user.{user_id}.status.{status}"] += count
+
+    now = datetime.utcnow()
+    if counters:
+        op.bulk_insert(stats_counters, [
+            {'key': key, 'value': value, 'updated_at': now} for key, value in counters.items()
+        ])
+
+
+def downgrade():
+    op.drop_table('stats_counters')
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""Benchmark the notification pipeline against the local SMTP sink.
+
+Drives EmailService through realistic workflow fan-outs (a new request goes
+to every project guide, each stage approval to every user of the next role)
+and reports throughput, enqueue-to-delivery latency and SMTP handshakes per
+message. Runs against a throwaway SQLite database; nothing leaves the machine.
+
+    python scripts/tests/bench_email_pipeline.py --mode queued --requests 50 --guides 30
+    python scripts/tests/bench_email_pipeline.py --mode sync --latency 0.02 --fail-rate 0.05
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from smtp_sink import SMTPSink
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def configure_environment(args, sink, db_path):
+    # Config reads the environment at import time, so this must run before the app is imported
+    os.environ.update({
+        'DATABASE_URL': f"sqlite:///{db_path}",
+        'SMTP_SERVER': sink.host,
+        'SMTP_PORT': str(sink.port),
+        'SMTP_USE_TLS': 'false',
+        'SMTP_USERNAME': 'bench',
+        'SMTP_PASSWORD': 'bench',
+        'EMAIL_DELIVERY_MODE': args.mode,
+        'EMAIL_QUEUE_WORKERS': str(args.workers),
+        'EMAIL_RETRY_BACKOFF': '0.05',
+        'OUTBOX_RETRY_BACKOFF': '0',
+        'SMTP_POOL_SIZE': str(args.pool_size),
+        'SMTP_MAX_RECIPIENTS': str(args.max_recipients),
+        'SMTP_RATE_LIMIT_PER_MINUTE': str(args.rate_limit),
+    })
+
+
+def seed_users(db, guides):
+    from backend.models.user import User, RoleEnum
+
+    users = []
+    student = User(email='bench.student@example.com', first_name='Bench', last_name='Student',
+                   role=RoleEnum.student, department='Computer Science', is_active=True)
+    users.append(student)
+    for role, count in ((RoleEnum.project_guide, guides), (RoleEnum.hod, 3), (RoleEnum.it_services, 3)):
+        for i in range(count):
+            users.append(User(email=f"{role.value}{i}@example.com", first_name=role.value, last_name=str(i),
+                              role=role, department='Computer Science', is_active=True))
+    for user in users:
+        user.password_hash = 'bench'
+    db.session.add_all(users)
+    db.session.commit()
+    return student
+
+
+class FailureCounter:
+    """Recipients the pipeline has given up on, so the benchmark stops waiting for them.
+
+    sync mode reports failures from send_bulk_email itself; queued jobs fail
+    once their retries run out; outbox rows once the drainer marks them failed.
+    """
+
+    def __init__(self, email_service):
+        self.inline = 0
+        self.jobs = []
+        self.outbox = email_service.delivery_mode == 'outbox'
+        send_bulk_email = email_service.send_bulk_email
+
+        def counting_send_bulk_email(*args, **kwargs):
+            results = send_bulk_email(*args, **kwargs)
+            self.inline += sum(1 for accepted in results.values() if not accepted)
+            return results
+        email_service.send_bulk_email = counting_send_bulk_email
+
+        email_queue = email_service.email_queue
+        if email_queue is not None:
+            submit = email_queue.submit
+
+            def tracking_submit(*args, **kwargs):
+                job = submit(*args, **kwargs)
+                if job:
+                    self.jobs.append(job)
+                return job
+            email_queue.submit = tracking_submit
+
+    def count(self):
+        from backend.models.email_outbox import EmailOutbox, OutboxStatusEnum
+
+        failed = self.inline
+        for job in list(self.jobs):
+            if job.status == 'failed':
+                failed += len(job.recipients)
+            elif job.status == 'sent':
+                failed += len(job.refused)
+        if self.outbox:
+            for row in EmailOutbox.query.filter_by(status=OutboxStatusEnum.failed).all():
+                failed += len(row.recipient_list)
+        return failed
+
+
+def run(args):
+    sink = SMTPSink(connect_latency=args.connect_latency, command_latency=args.latency,
+                    data_latency=args.data_latency, fail_rate=args.fail_rate, seed=1).start()
+    db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    db_file.close()
+    configure_environment(args, sink, db_file.name)
+
+    from app import create_app
+    app = create_app()
+
+    with app.app_context():
+        from backend.models import db
+        from backend.models.project_request import ProjectRequest
+        from backend.models.user import User, RoleEnum
+        from backend.services.email_service import EmailService
+        from backend.services.outbox_drainer import OutboxDrainer
+        from backend.services.smtp_pool import smtp_pool_stats
+
+        student = seed_users(db, args.guides)
+        approver = User.query.filter_by(role=RoleEnum.project_guide).first()
+        # create_app seeds a default user per approver role as well
+        audience = {role: User.query.filter_by(role=role, is_active=True).count()
+                    for role in (RoleEnum.project_guide, RoleEnum.hod, RoleEnum.it_services)}
+        sink.reset()
+
+        enqueued_at = {}
+        expected_recipients = 0
+        email_service = EmailService()
+        failures = FailureCounter(email_service)
+        started = time.monotonic()
+
+        for i in range(args.requests):
+            request_obj = ProjectRequest(user_id=student.id, project_title=f"Bench project {i}",
+                                         description='Benchmark request', purpose='Benchmark')
+            db.session.add(request_obj)
+            db.session.commit()
+
+            enqueued_at[f"New Project Request Submitted - #{request_obj.id}"] = time.monotonic()
+            email_service.send_new_request_notification(request_obj)
+            expected_recipients += audience[RoleEnum.project_guide]
+
+            for stage, next_role in (('guide', RoleEnum.hod), ('hod', RoleEnum.it_services)):
+                title = next_role.value.replace('_', ' ').title()
+                enqueued_at[f"Project Request Ready for {title} Review - #{request_obj.id}"] = time.monotonic()
+                email_service.send_stage_approval_notification(request_obj, approver, stage)
+                expected_recipients += audience[next_role]
+
+        submitted = time.monotonic()
+
+        if args.mode == 'outbox':
+            OutboxDrainer(EmailService(), batch_size=args.batch_size, retry_backoff=0).run(once=True)
+
+        # Wait until every recipient is either delivered or given up on
+        deadline = time.monotonic() + args.timeout
+        failed = failures.count()
+        while sink.recipient_count + failed < expected_recipients and time.monotonic() < deadline:
+            time.sleep(0.01)
+            failed = failures.count()
+        finished = time.monotonic()
+        timed_out = sink.recipient_count + failed < expected_recipients
+
+        latencies = []
+        for message in list(sink.messages):
+            sent = enqueued_at.get(message.subject)
+            if sent is not None:
+                latencies.extend([message.received_at - sent] * len(message.recipients))
+
+        delivered = sink.recipient_count
+        transactions = len(sink.messages)
+        elapsed = finished - started
+        pools = smtp_pool_stats()
+
+    sink.stop()
+    os.unlink(db_file.name)
+
+    print(f"\n=== Email pipeline benchmark ({args.mode}) ===")
+    print(f"Fan-outs:               {len(enqueued_at)} ({args.requests} requests, {args.guides} guides)")
+    print(f"Recipients delivered:   {delivered}/{expected_recipients}")
+    print(f"Recipients failed:      {failed}")
+    if timed_out:
+        print(f"Timed out after {args.timeout:.0f}s with {expected_recipients - delivered - failed} "
+              f"recipient(s) unaccounted for; the figures below include the wait")
+    print(f"SMTP transactions:      {transactions}")
+    print(f"Submit time:            {submitted - started:.3f}s")
+    print(f"Total time:             {elapsed:.3f}s")
+    print(f"Throughput:             {delivered / elapsed if elapsed else 0:.1f} recipients/s, "
+          f"{transactions / elapsed if elapsed else 0:.1f} messages/s")
+    print(f"Latency p50 / p95 / max: {percentile(latencies, 50) * 1000:.1f} / "
+          f"{percentile(latencies, 95) * 1000:.1f} / {max(latencies, default=0) * 1000:.1f} ms")
+    print(f"SMTP connections:       {sink.counters['connections']} "
+          f"({sink.counters['connections'] / transactions if transactions else 0:.3f} handshakes/message)")
+    for name, stats in pools.items():
+        print(f"Pool {name}:  {stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the email notification pipeline')
+    parser.add_argument('--mode', choices=['sync', 'queued', 'outbox'], default='queued')
+    parser.add_argument('--requests', type=int, default=20, help='Project requests to simulate')
+    parser.add_argument('--guides', type=int, default=25, help='Project guides receiving each new request')
+    parser.add_argument('--workers', type=int, default=2, help='Queue worker threads')
+    parser.add_argument('--pool-size', type=int, default=4, help='SMTP pool size')
+    parser.add_argument('--max-recipients', type=int, default=50, help='RCPT TO per transaction')
+    parser.add_argument('--batch-size', type=int, default=50, help='Outbox drainer batch size')
+    parser.add_argument('--rate-limit', type=int, default=0, help='SMTP messages per minute (0 = unlimited)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Sink delay per SMTP command (seconds)')
+    parser.add_argument('--connect-latency', type=float, default=0.05, help='Sink delay before greeting (seconds)')
+    parser.add_argument('--data-latency', type=float, default=0.0, help='Sink delay after DATA (seconds)')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='Probability of a transient 451 after DATA')
+    parser.add_argument('--timeout', type=float, default=120.0, help='Seconds to wait for delivery')
+    run(parser.parse_args())
+
+
+if __name__ == '__main__':
+    main()
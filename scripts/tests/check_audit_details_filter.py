@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Check that ?details.<key>=value audit log filters match typed JSON values.
+
+Query strings carry every value as text, while the details column stores
+numbers and booleans as JSON numbers and booleans. Writes audit entries with
+integer, float, boolean and string keys and checks that AuditLog.details_filter
+finds each one by its text form, e.g. "all approvals of request 42" as
+details.project_id=42. Exits non-zero on any mismatch. By default it uses a
+throwaway SQLite database; pass --database-url to check another database.
+
+    python scripts/tests/check_audit_details_filter.py
+    python scripts/tests/check_audit_details_filter.py --database-url postgresql://...
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+ENTRIES = [
+    {'project_id': 42, 'flag': True, 'ratio': 0.5, 'status': 'approved', 'code': '42'},
+    {'project_id': 7, 'flag': False, 'ratio': 1.5, 'status': 'rejected', 'code': 'x'},
+]
+
+# (key, query string value, details of ENTRIES expected to match)
+CASES = [
+    ('project_id', '42', [0]),
+    ('project_id', '7', [1]),
+    ('project_id', '43', []),
+    ('flag', 'true', [0]),
+    ('flag', 'false', [1]),
+    ('ratio', '0.5', [0]),
+    ('status', 'approved', [0]),
+    ('code', '42', [0]),
+    ('missing', '42', []),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check audit log details filters against typed JSON values')
+    parser.add_argument('--database-url', help='Database to check (default: throwaway SQLite)')
+    args = parser.parse_args()
+
+    db_file = None
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+    else:
+        db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+        db_file.close()
+        os.environ['DATABASE_URL'] = f"sqlite:///{db_file.name}"
+    os.environ['AUDIT_LOG_MODE'] = 'sync'
+
+    from app import create_app
+    app = create_app()
+
+    failures = []
+    with app.app_context():
+        from backend.models import db
+        from backend.models.audit_log import AuditLog, ActionEnum
+        from backend.models.user import User
+
+        user = User.query.first()
+        marker = f"details-filter-check-{os.getpid()}"
+        rows = [AuditLog(user_id=user.id, action=ActionEnum.APPROVE, resource_type=marker, details=details)
+                for details in ENTRIES]
+        db.session.add_all(rows)
+        db.session.commit()
+        ids = [row.id for row in rows]
+
+        try:
+            for key, value, expected in CASES:
+                found = [row.id for row in AuditLog.query.filter(
+                    AuditLog.resource_type == marker, AuditLog.details_filter(key, value)
+                ).order_by(AuditLog.id)]
+                wanted = [ids[i] for i in expected]
+                ok = found == wanted
+                print(f"{'ok' if ok else 'MISMATCH':9}  details.{key}={value}: {len(found)} row(s)")
+                if not ok:
+                    failures.append(f"details.{key}={value}")
+        finally:
+            AuditLog.query.filter_by(resource_type=marker).delete()
+            db.session.commit()
+
+    if db_file:
+        os.unlink(db_file.name)
+
+    if failures:
+        print(f"\n{len(failures)} details filters returned the wrong rows: {', '.join(failures)}")
+        sys.exit(1)
+    print("\nAll details filters match")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""Check that the dashboard hot queries are served by an index.
+
+Runs EXPLAIN on each query the approval, admin and user dashboards issue
+(approvals/routes.py, admin/routes.py, user_dashboard/routes.py) and exits
+non-zero if any of them falls back to a full table scan. By default it builds
+a throwaway SQLite database from the models; pass --database-url to check a
+real database (PostgreSQL needs ANALYZE'd tables of a realistic size, the
+planner prefers sequential scans on tiny tables).
+
+    python scripts/tests/check_query_plans.py
+    python scripts/tests/check_query_plans.py --database-url postgresql://... --verbose
+"""
+
+import argparse
+import os
+import re
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+
+def hot_queries(db):
+    from sqlalchemy import desc, or_
+    from backend.models.user import User, RoleEnum
+    from backend.models.project_request import ProjectRequest, StatusEnum
+    from backend.models.approval import Approval
+    from backend.models.nda import NDA
+
+    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+    return {
+        'guide queue': ProjectRequest.query.filter_by(status=StatusEnum.pending)
+            .order_by(desc(ProjectRequest.submitted_at)),
+        'guide approved by me': ProjectRequest.query.filter_by(status=StatusEnum.guide_approved, guide_approved_by=1)
+            .order_by(desc(ProjectRequest.guide_approved_at)),
+        'hod approved by me': ProjectRequest.query.filter_by(status=StatusEnum.hod_approved, hod_approved_by=1)
+            .order_by(desc(ProjectRequest.hod_approved_at)),
+        'it services approved by me': ProjectRequest.query.filter_by(
+            status=StatusEnum.it_services_approved, it_services_approved_by=1)
+            .order_by(desc(ProjectRequest.it_services_approved_at)),
+        'status count': ProjectRequest.query.filter_by(status=StatusEnum.approved).with_entities(db.func.count()),
+        'admin pending approvals': ProjectRequest.query.filter(or_(
+            ProjectRequest.status == StatusEnum.pending,
+            ProjectRequest.status == StatusEnum.guide_approved,
+            ProjectRequest.status == StatusEnum.hod_approved,
+            ProjectRequest.status == StatusEnum.it_services_approved
+        )).order_by(desc(ProjectRequest.submitted_at)).limit(10),
+        'admin recent requests': ProjectRequest.query.order_by(desc(ProjectRequest.submitted_at)).limit(5),
+        'requests last 30 days': ProjectRequest.query.filter(ProjectRequest.submitted_at >= thirty_days_ago)
+            .with_entities(db.func.count()),
+        'my requests': ProjectRequest.query.filter_by(user_id=1).order_by(desc(ProjectRequest.submitted_at)),
+        'my recent activity': ProjectRequest.query.filter(
+            ProjectRequest.user_id == 1, ProjectRequest.submitted_at >= thirty_days_ago
+        ).order_by(desc(ProjectRequest.submitted_at)),
+        'approvers by role': User.query.filter(User.role == RoleEnum.hod, User.is_active == True),
+        'role count': User.query.filter_by(role=RoleEnum.student).with_entities(db.func.count()),
+        'active users by last login': User.query.filter_by(is_active=True).order_by(desc(User.last_login)).limit(5),
+        'admin user list': User.query.order_by(desc(User.created_at)).limit(20),
+        'new users last 30 days': User.query.filter(User.created_at >= thirty_days_ago).with_entities(db.func.count()),
+        'request approvals': Approval.query.filter_by(project_request_id=1),
+        'user nda': NDA.query.filter_by(user_id=1).limit(1),
+    }
+
+
+def explain(db, query):
+    statement = query.statement.compile(db.engine, compile_kwargs={'literal_binds': True})
+    if db.engine.dialect.name == 'postgresql':
+        rows = db.session.execute(db.text(f"EXPLAIN {statement}")).all()
+        return [row[0] for row in rows]
+    rows = db.session.execute(db.text(f"EXPLAIN QUERY PLAN {statement}")).all()
+    return [row[-1] for row in rows]
+
+
+def is_full_scan(plan_lines):
+    for line in plan_lines:
+        # SQLite: "SCAN project_requests" (vs "SEARCH ..." or "SCAN ... USING INDEX")
+        if re.match(r'\s*SCAN \w+\s*$', line):
+            return True
+        if re.search(r'Seq Scan on', line):
+            return True
+    return False
+
+
+def seed(db, count):
+    from backend.models.user import User, RoleEnum
+    from backend.models.project_request import ProjectRequest, StatusEnum
+
+    users = [User(email=f"plan{i}@example.com", first_name='Plan', last_name=str(i), password_hash='x',
+                  role=list(RoleEnum)[i % len(RoleEnum)], department='Computer Science', is_active=bool(i % 3))
+             for i in range(count)]
+    db.session.add_all(users)
+    db.session.flush()
+    statuses = list(StatusEnum)
+    db.session.add_all([
+        ProjectRequest(user_id=users[i % count].id, project_title=f"Plan {i}", description='x', purpose='x',
+                       status=statuses[i % len(statuses)], submitted_at=datetime.utcnow() - timedelta(hours=i))
+        for i in range(count * 4)
+    ])
+    db.session.commit()
+    db.session.execute(db.text('ANALYZE'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EXPLAIN the dashboard hot queries and flag full scans')
+    parser.add_argument('--database-url', help='Database to check (default: throwaway SQLite)')
+    parser.add_argument('--rows', type=int, default=500, help='Users to seed in the throwaway database')
+    parser.add_argument('--verbose', action='store_true', help='Print every plan')
+    args = parser.parse_args()
+
+    db_file = None
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+    else:
+        db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+        db_file.close()
+        os.environ['DATABASE_URL'] = f"sqlite:///{db_file.name}"
+    os.environ.setdefault('AUDIT_LOG_MODE', 'sync')
+
+    from app import create_app
+    app = create_app()
+
+    failures = []
+    with app.app_context():
+        from backend.models import db
+        if db_file:
+            seed(db, args.rows)
+        for name, query in hot_queries(db).items():
+            plan = explain(db, query)
+            full_scan = is_full_scan(plan)
+            print(f"{'FULL SCAN' if full_scan else 'ok':9}  {name}")
+            if args.verbose or full_scan:
+                for line in plan:
+                    print(f"           {line}")
+            if full_scan:
+                failures.append(name)
+
+    if db_file:
+        os.unlink(db_file.name)
+
+    if failures:
+        print(f"\n{len(failures)} hot queries degrade to a full scan: {', '.join(failures)}")
+        sys.exit(1)
+    print("\nAll hot queries use an index")
+
+
+if __name__ == '__main__':
+    main()
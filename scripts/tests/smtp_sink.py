@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""In-process SMTP sink for exercising the mail pipeline without a real server.
+
+Speaks enough SMTP for smtplib (EHLO/HELO, AUTH PLAIN/LOGIN, MAIL, RCPT, DATA,
+RSET, NOOP, QUIT), accepts any credentials and keeps every message in memory.
+Latency and failures can be injected to imitate a slow or flaky relay.
+
+Point the app at it with:
+    SMTP_SERVER=127.0.0.1 SMTP_PORT=<port> SMTP_USE_TLS=false
+
+Run standalone:
+    python scripts/tests/smtp_sink.py --port 2525 --latency 0.05 --fail-rate 0.1
+"""
+
+import argparse
+import random
+import socketserver
+import threading
+import time
+
+
+class SinkMessage:
+    def __init__(self, mail_from, recipients, data, connection_id):
+        self.mail_from = mail_from
+        self.recipients = recipients
+        self.data = data
+        self.connection_id = connection_id
+        self.received_at = time.monotonic()
+
+    @property
+    def subject(self):
+        for line in self.data.split('\n'):
+            if line.lower().startswith('subject:'):
+                return line.split(':', 1)[1].strip()
+            if not line.strip():
+                break
+        return None
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def setup(self):
+        super().setup()
+        self.sink = self.server.sink
+        self.connection_id = self.sink._register_connection()
+        self._reset()
+
+    def _reset(self):
+        self.mail_from = None
+        self.recipients = []
+
+    def reply(self, line):
+        self.wfile.write((line + '\r\n').encode())
+        self.wfile.flush()
+
+    def readline(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        return line.decode('utf-8', 'replace').rstrip('\r\n')
+
+    def handle(self):
+        sink = self.sink
+        sink._sleep(sink.connect_latency)
+        if sink._roll(sink.connect_fail_rate):
+            self.reply('421 Service not available (injected)')
+            return
+        self.reply('220 smtp-sink ESMTP ready')
+
+        while True:
+            line = self.readline()
+            if line is None:
+                return
+            verb, _, arg = line.partition(' ')
+            verb = verb.upper()
+            sink._sleep(sink.command_latency)
+
+            if sink._roll(sink.disconnect_rate):
+                # Drop the socket mid-session without a reply
+                return
+
+            if verb in ('EHLO', 'HELO'):
+                if verb == 'EHLO':
+                    self.reply('250-smtp-sink')
+                    self.reply('250-AUTH PLAIN LOGIN')
+                    self.reply('250 8BITMIME')
+                else:
+                    self.reply('250 smtp-sink')
+            elif verb == 'AUTH':
+                mechanism = arg.split(' ')[0].upper()
+                if mechanism == 'LOGIN':
+                    self.reply('334 VXNlcm5hbWU6')
+                    if self.readline() is None:
+                        return
+                    self.reply('334 UGFzc3dvcmQ6')
+                    if self.readline() is None:
+                        return
+                elif mechanism == 'PLAIN' and len(arg.split(' ')) == 1:
+                    self.reply('334 ')
+                    if self.readline() is None:
+                        return
+                sink._count('logins')
+                self.reply('235 Authentication successful')
+            elif verb == 'MAIL':
+                self._reset()
+                self.mail_from = arg.partition(':')[2].strip().strip('<>').split(' ')[0]
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                address = arg.partition(':')[2].strip().strip('<>').split(' ')[0]
+                if any(address.endswith(suffix) for suffix in sink.refuse_suffixes):
+                    self.reply('550 Mailbox unavailable (injected)')
+                else:
+                    self.recipients.append(address)
+                    self.reply('250 OK')
+            elif verb == 'DATA':
+                if not self.recipients:
+                    self.reply('554 No valid recipients')
+                    continue
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                lines = []
+                while True:
+                    data_line = self.readline()
+                    if data_line is None:
+                        return
+                    if data_line == '.':
+                        break
+                    lines.append(data_line[1:] if data_line.startswith('..') else data_line)
+                sink._sleep(sink.data_latency)
+                if sink._roll(sink.fail_rate):
+                    self.reply('451 Temporary failure (injected)')
+                else:
+                    sink._store(SinkMessage(self.mail_from, list(self.recipients), '\n'.join(lines), self.connection_id))
+                    self.reply('250 OK queued')
+                self._reset()
+            elif verb == 'RSET':
+                self._reset()
+                self.reply('250 OK')
+            elif verb == 'NOOP':
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+
+class _ThreadingSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class SMTPSink:
+    """Threaded SMTP sink. Use as a context manager or call start()/stop().
+
+    Latencies are in seconds; rates are probabilities in [0, 1]:
+      connect_latency   delay before the greeting (TCP + TLS handshake stand-in)
+      command_latency   delay before every command reply
+      data_latency      delay after DATA before the final reply
+      fail_rate         DATA answered with a transient 451
+      connect_fail_rate connection greeted with 421
+      disconnect_rate   socket dropped instead of answering a command
+      refuse_suffixes   recipients ending with one of these get 550
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, connect_latency=0.0, command_latency=0.0,
+                 data_latency=0.0, fail_rate=0.0, connect_fail_rate=0.0, disconnect_rate=0.0,
+                 refuse_suffixes=(), seed=None):
+        self.host = host
+        self.port = port
+        self.connect_latency = connect_latency
+        self.command_latency = command_latency
+        self.data_latency = data_latency
+        self.fail_rate = fail_rate
+        self.connect_fail_rate = connect_fail_rate
+        self.disconnect_rate = disconnect_rate
+        self.refuse_suffixes = tuple(refuse_suffixes)
+        self.messages = []
+        self.counters = {'connections': 0, 'logins': 0}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        self._server = _ThreadingSMTPServer((self.host, self.port), _SMTPHandler)
+        self._server.sink = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name='smtp-sink', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def reset(self):
+        with self._lock:
+            self.messages = []
+            self.counters = {'connections': 0, 'logins': 0}
+
+    def wait_for(self, count, timeout=30):
+        """Block until at least count messages have arrived. Returns True on success."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                if len(self.messages) >= count:
+                    return True
+            time.sleep(0.01)
+        return False
+
+    @property
+    def recipient_count(self):
+        with self._lock:
+            return sum(len(m.recipients) for m in self.messages)
+
+    def _register_connection(self):
+        with self._lock:
+            self.counters['connections'] += 1
+            return self.counters['connections']
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + 1
+
+    def _store(self, message):
+        with self._lock:
+            self.messages.append(message)
+
+    def _roll(self, rate):
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < rate
+
+    def _sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a local SMTP sink')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=2525)
+    parser.add_argument('--latency', type=float, default=0.0, help='Delay per command (seconds)')
+    parser.add_argument('--connect-latency', type=float, default=0.0, help='Delay before greeting (seconds)')
+    parser.add_argument('--data-latency', type=float, default=0.0, help='Delay after DATA (seconds)')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='Probability of a 451 after DATA')
+    parser.add_argument('--disconnect-rate', type=float, default=0.0, help='Probability of dropping the connection')
+    args = parser.parse_args()
+
+    sink = SMTPSink(args.host, args.port, connect_latency=args.connect_latency,
+                    command_latency=args.latency, data_latency=args.data_latency,
+                    fail_rate=args.fail_rate, disconnect_rate=args.disconnect_rate).start()
+    print(f"SMTP sink listening on {sink.host}:{sink.port} (Ctrl+C to stop)")
+    try:
+        seen = 0
+        while True:
+            time.sleep(1)
+            with sink._lock:
+                new = sink.messages[seen:]
+            for message in new:
+                print(f"[{message.connection_id}] {message.mail_from} -> {', '.join(message.recipients)}: {message.subject}")
+            seen += len(new)
+    except KeyboardInterrupt:
+        sink.stop()
+
+
+if __name__ == '__main__':
+    main()